@@ -0,0 +1,201 @@
+"""
+PostgreSQL database backend that adds connection health checks and an optional
+in-process connection pool to Django's backend.
+
+Health checks (CONN_HEALTH_CHECKS) work like in Django 4.1: a persistent
+connection is checked with a query before it's first used in a request, and
+replaced if the server closed it.
+
+The pool (POOL_SIZE) is meant for threaded workers, where each thread has its own
+connection. Connections closed by Django at the end of a request are returned to
+the pool instead, and the threads share at most POOL_SIZE connections. A thread
+waits up to POOL_TIMEOUT seconds for a connection when they're all in use.
+"""
+
+import queue
+import threading
+from collections import deque
+from functools import partial
+
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+from psycopg2 import extensions
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of at most size connections, which are opened when needed.
+    """
+
+    def __init__(self, size: int, timeout: float):
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.num_available = size
+        # Locks that threads waiting for a connection are blocked on, first come
+        # first served so that no thread waits much longer than the others
+        self.waiters = deque()
+        # Reuse the most recently returned connections, so that the others can be
+        # closed by the server when they have been idle for long
+        self.idle = queue.LifoQueue()
+
+    def acquire(self) -> bool:
+        """
+        Waits for the right to use a connection, returns False on timeout.
+        """
+        with self.lock:
+            if self.num_available and not self.waiters:
+                self.num_available -= 1
+                return True
+            waiter = threading.Lock()
+            waiter.acquire()
+            self.waiters.append(waiter)
+
+        if waiter.acquire(timeout=self.timeout):
+            return True
+        with self.lock:
+            try:
+                self.waiters.remove(waiter)
+            except ValueError:
+                # The right was handed over just after the timeout
+                return True
+            return False
+
+    def release(self):
+        with self.lock:
+            if self.waiters:
+                # Hand the right over to the first waiter
+                self.waiters.popleft().release()
+            else:
+                self.num_available += 1
+
+    def get(self, connect, is_usable=None):
+        """
+        Returns an idle connection, or a new one made by calling connect.
+        Idle connections for which is_usable returns False are closed and skipped.
+        """
+        if not self.acquire():
+            raise PoolTimeout(
+                f"No database connection became available in {self.timeout} seconds"
+            )
+        try:
+            while True:
+                try:
+                    connection = self.idle.get_nowait()
+                except queue.Empty:
+                    return connect()
+                if is_usable is None or is_usable(connection):
+                    return connection
+                connection.close()
+        except BaseException:
+            self.release()
+            raise
+
+    def put(self, connection):
+        """
+        Returns a connection got from the pool. Connections that aren't idle
+        are rolled back, and closed if that fails.
+        """
+        try:
+            status = connection.get_transaction_status()
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                connection.close()
+            else:
+                if status != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                self.idle.put(connection)
+        except base.Database.Error:
+            connection.close()
+        finally:
+            self.release()
+
+    def close(self):
+        """
+        Closes the idle connections.
+        """
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_enabled = self.settings_dict.get("CONN_HEALTH_CHECKS", False)
+        self.health_check_done = False
+
+    @property
+    def pool(self):
+        size = self.settings_dict.get("POOL_SIZE", 0)
+        if not size:
+            return None
+
+        # The test runner changes the name of the database, so key pools by it too
+        key = (self.alias, self.settings_dict["NAME"])
+        with pools_lock:
+            if key not in pools:
+                pools[key] = ConnectionPool(
+                    size, self.settings_dict.get("POOL_TIMEOUT", 30)
+                )
+            return pools[key]
+
+    def get_new_connection(self, conn_params):
+        if self.pool is None:
+            return super().get_new_connection(conn_params)
+        return self.pool.get(
+            partial(super().get_new_connection, conn_params),
+            self.connection_is_usable if self.health_check_enabled else None,
+        )
+
+    def connect(self):
+        # New connections don't need to be checked
+        # (set first as connecting calls ensure_connection)
+        self.health_check_done = True
+        super().connect()
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.pool.put(self.connection)
+
+    @staticmethod
+    def connection_is_usable(connection):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            # End the transaction the query started if autocommit is off
+            connection.rollback()
+        except base.Database.Error:
+            return False
+        return True
+
+    def close_if_health_check_failed(self):
+        if (
+            self.connection is None
+            or not self.health_check_enabled
+            or self.health_check_done
+        ):
+            return
+        if not self.is_usable():
+            self.close()
+        self.health_check_done = True
+
+    def ensure_connection(self):
+        self.close_if_health_check_failed()
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        # Called at the start and end of each request,
+        # so persistent connections are checked again in the next request
+        super().close_if_unusable_or_obsolete()
+        self.health_check_done = False
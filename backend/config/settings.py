@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "portal",
     "corsheaders",
     "drf_spectacular",
@@ -93,12 +94,23 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        # Django's PostgreSQL backend with health checks and pooling, see config/db
+        "ENGINE": "config.db",
         "NAME": env("PORTAL_DB_DATABASE"),
         "USER": env("PORTAL_DB_USER"),
         "PASSWORD": env("PORTAL_DB_PASSWORD"),
         "HOST": env("PORTAL_DB_HOST", default=""),
         "PORT": env("PORTAL_DB_PORT", default=""),
+        # Seconds to keep connections open for between requests,
+        # 0 to close them at the end of each request
+        "CONN_MAX_AGE": env.int("PORTAL_DB_CONN_MAX_AGE", default=0),
+        # Check that kept connections still work before using them in a request
+        "CONN_HEALTH_CHECKS": env.bool("PORTAL_DB_CONN_HEALTH_CHECKS", default=False),
+        # Number of connections shared by the threads of a worker process,
+        # 0 to disable pooling
+        "POOL_SIZE": env.int("PORTAL_DB_POOL_SIZE", default=0),
+        # Seconds to wait for a pooled connection before failing
+        "POOL_TIMEOUT": env.float("PORTAL_DB_POOL_TIMEOUT", default=30),
     }
 }
 
@@ -148,6 +160,11 @@ STATIC_ROOT = os.path.join(BASE_DIR, "djangostatic/")
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "build", "media")
+# Uploads are named by the hash of their contents, and served as immutable by nginx.
+# Files no longer referenced are deleted by the collect_media command
+DEFAULT_FILE_STORAGE = "portal.storage.ContentAddressedStorage"
+# Uploaded CSV imports, which may contain personal data, so aren't under MEDIA_ROOT
+IMPORT_ROOT = os.path.join(BASE_DIR, "build", "imports")
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
@@ -164,7 +181,7 @@ else:
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "portal.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_RENDERER_CLASSES": [
         "rest_framework.renderers.JSONRenderer",
@@ -189,6 +206,14 @@ EMAIL_HOST_PASSWORD = env("EMAIL_HOST_PASSWORD", default="")
 # GitHub OAuth2 keys
 GITHUB_CLIENT_ID = env("GITHUB_CLIENT_ID", default="")
 GITHUB_CLIENT_SECRET = env("GITHUB_CLIENT_SECRET", default="")
+# Base URLs of GitHub's OAuth endpoints and API, changed to test against a fake GitHub
+GITHUB_URL = env("GITHUB_URL", default="https://github.com")
+GITHUB_API_URL = env("GITHUB_API_URL", default="https://api.github.com")
+# Seconds to wait for GitHub to accept a connection and to send a response
+GITHUB_CONNECT_TIMEOUT = env.float("GITHUB_CONNECT_TIMEOUT", default=3.05)
+GITHUB_READ_TIMEOUT = env.float("GITHUB_READ_TIMEOUT", default=5)
+# Number of times failed requests to GitHub are retried
+GITHUB_RETRIES = env.int("GITHUB_RETRIES", default=2)
 
 # Frontend URLs
 ACTIVATION_URL_TEMPLATE = env(
@@ -199,5 +224,15 @@ RESET_PASSWORD_URL_TEMPLATE = env(
     default="http://localhost:3000/reset-password/{reset_key}",
 )
 
+# Cache, e.g. filecache:///var/tmp/portal_cache or rediscache://127.0.0.1:6379/1
+# Defaults to a local-memory cache, which isn't shared between worker processes
+CACHES = {"default": env.cache("PORTAL_CACHE_URL", default="locmemcache://")}
+
+# How long responses for anonymous users are cached for, in seconds
+RESPONSE_CACHE_TIMEOUT = env.int("PORTAL_RESPONSE_CACHE_TIMEOUT", default=60 * 60)
+
+# How long the users of authentication tokens are cached for, in seconds
+TOKEN_CACHE_TIMEOUT = env.int("PORTAL_TOKEN_CACHE_TIMEOUT", default=60)
+
 # Test runner
 TEST_RUNNER = "config.test_runner.TestRunner"
@@ -1,13 +1,31 @@
 import logging
+import unittest
 
+from django.core.cache import caches
 from django.test.runner import DiscoverRunner
 
 
+class TestResult(unittest.TextTestResult):
+    """
+    Test result that clears the caches before each test, since cached data
+    would otherwise outlive the database rollback after the previous test.
+    """
+
+    def startTest(self, test):
+        for cache in caches.all():
+            cache.clear()
+        super().startTest(test)
+
+
 class TestRunner(DiscoverRunner):
     """
-    Test runner that disables logging before running tests.
+    Test runner that disables logging before running tests
+    and clears the caches before each test.
     """
 
     def run_tests(self, test_labels, **kwargs):
         logging.disable(logging.CRITICAL)
         return super().run_tests(test_labels, **kwargs)
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TestResult
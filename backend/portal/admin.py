@@ -11,16 +11,63 @@ from django_admin_listfilter_dropdown.filters import (
 from rest_framework.authtoken.models import TokenProxy
 
 from . import models
+from .filters import search_query
+from .pagination import EstimatedCountPaginator
+from .response_cache import invalidate_responses
 
 admin.site.site_header = "CMPUT 401 Projects Portal Admin"
 
-"""
-Custom list filter to filter users based on their project roles
-Students, TAs, Client Reps
-"""
+# Values of the role filter, and the roles they select
+USER_FILTER_ROLES = {
+    "students": models.Membership.STUDENT,
+    "ta": models.Membership.TA,
+    "client_rep": models.Membership.CLIENT_REP,
+}
 
 
-class UserRoleListFilter(admin.SimpleListFilter):
+def membership_conditions(params) -> dict:
+    """
+    Returns the conditions on project memberships selected by the role, term
+    and year filters of the user changelist, ignoring invalid values.
+    """
+    conditions = {}
+    if params.get("role") in USER_FILTER_ROLES:
+        conditions["role"] = USER_FILTER_ROLES[params["role"]]
+    if params.get("term") in dict(models.Project.TERM_CHOICES):
+        conditions["term"] = params["term"]
+    if params.get("year", "").isdigit():
+        conditions["year"] = int(params["year"])
+    return conditions
+
+
+class UserMembershipListFilter(admin.SimpleListFilter):
+    """
+    Base of the custom list filters that filter users based on the role, term and
+    year they worked on a project.
+    The selected role, term and year must all match the same project membership,
+    so the first selected filter filters by all of them with one indexed query
+    and the others leave the queryset as is.
+    """
+
+    def queryset(self, request, queryset):
+        """
+        Returns the filtered queryset based on the values
+        provided in the query string.
+        """
+        conditions = membership_conditions(request.GET)
+        if self.parameter_name != next(iter(conditions), None):
+            return queryset
+        return queryset.filter(
+            id__in=models.Membership.objects.filter(**conditions).values("user")
+        )
+
+
+class UserRoleListFilter(UserMembershipListFilter):
+    """
+    Custom list filter to filter users based on their project roles
+    Students, TAs, Client Reps
+    """
+
     # Human-readable title which will be displayed in the
     # right admin sidebar just above the filter options.
     title = _("role")
@@ -42,27 +89,12 @@ class UserRoleListFilter(admin.SimpleListFilter):
             ("client_rep", _("Client Reps")),
         )
 
-    def queryset(self, request, queryset):
-        """
-        Returns the filtered queryset based on the value
-        provided in the query string and retrievable via
-        `self.value()`.
-        """
-        # Compare the requested value
-        # to decide how to filter the queryset.
-        if self.value() in ["students", "ta", "client_rep"]:
-            # Get all users of a certain role from all projects
-            projects = models.Project.objects.values_list(self.value(), flat=True)
-            return queryset.filter(id__in=projects)
-
-
-"""
-Custom list filter to filter users based on the term they worked on a project
-Also checks if year and role is selected and filter accordingly.
-"""
 
+class UserTermListFilter(UserMembershipListFilter):
+    """
+    Custom list filter to filter users based on the term they worked on a project
+    """
 
-class UserTermListFilter(admin.SimpleListFilter):
     template = "django_admin_listfilter_dropdown/dropdown_filter.html"
     # Human-readable title which will be displayed in the
     # right admin sidebar just above the filter options.
@@ -79,61 +111,14 @@ class UserTermListFilter(admin.SimpleListFilter):
         human-readable name for the option that will appear
         in the right sidebar.
         """
-        return (
-            ("F", _("F")),
-            ("W", _("W")),
-            ("SP", _("SP")),
-            ("SM", _("SM")),
-        )
-
-    def queryset(self, request, queryset):
-        """
-        Returns the filtered queryset based on the value
-        provided in the query string and retrievable via
-        `self.value()`.
-        """
-        # Compare the requested value
-        # to decide how to filter the queryset.
-        role = request.GET.get("role", "")
-        year = request.GET.get("year", "")
-
-        if self.value() in ["F", "W", "SP", "SM"]:
-            # Get all projects of selected term
-            projects = models.Project.objects.filter(term=self.value())
-
-            # If a year is given, get all projects from selected term and selected year
-            if year:
-                projects = (
-                    projects & models.Project.objects.filter(year=year)
-                ).distinct()
-
-            # If a role is set, get users of that role from the projects
-            if role:
-                users = projects.values_list(role, flat=True).distinct()
-                return queryset.filter(id__in=users)
+        return [(term, _(term)) for term, _name in models.Project.TERM_CHOICES]
 
-            # Else get all users from projects
-            else:
-                students = projects.values_list("students", flat=True).distinct()
-
-                tas = projects.values_list("ta", flat=True).distinct()
-
-                reps = projects.values_list("client_rep", flat=True).distinct()
-
-                return (
-                    queryset.filter(id__in=students)
-                    | queryset.filter(id__in=tas)
-                    | queryset.filter(id__in=reps)
-                ).distinct()
-
-
-"""
-Custom list filter to filter users based on the year they worked on a project.
-Also checks if term and role is selected and filter accordingly.
-"""
 
+class UserYearListFilter(UserMembershipListFilter):
+    """
+    Custom list filter to filter users based on the year they worked on a project.
+    """
 
-class UserYearListFilter(admin.SimpleListFilter):
     template = "django_admin_listfilter_dropdown/dropdown_filter.html"
     # Human-readable title which will be displayed in the
     # right admin sidebar just above the filter options.
@@ -141,7 +126,6 @@ class UserYearListFilter(admin.SimpleListFilter):
 
     # Parameter for the filter that will be used in the URL query.
     parameter_name = "year"
-    parameter_values = []
 
     def lookups(self, request, model_admin):
         """
@@ -151,60 +135,45 @@ class UserYearListFilter(admin.SimpleListFilter):
         human-readable name for the option that will appear
         in the right sidebar.
         """
-        # Get all years from projects
-        project_years = models.Project.objects.values_list("year", flat=True).distinct()
-
-        # Dynamically create filter options
-        sidebar_display = []
-
-        for year in project_years:
-            self.parameter_values.append(str(year))
-            sidebar_display.append((year, str(year)))
-
-        # Put years in order
-        sidebar_display.sort()
-
-        return sidebar_display
-
-    def queryset(self, request, queryset):
-        """
-        Returns the filtered queryset based on the value
-        provided in the query string and retrievable via
-        `self.value()`.
-        """
-        # Compare the requested value
-        # to decide how to filter the queryset.
-        role = request.GET.get("role", "")
-        term = request.GET.get("term", "")
-
-        if self.value() in self.parameter_values:
-            # Get all projects from selected year
-            projects = models.Project.objects.filter(year=self.value())
+        # Years of all project memberships, in order, read from their index
+        years = (
+            models.Membership.objects.filter(year__isnull=False)
+            .order_by("year")
+            .values_list("year", flat=True)
+            .distinct()
+        )
+        return [(year, str(year)) for year in years]
 
-            # If a term is given, get all projects from selected year and selected term
-            if term:
-                projects = (
-                    projects & models.Project.objects.filter(term=term)
-                ).distinct()
 
-            # If a role is set, get users of that role from the projects
-            if role:
-                users = projects.values_list(role, flat=True).distinct()
-                return queryset.filter(id__in=users)
+class LargeTableAdminMixin:
+    """
+    A ModelAdmin mixin for the changelists of tables that can grow large.
 
-            # Else get all users from projects
-            else:
-                students = projects.values_list("students", flat=True).distinct()
+    Instead of counting every row on every page, unfiltered changelists estimate
+    the number of rows, and filtered ones don't count the unfiltered total.
+    Searches match the model's full-text search vector, whose GIN index matches
+    word prefixes, or any of the search_fields, which should be indexed prefix (^)
+    lookups.
+    """
 
-                tas = projects.values_list("ta", flat=True).distinct()
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-                reps = projects.values_list("client_rep", flat=True).distinct()
+    def get_search_results(self, request, queryset, search_term):
+        query = search_query(search_term)
+        if query is None:
+            return super().get_search_results(request, queryset, search_term)
 
-                return (
-                    queryset.filter(id__in=students)
-                    | queryset.filter(id__in=tas)
-                    | queryset.filter(id__in=reps)
-                ).distinct()
+        field_matches, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        # A union of two indexed lookups, rather than an OR that can't use either
+        matches = (
+            queryset.model.objects.filter(search_vector=query)
+            .values("pk")
+            .union(field_matches.values("pk"))
+        )
+        return queryset.filter(pk__in=matches), may_have_duplicates
 
 
 class UserCreationForm(django.contrib.auth.forms.UserCreationForm):
@@ -245,7 +214,7 @@ class UserCreationForm(django.contrib.auth.forms.UserCreationForm):
 
 
 @admin.register(get_user_model())
-class UserAdmin(django.contrib.auth.admin.UserAdmin):
+class UserAdmin(LargeTableAdminMixin, django.contrib.auth.admin.UserAdmin):
     exclude = ("username", "first_name", "last_name")
     fieldsets = (
         (None, {"fields": ("email", "password")}),
@@ -292,7 +261,8 @@ class UserAdmin(django.contrib.auth.admin.UserAdmin):
         ),
     )
     list_display = ("email", "name", "is_staff")
-    search_fields = ("email", "name", "id")
+    # names and GitHub usernames are matched by the search vector
+    search_fields = ("^email",)
     ordering = ()
     list_filter = (
         "is_staff",
@@ -310,28 +280,40 @@ class ClientOrgAdmin(admin.ModelAdmin):
     list_filter = ("type",)
 
 
+def update_projects(queryset, **fields):
+    """
+    Updates the fields of the projects in the queryset without saving them one by one.
+    queryset.update doesn't send signals, so this does their work too.
+    """
+    # The queryset may be filtered by the fields being updated, so fix its projects
+    ids = list(queryset.values_list("id", flat=True))
+    models.Project.objects.filter(id__in=ids).update(**fields)
+    models.Project.objects.mark_updated(ids)
+    invalidate_responses()
+
+
 @admin.action(description="Publish selected projects")
 def make_published(modeladmin, request, queryset):
-    queryset.update(is_published=True)
+    update_projects(queryset, is_published=True)
 
 
 @admin.action(description="Unpublish selected projects")
 def make_unpublished(modeladmin, request, queryset):
-    queryset.update(is_published=False)
+    update_projects(queryset, is_published=False)
 
 
 @admin.action(description="Display selected projects on the home page")
 def display_on_home(modeladmin, request, queryset):
-    queryset.update(display_on_home_page=True)
+    update_projects(queryset, display_on_home_page=True)
 
 
 @admin.action(description="Remove selected projects from the home page")
 def remove_from_home(modeladmin, request, queryset):
-    queryset.update(display_on_home_page=False)
+    update_projects(queryset, display_on_home_page=False)
 
 
 @admin.register(models.Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     actions = [make_published, make_unpublished, display_on_home, remove_from_home]
     list_display = (
         "name",
@@ -340,8 +322,11 @@ class ProjectAdmin(admin.ModelAdmin):
         "is_published",
         "display_on_home_page",
     )
+    list_select_related = ("client_org", "ta")
 
-    search_fields = ("year", "name")
+    # names, taglines, summaries, tags and org names are matched by the search vector,
+    # years are filtered by the year filter
+    search_fields = ("^name",)
     # adds a dropdown menu when filters items exceed 3
     list_filter = (
         ("type", ChoiceDropdownFilter),
@@ -370,4 +355,27 @@ class ProposalAdmin(admin.ModelAdmin):
     search_fields = ("rep_name",)
 
 
+@admin.register(models.OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ("subject", "recipients", "created_at", "sent_at", "attempts")
+    search_fields = ("subject",)
+    # Sent emails are kept, so the table keeps growing
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(models.ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "dry_run",
+        "status",
+        "created_by",
+        "created_at",
+        "finished_at",
+    )
+    list_select_related = ("created_by",)
+    list_filter = ("status", "dry_run")
+
+
 admin.site.unregister(TokenProxy)
@@ -0,0 +1,58 @@
+"""
+Token authentication that caches the user of each token.
+
+DRF's TokenAuthentication looks up the token and its user in the database on every
+authenticated request. Instead, the user is cached by token for
+TOKEN_CACHE_TIMEOUT seconds, so that most requests don't query them. Cached users
+must be evicted whenever their tokens are deleted or the users change, see
+uncache_tokens.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+KEY_PREFIX = "portal:tokens"
+
+
+def cache_key(token_key: str) -> str:
+    # Tokens are secrets, so only their hashes are stored as cache keys
+    return f"{KEY_PREFIX}:{hashlib.sha256(token_key.encode()).hexdigest()}"
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        user = cache.get(cache_key(key))
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key(key), user, settings.TOKEN_CACHE_TIMEOUT)
+            return user, token
+        return user, Token(key=key, user=user)
+
+
+def uncache_tokens(user_ids):
+    """
+    Evicts the cached users of the tokens of the specified users.
+    Must be called before deleting their tokens, and after any change to the users.
+    """
+    keys = [
+        cache_key(key)
+        for key in Token.objects.filter(user__in=user_ids).values_list("key", flat=True)
+    ]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    # Requests may cache the users again until the change is committed
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def delete_tokens(user):
+    """
+    Deletes the tokens of the user, logging out all of their sessions.
+    """
+    uncache_tokens([user.id])
+    Token.objects.filter(user=user).delete()
@@ -1,20 +1,129 @@
 import logging
+from smtplib import (
+    SMTPDataError,
+    SMTPException,
+    SMTPRecipientsRefused,
+    SMTPSenderRefused,
+)
 from textwrap import dedent
 from typing import TYPE_CHECKING
 
+from django.apps import apps
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
 
 if TYPE_CHECKING:
     from portal.models import PasswordResetRequest, Proposal, User
 
 
-def send_activation_email(user: "User"):
+def queue_email(subject: str, message: str, from_email, recipients: list[str]):
     """
-    Sends an email containing the activation URL to the user.
+    Queues an email to be sent by the send_emails worker.
+    The email is only queued once the current transaction is committed,
+    so it isn't sent if the transaction is rolled back.
+    Uses DEFAULT_FROM_EMAIL if from_email is None.
     """
-    logging.debug(f"Sending an activation email to {user.email}")
+    queue_emails([(subject, message, from_email, recipients)])
 
+
+def queue_emails(emails: list[tuple]):
+    """
+    Queues many emails with a single query, like queue_email.
+    Each email is a (subject, message, from_email, recipients) tuple.
+    """
+    # Imported here as the models module imports this module
+    OutgoingEmail = apps.get_model("portal", "OutgoingEmail")
+    outgoing_emails = [
+        OutgoingEmail(
+            subject=subject,
+            body=message,
+            from_email=from_email or "",
+            recipients=recipients,
+        )
+        for subject, message, from_email, recipients in emails
+    ]
+    transaction.on_commit(lambda: OutgoingEmail.objects.bulk_create(outgoing_emails))
+
+
+def send_queued_emails(batch_size: int = 100) -> int:
+    """
+    Sends up to batch_size of the queued emails that are due over a single connection.
+    Emails that fail to send are retried later, waiting longer after each failure.
+    Several workers can run this at once, each claims a different batch.
+    Returns the number of emails sent.
+    """
+    OutgoingEmail = apps.get_model("portal", "OutgoingEmail")
+
+    # The batch is claimed by postponing it, rather than locking it until it's sent,
+    # so that the result of each email is saved as soon as it's known. If the worker
+    # stops before sending an email, it's sent once the claim expires. The attempt is
+    # counted when claiming, so that an email that keeps failing in an unexpected way,
+    # such as by crashing the worker, is eventually given up on.
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.due().select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not emails:
+            return 0
+        claim_expiry = timezone.now() + OutgoingEmail.CLAIM_DURATION
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = claim_expiry
+        OutgoingEmail.objects.bulk_update(emails, ["attempts", "next_attempt_at"])
+
+    fields = ["last_error", "next_attempt_at", "sent_at"]
+    num_sent = 0
+    num_tried = 0
+    connection = get_connection()
+    try:
+        connection.open()
+        for email in emails:
+            try:
+                connection.send_messages(
+                    [
+                        EmailMessage(
+                            email.subject,
+                            email.body,
+                            email.from_email or None,
+                            email.recipients,
+                            connection=connection,
+                        )
+                    ]
+                )
+            except (
+                SMTPRecipientsRefused,
+                SMTPSenderRefused,
+                SMTPDataError,
+                # Invalid emails, such as ones with newlines in their subjects
+                ValueError,
+            ) as error:
+                # This email can't be sent, the connection is still usable
+                logging.warning(f"Failed to send {email}: {error!r}")
+                email.set_failed(error)
+            else:
+                email.sent_at = timezone.now()
+                num_sent += 1
+            num_tried += 1
+            email.save(update_fields=fields)
+    except (SMTPException, OSError) as error:
+        # Couldn't connect to the mail server or lost the connection to it
+        logging.warning(f"Failed to send queued emails: {error!r}")
+        for email in emails[num_tried:]:
+            email.set_failed(error)
+        OutgoingEmail.objects.bulk_update(emails[num_tried:], fields)
+    finally:
+        connection.close()
+
+    return num_sent
+
+
+def activation_email(user: "User") -> tuple:
+    """
+    Returns the email containing the activation URL for the user,
+    as a (subject, message, from_email, recipients) tuple.
+    """
     # Ensure that the user is unactivated and has an activation key
     if user.is_activated:
         raise ValueError("User is already activated")
@@ -34,7 +143,23 @@ def send_activation_email(user: "User"):
         {activation_url}
         """
     )
-    send_mail(subject, message, None, [user.email], fail_silently=False)
+    return subject, message, None, [user.email]
+
+
+def send_activation_email(user: "User"):
+    """
+    Sends an email containing the activation URL to the user.
+    """
+    logging.debug(f"Sending an activation email to {user.email}")
+    queue_emails([activation_email(user)])
+
+
+def send_activation_emails(users: list["User"]):
+    """
+    Sends the activation emails of many users, queueing them with a single query.
+    """
+    logging.debug(f"Sending activation emails to {len(users)} users")
+    queue_emails([activation_email(user) for user in users])
 
 
 def send_password_reset_email(user: "User", reset_request: "PasswordResetRequest"):
@@ -63,7 +188,7 @@ def send_password_reset_email(user: "User", reset_request: "PasswordResetRequest
         If you did not request this, you can ignore this email and your password will remain unchanged.
         """
     )
-    send_mail(subject, message, None, [user.email], fail_silently=False)
+    queue_email(subject, message, None, [user.email])
 
 
 def send_proposal_email(proposal: "Proposal", recipients: list[str]):
@@ -71,9 +196,11 @@ def send_proposal_email(proposal: "Proposal", recipients: list[str]):
     Sends an email to the user with a link to view the proposal.
     """
 
-    subject = f"New CMPUT 401 project proposal from {proposal.rep_name}"
+    # The name is user input, and a newline in a subject is an invalid header
+    rep_name = " ".join(proposal.rep_name.split())
+    subject = f"New CMPUT 401 project proposal from {rep_name}"
 
     message = f"NAME: {proposal.rep_name}\nEMAIL: {proposal.email}\nDATE: {proposal.date}\nPROJECT INFO: {proposal.project_info}\n"
     message += "--" * 20
 
-    send_mail(subject, message, settings.EMAIL_HOST_USER, recipients)
+    queue_email(subject, message, settings.EMAIL_HOST_USER, recipients)
@@ -0,0 +1,86 @@
+import hashlib
+from functools import partial
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+
+
+class ConditionalGetMixin:
+    """
+    Base of the viewset mixins that add ETags to responses and answer requests
+    with a matching If-None-Match header with 304 Not Modified, without serializing
+    anything.
+
+    The ETags are computed with a single query from the updated_at stamps of the
+    listed or retrieved instances, which must be bumped whenever anything included
+    in their representations changes.
+    """
+
+    def get_etag(self, queryset):
+        """
+        Returns the ETag of the representation of the instances in the queryset,
+        or None if the queryset is empty.
+        """
+        stamps = queryset.order_by().aggregate(
+            count=Count("pk"), updated_at=Max("updated_at")
+        )
+        if stamps["count"] == 0:
+            return None
+        # Representations vary with the user, the renderer and the query params
+        parts = [
+            self.request.user.pk,
+            self.request.accepted_media_type,
+            self.request.get_full_path(),
+            stamps["count"],
+            stamps["updated_at"].isoformat(),
+        ]
+        digest = hashlib.md5(":".join(str(part) for part in parts).encode("utf-8"))
+        return f'"{digest.hexdigest()}"'
+
+    def conditional_response(self, request, etag, get_response):
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag)
+            if response is not None:
+                response["ETag"] = etag
+                return response
+
+        response = get_response()
+        if etag is not None and response.status_code == 200:
+            response["ETag"] = etag
+        return response
+
+
+class ConditionalListMixin(ConditionalGetMixin):
+    """
+    Conditional GET for ListModelMixin viewsets. The ETag covers all the pages.
+    """
+
+    def list(self, request, *args, **kwargs):
+        etag = self.get_etag(self.filter_queryset(self.get_queryset()))
+        return self.conditional_response(
+            request, etag, partial(super().list, request, *args, **kwargs)
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalGetMixin):
+    """
+    Conditional GET for RetrieveModelMixin viewsets.
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            etag = self.get_etag(
+                self.filter_queryset(self.get_queryset()).filter(
+                    **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+                )
+            )
+        except (TypeError, ValueError, ValidationError):
+            # Invalid lookup value, the response is a 404
+            etag = None
+        return self.conditional_response(
+            request,
+            etag,
+            partial(super().retrieve, request, *args, **kwargs),
+        )
@@ -0,0 +1,130 @@
+import re
+import uuid
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import SEARCH_CONFIG, ClientOrg, Project
+
+
+def search_query(search: str):
+    """
+    Returns a full-text SearchQuery matching documents that contain every word
+    in the search string, with each word matching as a prefix so results show up
+    while a word is still being typed.
+    Returns None if the search string has no words.
+    """
+    words = re.findall(r"[^\W_]+", search)
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        search_type="raw",
+        config=SEARCH_CONFIG,
+    )
+
+
+def ranked_matches(queryset, query: SearchQuery):
+    """
+    Filters a queryset of a model with a search_vector field to the items matching
+    the query, annotated with their rank and ordered from best to worst match.
+    """
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank")
+    )
+
+
+def choice_value(choices: list, value: str):
+    """
+    Returns the stored value of a choice given either its stored value or its
+    human-readable name (e.g. "WA" or "Web App"), or None if there is no such choice.
+    """
+    for stored_value, name in choices:
+        if value in [stored_value, name]:
+            return stored_value
+    return None
+
+
+class ProjectFilter(BaseFilterBackend):
+    """
+    Filters projects using the following optional query params:
+    - type: project type, e.g. "WA" or "Web App"
+    - term: e.g. "F" or "Fall"
+    - year
+    - tag: value of a tag, case-insensitive
+    - client_org: ID of a client org
+    - client_type: client org type, e.g. "NP" or "Non-profit"
+    - search: words to search for in the name, tagline, summary, tags and org name.
+      Results are ordered by relevance unless they are paginated.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        if "type" in params:
+            queryset = queryset.filter(
+                type=choice_value(Project.PROJECT_TYPE_CHOICES, params["type"])
+            )
+
+        if "term" in params:
+            # Terms are stored using both their short and long names
+            term = choice_value(Project.TERM_CHOICES, params["term"])
+            queryset = queryset.filter(
+                term__in=[term, dict(Project.TERM_CHOICES).get(term)]
+            )
+
+        if "year" in params:
+            try:
+                queryset = queryset.filter(year=int(params["year"]))
+            except ValueError:
+                raise ValidationError({"year": "Must be an integer."})
+
+        if "tag" in params:
+            queryset = queryset.filter(
+                id__in=Project.tags.through.objects.filter(
+                    tag__value__iexact=params["tag"]
+                ).values("project")
+            )
+
+        if "client_org" in params:
+            try:
+                queryset = queryset.filter(client_org=uuid.UUID(params["client_org"]))
+            except ValueError:
+                raise ValidationError({"client_org": "Must be a valid UUID."})
+
+        if "client_type" in params:
+            queryset = queryset.filter(
+                client_org__type=choice_value(
+                    ClientOrg.CLIENT_TYPES, params["client_type"]
+                )
+            )
+
+        query = search_query(params.get("search", ""))
+        if query is not None:
+            queryset = ranked_matches(queryset, query)
+
+        return queryset
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": name,
+                "required": False,
+                "in": "query",
+                "description": description,
+                "schema": {"type": type},
+            }
+            for name, type, description in [
+                ("type", "string", "Project type, e.g. WA or Web App"),
+                ("term", "string", "Project term, e.g. F or Fall"),
+                ("year", "integer", "Project year"),
+                ("tag", "string", "Value of a tag of the project, case-insensitive"),
+                ("client_org", "string", "ID of the project's client org"),
+                ("client_type", "string", "Client org type, e.g. NP or Non-profit"),
+                ("search", "string", "Words to search for"),
+            ]
+        ]
@@ -0,0 +1,143 @@
+"""
+Client for the GitHub endpoints used to log in with GitHub.
+
+Requests share a session, so that connections to GitHub are kept alive between
+logins instead of paying for a new TLS handshake every time. Every request has
+connect and read timeouts so that a hung GitHub can't hold up a worker, and
+requests that failed before reaching GitHub are retried a few times. The
+number of calls to each endpoint, their failures and their total latency are
+counted in the cache, see github_stats.
+"""
+
+import logging
+import time
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .response_cache import increment
+
+KEY_PREFIX = "portal:github"
+# Names of the endpoints, as counted in the stats
+ENDPOINTS = ["access_token", "user"]
+
+
+class GitHubError(Exception):
+    """
+    Raised when GitHub can't be reached or answers with an error.
+    """
+
+
+class GitHubClient:
+    def __init__(self):
+        # Sessions by number of retries, made when first used so that changes to
+        # GITHUB_RETRIES apply, as the other settings do
+        self.sessions = {}
+
+    @property
+    def session(self) -> requests.Session:
+        retries = settings.GITHUB_RETRIES
+        if retries not in self.sessions:
+            self.sessions[retries] = self.make_session(retries)
+        return self.sessions[retries]
+
+    def make_session(self, retries: int) -> requests.Session:
+        session = requests.Session()
+        retry = Retry(
+            total=retries,
+            # Requests that reached GitHub are only retried if they are safe to
+            # repeat, since OAuth codes can only be exchanged once
+            allowed_methods=["GET"],
+            status_forcelist=[502, 503, 504],
+            backoff_factor=0.1,
+            raise_on_status=False,
+        )
+        session.mount("https://", HTTPAdapter(max_retries=retry))
+        session.mount("http://", HTTPAdapter(max_retries=retry))
+        session.headers["Accept"] = "application/json"
+        return session
+
+    def request(self, endpoint: str, method: str, url: str, **kwargs) -> dict:
+        """
+        Makes a request to GitHub and returns the JSON body of the response.
+        Raises a GitHubError if it fails.
+        """
+        start = time.monotonic()
+        try:
+            response = self.session.request(
+                method,
+                url,
+                timeout=(settings.GITHUB_CONNECT_TIMEOUT, settings.GITHUB_READ_TIMEOUT),
+                **kwargs,
+            )
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as error:
+            increment(f"{KEY_PREFIX}:{endpoint}:failures")
+            raise GitHubError(f"GitHub {endpoint} request failed: {error!r}") from error
+        finally:
+            latency_ms = round((time.monotonic() - start) * 1000)
+            increment(f"{KEY_PREFIX}:{endpoint}:calls")
+            increment(f"{KEY_PREFIX}:{endpoint}:total_ms", latency_ms)
+            logging.debug(f"GitHub {endpoint} request took {latency_ms} ms")
+
+    def get_access_token(self, code: str) -> dict:
+        """
+        Exchanges a temporary OAuth code for an access token.
+        Returns GitHub's response, which contains an error instead of the
+        access token if the code is invalid.
+        """
+        return self.request(
+            "access_token",
+            "POST",
+            f"{settings.GITHUB_URL}/login/oauth/access_token",
+            json={
+                "client_id": settings.GITHUB_CLIENT_ID,
+                "client_secret": settings.GITHUB_CLIENT_SECRET,
+                "code": code,
+            },
+        )
+
+    def get_user_info(self, access_token: str) -> dict:
+        """
+        Returns the GitHub user that the access token belongs to.
+        """
+        return self.request(
+            "user",
+            "GET",
+            f"{settings.GITHUB_API_URL}/user",
+            headers={"Authorization": f"token {access_token}"},
+        )
+
+
+def github_stats() -> dict:
+    """
+    Returns the number of calls to each GitHub endpoint, the number that failed
+    and their average latency in milliseconds, counted since they were last reset.
+    """
+    stats = {}
+    for endpoint in ENDPOINTS:
+        calls = cache.get(f"{KEY_PREFIX}:{endpoint}:calls", 0)
+        total_ms = cache.get(f"{KEY_PREFIX}:{endpoint}:total_ms", 0)
+        stats[endpoint] = {
+            "calls": calls,
+            "failures": cache.get(f"{KEY_PREFIX}:{endpoint}:failures", 0),
+            "average_ms": total_ms / calls if calls else None,
+        }
+    return stats
+
+
+def reset_github_stats():
+    cache.delete_many(
+        [
+            f"{KEY_PREFIX}:{endpoint}:{count}"
+            for endpoint in ENDPOINTS
+            for count in ["calls", "failures", "total_ms"]
+        ]
+    )
+
+
+github_client = GitHubClient()
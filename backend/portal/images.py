@@ -0,0 +1,189 @@
+"""
+Derivatives of uploaded images, generated in the background by the process_images
+worker.
+
+Uploads are stored as they are, often as photos far larger than they are shown. For
+each uploaded image, the worker makes a copy per variant, scaled down to fit the
+variant's size, in WebP and JPEG, without the EXIF data (which may include where a
+photo was taken). The media storage names the copies by the hash of their contents
+(see storage.py), so identical copies are stored once. Their names are saved in the
+*_variants field of the image's instance, along with the name of the image they were
+made from. Variants made from a previous image are ignored, and replaced by the
+worker.
+"""
+
+import io
+import logging
+from typing import Optional
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.fields.json import KeyTextTransform
+from PIL import Image, ImageOps
+
+from .models import ClientOrg, Project, User
+
+# Models and their image fields with derivatives
+IMAGE_FIELDS = [
+    (User, "image"),
+    (ClientOrg, "image"),
+    (Project, "screenshot"),
+    (Project, "logo_image"),
+]
+
+# Largest width and height of each variant, from smallest to largest
+VARIANTS = {"thumbnail": 160, "card": 480, "full": 1600}
+
+# Pillow format and save options by file extension
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+}
+
+# Directory of the derivatives in the media storage
+DERIVATIVES_DIR = "derivatives"
+
+
+def variants_field(field: str) -> str:
+    return f"{field}_variants"
+
+
+def unprocessed_images(model, field: str):
+    """
+    Returns the instances of the model with an image in the field that has no
+    derivatives yet, either because it's new or because it changed since they
+    were made.
+    """
+    return (
+        model.objects.exclude(**{field: ""})
+        .exclude(**{f"{field}__isnull": True})
+        .annotate(variants_source=KeyTextTransform("source", variants_field(field)))
+        .filter(Q(variants_source__isnull=True) | ~Q(variants_source=F(field)))
+    )
+
+
+def load_image(image_file) -> Image.Image:
+    """
+    Decodes an image file, oriented by its EXIF data, in RGB or RGBA if it has
+    transparency. Raises OSError or DecompressionBombError if it can't be read.
+    """
+    largest = max(VARIANTS.values())
+    with Image.open(image_file) as original:
+        # Decodes large JPEGs at a reduced scale, which is much faster
+        original.draft("RGB", (largest, largest))
+        # Applies the orientation from the EXIF data, which isn't kept
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or (
+            image.mode == "P" and "transparency" in image.info
+        )
+        return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def generate_variants(image: Image.Image) -> dict:
+    """
+    Generates and stores the derivatives of a loaded image.
+    Returns the width, height and name of each format of each variant.
+    """
+    has_alpha = image.mode == "RGBA"
+    variants = {}
+    for variant, size in VARIANTS.items():
+        resized = image.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        variants[variant] = {"width": resized.width, "height": resized.height}
+        for extension, (image_format, options) in FORMATS.items():
+            converted = resized
+            if has_alpha and image_format == "JPEG":
+                # JPEG has no transparency, so fill it in white
+                converted = Image.new("RGB", resized.size, "white")
+                converted.paste(resized, mask=resized.getchannel("A"))
+            buffer = io.BytesIO()
+            converted.save(buffer, image_format, **options)
+            variants[variant][extension] = default_storage.save(
+                f"{DERIVATIVES_DIR}/{variant}.{extension}",
+                ContentFile(buffer.getvalue()),
+            )
+    return variants
+
+
+def process_image(model, pk, field: str) -> bool:
+    """
+    Generates the derivatives of the image in the field of an instance and saves
+    them in the instance. Returns False if the image changed in the meantime, in
+    which case it's processed again later. Images that can't be read are saved with
+    the error instead, and aren't retried.
+    """
+    instance = model.objects.only("pk", field).get(pk=pk)
+    source = getattr(instance, field).name
+    try:
+        with getattr(instance, field).open("rb") as image_file:
+            image = load_image(image_file)
+    except (OSError, Image.DecompressionBombError) as e:
+        # The original image is shown instead
+        logging.warning(f"Can't read {source}: {e!r}")
+        variants = {"source": source, "error": str(e)}
+    else:
+        variants = {"source": source, "variants": generate_variants(image)}
+
+    with transaction.atomic():
+        instance = model.objects.select_for_update().filter(pk=pk).first()
+        if instance is None or getattr(instance, field).name != source:
+            return False
+        setattr(instance, variants_field(field), variants)
+        # Saved with the signals, which mark the instance and related ones as updated
+        instance.save(update_fields=[variants_field(field), "updated_at"])
+    return True
+
+
+def process_images() -> int:
+    """
+    Generates the derivatives of every image without them.
+    Returns the number of images processed.
+    """
+    num_processed = 0
+    for model, field in IMAGE_FIELDS:
+        pks = list(unprocessed_images(model, field).values_list("pk", flat=True))
+        for pk in pks:
+            try:
+                num_processed += process_image(model, pk, field)
+            except Exception:
+                # Unexpected errors, such as a full disk, are retried on the next run
+                logging.exception(f"Error processing {model.__name__} {pk} {field}")
+    return num_processed
+
+
+def variant_urls(image, variants: dict, request=None) -> Optional[dict]:
+    """
+    Returns the width, height and URL of each format of each variant of an image,
+    and srcset attributes of each format listing the variants, or None if it has no
+    derivatives yet. The URLs are absolute if there's a request.
+    """
+    if not image or variants.get("source") != image.name:
+        return None
+    if "variants" not in variants:
+        return None
+
+    def url(name: str) -> str:
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    urls = {}
+    srcset = {extension: {} for extension in FORMATS}
+    # In order of size, as the database doesn't keep the order of the variants
+    for variant in VARIANTS:
+        sizes = variants["variants"].get(variant)
+        if sizes is None:
+            continue
+        urls[variant] = {"width": sizes["width"], "height": sizes["height"]}
+        for extension in FORMATS:
+            urls[variant][extension] = url(sizes[extension])
+            # Images smaller than a variant are the same size in larger ones
+            srcset[extension].setdefault(
+                sizes["width"], f"{urls[variant][extension]} {sizes['width']}w"
+            )
+    urls["srcset"] = {
+        extension: ", ".join(candidates.values())
+        for extension, candidates in srcset.items()
+    }
+    return urls
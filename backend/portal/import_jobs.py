@@ -0,0 +1,176 @@
+"""
+CSV imports run in the background by the run_import_jobs worker.
+
+The import views save the upload with a queued ImportJob and return right away.
+The worker parses the file, saving the number of rows read as it goes. Validations
+then check the data in memory without writing anything, while imports save it in a
+single transaction, which is rolled back if the import fails. The response is saved
+in the job, along with the time each phase took, for the admin to poll. Jobs left
+running by a worker that was stopped are failed by the next run.
+"""
+
+import logging
+import time
+import traceback
+from typing import Optional
+from urllib.parse import urljoin
+
+from django.contrib.auth.models import AnonymousUser
+from django.db import transaction
+from django.utils import timezone
+
+from .import_views import generate_response, import_data, parse_csv, validate_data
+from .models import ImportJob
+
+# Phases of a job, in order, validations run "validate" instead of "import"
+PHASES = ["parse", "validate", "import", "respond"]
+
+# How often the number of rows read is saved while parsing
+PROGRESS_INTERVAL = 1000
+
+
+class JobRequest:
+    """
+    Stands in for the upload request of a job when serializing its result.
+    """
+
+    def __init__(self, job: ImportJob):
+        self.user = job.created_by or AnonymousUser()
+        self.base_url = job.base_url
+
+    def build_absolute_uri(self, location: str) -> str:
+        return urljoin(self.base_url, location)
+
+
+def claim_import_job() -> Optional[ImportJob]:
+    """
+    Marks the oldest queued job as running and returns it, or returns None if no
+    jobs are queued. Several workers can run this at once, they skip the jobs
+    locked by each other.
+    """
+    with transaction.atomic():
+        job = (
+            ImportJob.objects.filter(status=ImportJob.QUEUED)
+            .order_by("created_at")
+            .select_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ImportJob.RUNNING
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at"])
+    return job
+
+
+def start_phase(job: ImportJob, phase: str):
+    job.phase = phase
+    job.save(update_fields=["phase", "counts", "timings"])
+
+
+def finish_import_job(job: ImportJob, result: dict):
+    job.status = ImportJob.FAILED if result["errors"] else ImportJob.SUCCEEDED
+    job.phase = ""
+    job.result = result
+    job.finished_at = timezone.now()
+    job.save()
+    job.file.delete()
+
+
+def run_import_job(job: ImportJob):
+    """
+    Parses and imports the CSV file of a claimed job, saving its progress and result.
+    """
+
+    def save_rows_read(num_rows: int):
+        job.counts["rows"] = num_rows
+        ImportJob.objects.filter(id=job.id).update(counts=job.counts)
+
+    start_phase(job, "parse")
+    start = time.monotonic()
+    try:
+        with job.file.open("rb") as csv_file:
+            data = parse_csv(csv_file, save_rows_read, PROGRESS_INTERVAL)
+    except Exception:
+        finish_import_job(
+            job,
+            {
+                "errors": [f"Error parsing CSV: {traceback.format_exc()}"],
+                "warnings": [],
+            },
+        )
+        return
+    job.timings["parse"] = time.monotonic() - start
+    job.counts.update(
+        users=len(data.users),
+        orgs=len(data.client_orgs),
+        projects=len(data.projects),
+        links=len(data.links),
+    )
+
+    # The import can't save its progress, as it isn't visible until committed
+    phase = "validate" if job.dry_run else "import"
+    start_phase(job, phase)
+    try:
+        with transaction.atomic():
+            start = time.monotonic()
+            imported_data = validate_data(data) if job.dry_run else import_data(data)
+            job.timings[phase] = time.monotonic() - start
+
+            # Made in the same transaction, so that a failed import saves nothing
+            start = time.monotonic()
+            result = generate_response(imported_data, JobRequest(job))
+            job.timings["respond"] = time.monotonic() - start
+    except Exception:
+        finish_import_job(
+            job,
+            {
+                "errors": [f"Error importing data: {traceback.format_exc()}"],
+                "warnings": [],
+            },
+        )
+        return
+
+    finish_import_job(job, result)
+
+
+def fail_stale_import_jobs() -> int:
+    """
+    Fails the jobs that have been running for longer than ImportJob.MAX_RUN_DURATION,
+    whose worker must have been stopped or killed, and deletes their files.
+    They aren't queued again, as they may have been what killed the worker.
+    Returns the number of jobs failed.
+    """
+    with transaction.atomic():
+        jobs = list(
+            ImportJob.objects.filter(
+                status=ImportJob.RUNNING,
+                started_at__lt=timezone.now() - ImportJob.MAX_RUN_DURATION,
+            ).select_for_update(skip_locked=True)
+        )
+        for job in jobs:
+            logging.warning(f"Failing {job}, which stopped running")
+            finish_import_job(
+                job,
+                {
+                    "errors": ["The import stopped before finishing, please try again"],
+                    "warnings": [],
+                },
+            )
+    return len(jobs)
+
+
+def run_import_jobs() -> int:
+    """
+    Fails the stale jobs, then runs the queued jobs one at a time until there are
+    none left. Returns the number of jobs run.
+    """
+    fail_stale_import_jobs()
+    num_run = 0
+    while True:
+        job = claim_import_job()
+        if job is None:
+            return num_run
+        run_import_job(job)
+        logging.info(f"Ran {job} in {sum(job.timings.values()):.2f}s")
+        num_run += 1
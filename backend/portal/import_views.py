@@ -1,16 +1,48 @@
-import traceback
-from dataclasses import dataclass
-
-import pandas as pd
-from django.core.files.uploadedfile import UploadedFile
+import codecs
+import csv
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from django.core.files import File
 from django.db import transaction
+from django.db.models import Q, prefetch_related_objects
+from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from .models import ClientOrg, Project, User
-from .serializers import ClientOrgSerializer, ProjectSerializer, UserSerializer
+from .emails import send_activation_emails
+from .models import ClientOrg, ImportJob, Membership, Project, User
+from .response_cache import invalidate_responses
+from .serializers import (
+    ClientOrgSerializer,
+    ImportJobSerializer,
+    ProjectSerializer,
+    ProjectShortSerializer,
+    UserSerializer,
+)
+
+CSV_COLUMNS = [
+    "project_name",
+    "project_year",
+    "project_term",
+    "client_org_name",
+    "client_rep_email",
+    "client_rep_name",
+    "client_rep_github_username",
+    "ta_email",
+    "ta_name",
+    "ta_github_username",
+    "student_email",
+    "student_name",
+    "student_github_username",
+]
+
+# Number of rows written to the database per query
+BATCH_SIZE = 1000
 
 
 @dataclass
@@ -18,6 +50,7 @@ class ParsedUsers:
     new_users: list[User]
     existing_users: list[User]
     errors: list[str]
+    num_activation_emails: int = 0
 
 
 @dataclass
@@ -34,12 +67,20 @@ class ParsedProjects:
     errors: list[str]
 
 
+# (email, name, github_username)
+UserRow = tuple[str, str, str]
+# (project_name, project_year, project_term)
+ProjectRow = tuple[str, str, str]
+# (project_name, client_org_name, client_rep_email, ta_email, student_email)
+LinkRow = tuple[str, str, str, str, str]
+
+
 @dataclass
 class CSVData:
-    users: pd.DataFrame
-    client_orgs: pd.DataFrame
-    projects: pd.DataFrame
-    links: pd.DataFrame
+    users: list[UserRow]
+    client_orgs: list[str]
+    projects: list[ProjectRow]
+    links: list[LinkRow]
 
 
 @dataclass
@@ -56,72 +97,137 @@ class ImportedData:
     errors: list[str]
     warnings: list[str]
 
+    num_activation_emails: int = 0
+
+    # The projects in the links, with their org, client rep and TA set, and the
+    # students and org reps to add
+    linked_projects: list[Project] = field(default_factory=list)
+    student_links: list[tuple[Project, User]] = field(default_factory=list)
+    rep_links: list[tuple[ClientOrg, User]] = field(default_factory=list)
 
-def parse_users(dataframe: pd.DataFrame) -> ParsedUsers:
+
+def parse_users(user_rows: Iterable[UserRow]) -> ParsedUsers:
+    """
+    Sorts the users into new and existing ones by email, and checks that the new
+    users don't clash with other users, without saving anything.
+    """
     parsed_users = ParsedUsers([], [], [])
 
     # drop any rows with the same email, keeps first
-    dataframe = dataframe.drop_duplicates(ignore_index=True, subset=["email"])
+    rows = {}
+    for email, name, github_username in user_rows:
+        rows.setdefault(
+            email, {"email": email, "name": name, "github_username": github_username}
+        )
+    rows = list(rows.values())
+
+    # Fetch every user that already exists with one of the emails in a single query
+    existing_by_email = {
+        user.email: user
+        for user in User.objects.filter(email__in={row["email"] for row in rows})
+    }
+
+    # Fetch every user that could clash with a new user's name or github username
+    new_rows = [row for row in rows if row["email"] not in existing_by_email]
+    names = {row["name"] for row in new_rows if row["name"] != ""}
+    github_usernames = {
+        row["github_username"] for row in new_rows if row["github_username"] != ""
+    }
+    users_by_name = defaultdict(list)
+    users_by_github_username = defaultdict(list)
+    if names or github_usernames:
+        for user in User.objects.filter(
+            Q(name__in=names) | Q(github_username__in=github_usernames)
+        ):
+            users_by_name[user.name].append(user)
+            users_by_github_username[user.github_username].append(user)
+
+    for row in rows:
+        if row["email"] in existing_by_email:
+            parsed_users.existing_users.append(existing_by_email[row["email"]])
+            continue
 
-    for index, row in dataframe.iterrows():
         user = User(
             email=row["email"],
             name=row["name"],
             github_username=row["github_username"],
         )
-
-        try:
-            existing_user = User.objects.get(email=user.email)
-            parsed_users.existing_users.append(existing_user)
-        except User.DoesNotExist:
-            # check for existing users with different email but same name or github username
-            if user.name != "":
-                users_matching_name = User.objects.filter(name=user.name)
-                if len(users_matching_name) > 0:
-                    parsed_users.errors.append(
-                        f'Users already exist with name "{user.name}": {users_matching_name}'
-                    )
-            if user.github_username != "":
-                users_matching_github_username = User.objects.filter(
-                    github_username=user.github_username
-                )
-                if len(users_matching_github_username) > 0:
-                    parsed_users.errors.append(
-                        f'Users already exist with github username "{user.github_username}": {users_matching_github_username}'
-                    )
-
-            user.save()
-            parsed_users.new_users.append(user)
+        # imported users log in with GitHub or activate their account to set a password
+        user.set_unusable_password()
+
+        # check for existing users with different email but same name or github username
+        # (including users created earlier in this import)
+        if user.name != "" and users_by_name[user.name]:
+            parsed_users.errors.append(
+                f'Users already exist with name "{user.name}": {users_by_name[user.name]}'
+            )
+        if (
+            user.github_username != ""
+            and users_by_github_username[user.github_username]
+        ):
+            parsed_users.errors.append(
+                f'Users already exist with github username "{user.github_username}": {users_by_github_username[user.github_username]}'
+            )
+
+        # bulk_create doesn't send post_save, so assign activation keys up front
+        if user.requires_activation:
+            user.activation_key = uuid.uuid4()
+
+        users_by_name[user.name].append(user)
+        users_by_github_username[user.github_username].append(user)
+        parsed_users.new_users.append(user)
+
+    parsed_users.num_activation_emails = sum(
+        not user.is_activated for user in parsed_users.new_users
+    )
 
     return parsed_users
 
 
-def parse_orgs(dataframe: pd.DataFrame) -> ParsedOrgs:
+def parse_orgs(org_names: Iterable[str]) -> ParsedOrgs:
+    """
+    Sorts the orgs into new and existing ones by name, without saving anything.
+    """
     parsed_orgs = ParsedOrgs([], [], [])
 
     # drop any rows with the same name, keeps first
-    dataframe = dataframe.drop_duplicates(ignore_index=True, subset=["client_org_name"])
+    names = list(dict.fromkeys(org_names))
 
-    for index, row in dataframe.iterrows():
-        org = ClientOrg(name=row["client_org_name"])
+    existing_by_name = {
+        org.name: org for org in ClientOrg.objects.filter(name__in=names)
+    }
 
-        try:
-            existing_org = ClientOrg.objects.get(name=org.name)
-            parsed_orgs.existing_orgs.append(existing_org)
-        except ClientOrg.DoesNotExist:
-            org.save()
-            parsed_orgs.new_orgs.append(org)
+    for name in names:
+        if name in existing_by_name:
+            parsed_orgs.existing_orgs.append(existing_by_name[name])
+        else:
+            parsed_orgs.new_orgs.append(ClientOrg(name=name))
 
     return parsed_orgs
 
 
-def parse_projects(dataframe: pd.DataFrame) -> ParsedProjects:
+def parse_projects(project_rows: Iterable[ProjectRow]) -> ParsedProjects:
+    """
+    Sorts the projects into new and existing ones by name, without saving anything.
+    """
     parsed_projects = ParsedProjects([], [], [])
 
     # drop any rows with the same name, keeps first
-    dataframe = dataframe.drop_duplicates(ignore_index=True, subset=["project_name"])
+    rows = {}
+    for name, year, term in project_rows:
+        rows.setdefault(
+            name, {"project_name": name, "project_year": year, "project_term": term}
+        )
+    rows = list(rows.values())
 
-    for index, row in dataframe.iterrows():
+    existing_by_name = {
+        project.name: project
+        for project in Project.objects.filter(
+            name__in=[row["project_name"] for row in rows]
+        )
+    }
+
+    for row in rows:
         project = Project(
             name=row["project_name"],
             year=int(row["project_year"]),
@@ -129,128 +235,364 @@ def parse_projects(dataframe: pd.DataFrame) -> ParsedProjects:
             is_published=False,
         )
 
-        try:
-            existing_project = Project.objects.get(name=project.name)
-            parsed_projects.existing_projects.append(existing_project)
-        except Project.DoesNotExist:
-            project.save()
+        if project.name in existing_by_name:
+            parsed_projects.existing_projects.append(existing_by_name[project.name])
+        else:
             parsed_projects.new_projects.append(project)
 
     return parsed_projects
 
 
-def parse_csv(csv_file: UploadedFile) -> CSVData:
-    dataframe = pd.read_csv(csv_file).fillna("")
-
-    students = dataframe[
-        ["student_email", "student_name", "student_github_username"]
-    ].rename(
-        columns={
-            "student_email": "email",
-            "student_name": "name",
-            "student_github_username": "github_username",
-        }
+def lookup(model, field: str, instances: list, keys: set) -> dict:
+    """
+    Maps the values of a unique field to model instances, using the given instances
+    where possible and fetching the rest of the keys from the database in one query.
+    Raises model.DoesNotExist if any of the keys don't exist.
+    """
+    instances_by_key = {getattr(instance, field): instance for instance in instances}
+    missing_keys = keys - instances_by_key.keys()
+    if missing_keys:
+        for instance in model.objects.filter(**{f"{field}__in": missing_keys}):
+            instances_by_key[getattr(instance, field)] = instance
+        if not missing_keys <= instances_by_key.keys():
+            raise model.DoesNotExist(
+                f"{model.__name__} matching {field} does not exist: {missing_keys - instances_by_key.keys()}"
+            )
+    return instances_by_key
+
+
+def resolve_links(data: ImportedData, links: Iterable[LinkRow]):
+    """
+    Sets the orgs, client reps and TAs of the parsed projects, and the students
+    and org reps to add, from the links in memory, without saving anything.
+    Users, orgs and projects that aren't in the parsed data are fetched with a
+    query each.
+    """
+    links = list(links)
+    users_by_email = lookup(
+        User,
+        "email",
+        data.new_users + data.existing_users,
+        {email for link in links for email in link[2:]},
     )
-    client_reps = dataframe[
-        ["client_rep_email", "client_rep_name", "client_rep_github_username"]
-    ].rename(
-        columns={
-            "client_rep_email": "email",
-            "client_rep_name": "name",
-            "client_rep_github_username": "github_username",
-        }
+    orgs_by_name = lookup(
+        ClientOrg,
+        "name",
+        data.new_orgs + data.existing_orgs,
+        {link[1] for link in links},
     )
-    tas = dataframe[["ta_email", "ta_name", "ta_github_username"]].rename(
-        columns={
-            "ta_email": "email",
-            "ta_name": "name",
-            "ta_github_username": "github_username",
-        }
+    projects_by_name = lookup(
+        Project,
+        "name",
+        data.new_projects + data.existing_projects,
+        {link[0] for link in links},
     )
-    client_orgs = dataframe[["client_org_name"]]
-    projects = dataframe[["project_name", "project_year", "project_term"]]
-    links = dataframe[
+
+    # dicts are used as ordered sets
+    linked_projects = {}
+    student_links = {}
+    rep_links = {}
+
+    for project_name, org_name, rep_email, ta_email, student_email in links:
+        project = projects_by_name[project_name]
+        org = orgs_by_name[org_name]
+        rep = users_by_email[rep_email]
+        ta = users_by_email[ta_email]
+        student = users_by_email[student_email]
+
+        # the last row for a project decides its org, client rep and TA
+        project.client_org = org
+        project.client_rep = rep
+        project.ta = ta
+
+        linked_projects[project] = None
+        student_links[(project, student)] = None
+        rep_links[(org, rep)] = None
+
+    data.linked_projects = list(linked_projects)
+    data.student_links = list(student_links)
+    data.rep_links = list(rep_links)
+
+
+def save_data(data: ImportedData):
+    """
+    Saves the new users, orgs and projects and the links resolved by validate_data,
+    using a constant number of queries.
+    """
+    User.objects.bulk_create(data.new_users, batch_size=BATCH_SIZE)
+    User.objects.update_search_vectors([user.id for user in data.new_users])
+
+    # queue all the activation emails with one query,
+    # the email worker then sends them over one connection
+    send_activation_emails([user for user in data.new_users if not user.is_activated])
+
+    ClientOrg.objects.bulk_create(data.new_orgs, batch_size=BATCH_SIZE)
+    ClientOrg.objects.update_search_vectors([org.id for org in data.new_orgs])
+
+    # new projects are created with their links, only existing ones need updating
+    Project.objects.bulk_create(data.new_projects, batch_size=BATCH_SIZE)
+    new_project_ids = {project.id for project in data.new_projects}
+    Project.objects.bulk_update(
         [
-            "project_name",
-            "client_org_name",
-            "client_rep_email",
-            "ta_email",
-            "student_email",
-        ]
-    ]
+            project
+            for project in data.linked_projects
+            if project.id not in new_project_ids
+        ],
+        ["client_org", "client_rep", "ta"],
+        batch_size=BATCH_SIZE,
+    )
+
+    # write the M2M links straight to the through tables, skipping existing links
+    StudentLink = Project.students.through
+    StudentLink.objects.bulk_create(
+        [
+            StudentLink(project_id=project.id, user_id=user.id)
+            for project, user in data.student_links
+        ],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+    RepLink = ClientOrg.reps.through
+    RepLink.objects.bulk_create(
+        [RepLink(clientorg_id=org.id, user_id=user.id) for org, user in data.rep_links],
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
 
-    # combine students, TAs, and client reps into a single users dataframe
-    users = pd.concat([students, tas, client_reps], ignore_index=True).drop_duplicates(
-        ignore_index=True
+    # none of the above send signals, so update the memberships, search vectors
+    # (which include the org name) and updated_at stamps manually
+    linked_project_ids = [project.id for project in data.linked_projects]
+    Membership.objects.refresh(
+        project_ids=linked_project_ids,
+        org_ids=[org.id for org, user in data.rep_links],
+    )
+    Project.objects.update_search_vectors(
+        list(new_project_ids | set(linked_project_ids))
     )
+    Project.objects.mark_updated(linked_project_ids)
+    invalidate_responses()
 
-    return CSVData(users, client_orgs, projects, links)
 
+def parse_csv(
+    csv_file: File,
+    progress: Optional[Callable[[int], None]] = None,
+    progress_interval: int = 1000,
+) -> CSVData:
+    """
+    Reads the rows of the CSV file one at a time, keeping only the distinct users,
+    orgs, projects and links they contain.
+    If given, progress is called with the number of rows read every
+    progress_interval rows, and once all of them are read.
+    """
+    reader = csv.DictReader(codecs.iterdecode(csv_file, "utf-8-sig"), restval="")
+    missing_columns = [
+        column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])
+    ]
+    if missing_columns:
+        raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+
+    # dicts are used as ordered sets, and keep the first row for each key
+    users = {}
+    client_orgs = {}
+    projects = {}
+    links = {}
+    num_rows = 0
+
+    for row in reader:
+        num_rows += 1
+        if progress is not None and num_rows % progress_interval == 0:
+            progress(num_rows)
+
+        for role in ["student", "ta", "client_rep"]:
+            email = row[f"{role}_email"]
+            if email not in users:
+                users[email] = (
+                    email,
+                    row[f"{role}_name"],
+                    row[f"{role}_github_username"],
+                )
+        client_orgs[row["client_org_name"]] = None
+        if row["project_name"] not in projects:
+            projects[row["project_name"]] = (
+                row["project_name"],
+                row["project_year"],
+                row["project_term"],
+            )
+        link = (
+            row["project_name"],
+            row["client_org_name"],
+            row["client_rep_email"],
+            row["ta_email"],
+            row["student_email"],
+        )
+        # move repeated links to the end, as the last row for a project decides
+        # its org, client rep and TA
+        links.pop(link, None)
+        links[link] = None
 
-@transaction.atomic
-def import_data(data: CSVData) -> ImportedData:
+    if progress is not None:
+        progress(num_rows)
+
+    return CSVData(
+        list(users.values()), list(client_orgs), list(projects.values()), list(links)
+    )
+
+
+def validate_data(data: CSVData) -> ImportedData:
+    """
+    Checks the data against the users, orgs and projects in the database, and
+    works out what importing it would create and link, entirely in memory.
+    Only reads from the database, with a constant number of queries.
+    """
     parsed_users = parse_users(data.users)
     parsed_orgs = parse_orgs(data.client_orgs)
     parsed_projects = parse_projects(data.projects)
 
-    warnings = []
-    errors = parsed_users.errors + parsed_orgs.errors + parsed_projects.errors
-    new_projects = []
-    existing_projects = []
-
-    # error parsing CSV, can't go any further
-    if len(errors) > 0:
-        transaction.set_rollback(True)
-    else:
-        for index, row in data.links.iterrows():
-            project = Project.objects.get(name=row["project_name"])
-            org = ClientOrg.objects.get(name=row["client_org_name"])
-            rep = User.objects.get(email=row["client_rep_email"])
-            ta = User.objects.get(email=row["ta_email"])
-            student = User.objects.get(email=row["student_email"])
-
-            project.client_org = org
-            project.client_rep = rep
-            project.ta = ta
-            project.students.add(student)
-            org.reps.add(rep)
-
-            student.save()
-            ta.save()
-            rep.save()
-            org.save()
-            project.save()
-            if project in parsed_projects.new_projects:
-                new_projects.append(project)
-            elif project in parsed_projects.existing_projects:
-                existing_projects.append(project)
-
-    new_projects = list(set(new_projects))
-    existing_projects = list(set(existing_projects))
-
-    return ImportedData(
+    validated_data = ImportedData(
         new_users=parsed_users.new_users,
         existing_users=parsed_users.existing_users,
         new_orgs=parsed_orgs.new_orgs,
         existing_orgs=parsed_orgs.existing_orgs,
-        new_projects=new_projects,
-        existing_projects=existing_projects,
-        errors=errors,
-        warnings=warnings,
+        new_projects=parsed_projects.new_projects,
+        existing_projects=parsed_projects.existing_projects,
+        errors=parsed_users.errors + parsed_orgs.errors + parsed_projects.errors,
+        warnings=[],
+        num_activation_emails=parsed_users.num_activation_emails,
+    )
+
+    # error parsing CSV, can't go any further
+    if len(validated_data.errors) > 0:
+        validated_data.new_projects = []
+        validated_data.existing_projects = []
+    else:
+        resolve_links(validated_data, data.links)
+
+    return validated_data
+
+
+@transaction.atomic
+def import_data(data: CSVData) -> ImportedData:
+    imported_data = validate_data(data)
+    if len(imported_data.errors) == 0:
+        save_data(imported_data)
+    return imported_data
+
+
+def set_prefetched(instance, name: str, objects: Iterable):
+    """
+    Caches the related objects of a many-to-many relationship of the instance the
+    way prefetch_related does, so that instance.<name>.all() returns them
+    without querying, even if the instance or objects aren't saved.
+    """
+    queryset = getattr(instance, name).get_queryset()
+    queryset._result_cache = list(objects)
+    queryset._prefetch_done = True
+    if not hasattr(instance, "_prefetched_objects_cache"):
+        instance._prefetched_objects_cache = {}
+    instance._prefetched_objects_cache[name] = queryset
+
+
+def resolve_relations(data: ImportedData, request: Request) -> dict:
+    """
+    Works out the students and reps of the projects and orgs in the data, the
+    projects of the orgs and the projects of the users by role, as they are once
+    the data is imported, from the database and the links of the data.
+    Returns the projects by (user ID, role), for UserSerializer.
+
+    Gives the same results whether or not the data has been saved, so that
+    validations can show what would be imported, using a constant number of queries.
+    """
+    projects = data.new_projects + data.existing_projects
+    orgs = data.new_orgs + data.existing_orgs
+    linked_project_ids = {project.id for project in data.linked_projects}
+    visible_projects = Project.objects.visible_to(request.user)
+
+    # Students and tags of the projects
+    students = defaultdict(dict)
+    for link in Project.students.through.objects.filter(
+        project__in=[project.id for project in data.existing_projects]
+    ).select_related("user"):
+        students[link.project_id][link.user_id] = link.user
+    for project, user in data.student_links:
+        students[project.id][user.id] = user
+    prefetch_related_objects(data.existing_projects, "tags")
+    for project in data.new_projects:
+        set_prefetched(project, "tags", [])
+    for project in projects:
+        set_prefetched(project, "students", students[project.id].values())
+
+    # Reps and projects of the orgs, linked projects may have moved between orgs
+    existing_org_ids = [org.id for org in data.existing_orgs]
+    reps = defaultdict(dict)
+    for link in ClientOrg.reps.through.objects.filter(
+        clientorg__in=existing_org_ids
+    ).select_related("user"):
+        reps[link.clientorg_id][link.user_id] = link.user
+    for org, user in data.rep_links:
+        reps[org.id][user.id] = user
+    org_projects = defaultdict(dict)
+    for project in ProjectShortSerializer.setup_eager_loading(
+        visible_projects.filter(client_org__in=existing_org_ids).exclude(
+            id__in=linked_project_ids
+        )
+    ):
+        org_projects[project.client_org_id][project.id] = project
+    for project in data.linked_projects:
+        if project.client_org is not None:
+            org_projects[project.client_org.id][project.id] = project
+    for org in orgs:
+        set_prefetched(org, "reps", reps[org.id].values())
+        org.visible_projects = list(org_projects[org.id].values())
+
+    # Projects of the users, the linked projects' memberships are replaced
+    user_projects = defaultdict(dict)
+    memberships = (
+        Membership.objects.filter(
+            user__in=[user.id for user in data.existing_users],
+            project__in=visible_projects,
+        )
+        .exclude(project__in=linked_project_ids)
+        .select_related("project")
+        .prefetch_related("project__tags")
     )
+    for membership in memberships:
+        user_projects[(membership.user_id, membership.role)][
+            membership.project_id
+        ] = membership.project
+    for project in data.linked_projects:
+        for user_id in students[project.id]:
+            user_projects[(user_id, Membership.STUDENT)][project.id] = project
+        for role, user in [
+            (Membership.TA, project.ta),
+            (Membership.CLIENT_REP, project.client_rep),
+        ]:
+            if user is not None:
+                user_projects[(user.id, role)][project.id] = project
+
+    return {key: list(projects.values()) for key, projects in user_projects.items()}
 
 
 def generate_response(data: ImportedData, request: Request) -> dict:
+    """
+    Serializes the new and existing users, orgs and projects of the data as they
+    are once it is imported, whether or not it has been saved.
+    """
+    user_projects = resolve_relations(data, request)
+
+    def serialize_users(users):
+        serializer = UserSerializer(users, many=True, context={"request": request})
+        serializer.child.resolved_projects.update(user_projects)
+        serializer.child.resolved_user_ids.update(user.pk for user in users)
+        return serializer.data
+
     return {
         "errors": data.errors,
         "warnings": data.warnings,
+        # activation emails are sent by the email worker after the import is committed
+        "activation_emails": {"queued": data.num_activation_emails},
         "users": {
-            "new": UserSerializer(
-                data.new_users, many=True, context={"request": request}
-            ).data,
-            "existing": UserSerializer(
-                data.existing_users, many=True, context={"request": request}
-            ).data,
+            "new": serialize_users(data.new_users),
+            "existing": serialize_users(data.existing_users),
         },
         "orgs": {
             "new": ClientOrgSerializer(
@@ -271,11 +613,10 @@ def generate_response(data: ImportedData, request: Request) -> dict:
     }
 
 
-@api_view(["POST"])
-@transaction.atomic
-def validate_csv(request):
+def queue_import_job(request: Request, dry_run: bool) -> Response:
     """
-    Validates a CSV file and returns a list of errors and warnings.
+    Saves the uploaded CSV file to be imported by the run_import_jobs worker.
+    Returns the queued job, whose progress and result are polled from import_job.
     """
     if not request.user.is_superuser:
         return Response(
@@ -285,45 +626,44 @@ def validate_csv(request):
 
     try:
         csv_file = request.FILES["file"]
-        data = parse_csv(csv_file)
-    except Exception:
+    except KeyError:
         return Response(
-            {
-                "errors": [f"Error parsing CSV: {traceback.format_exc()}"],
-                "warnings": [],
-            },
+            {"errors": ["Error parsing CSV: no file was uploaded"], "warnings": []},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    try:
-        imported_data = import_data(data)
-    except Exception:
-        return Response(
-            {
-                "errors": [f"Error importing data: {traceback.format_exc()}"],
-                "warnings": [],
-            },
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    response_body = generate_response(imported_data, request)
-    response_status = (
-        status.HTTP_200_OK
-        if len(imported_data.errors) == 0
-        else status.HTTP_400_BAD_REQUEST
+    job = ImportJob.objects.create(
+        file=csv_file,
+        base_url=request.build_absolute_uri("/"),
+        created_by=request.user,
+        dry_run=dry_run,
     )
+    return Response(ImportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
 
-    # validating, so rollback any changes that were made
-    transaction.set_rollback(True)
 
-    return Response(response_body, status=response_status)
+@api_view(["POST"])
+def validate_csv(request):
+    """
+    Queues a validation of a CSV file, which shows what importing it would do
+    without writing anything.
+    Returns the queued job, whose result will have a list of errors and warnings.
+    """
+    return queue_import_job(request, dry_run=True)
 
 
 @api_view(["POST"])
-@transaction.atomic  # all or nothing, rollback if any database errors occur
 def import_csv(request):
     """
-    Imports a CSV file and returns a list of errors and warnings.
+    Queues an import of a CSV file, in which either everything or nothing is imported.
+    Returns the queued job, whose result will have a list of errors and warnings.
+    """
+    return queue_import_job(request, dry_run=False)
+
+
+@api_view(["GET"])
+def import_job(request, job_id):
+    """
+    Returns the status, progress and result of a validation or import.
     """
     if not request.user.is_superuser:
         return Response(
@@ -331,34 +671,5 @@ def import_csv(request):
             status=status.HTTP_403_FORBIDDEN,
         )
 
-    try:
-        csv_file = request.FILES["file"]
-        data = parse_csv(csv_file)
-    except Exception:
-        return Response(
-            {
-                "errors": [f"Error parsing CSV: {traceback.format_exc()}"],
-                "warnings": [],
-            },
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    try:
-        imported_data = import_data(data)
-    except Exception:
-        return Response(
-            {
-                "errors": [f"Error importing data: {traceback.format_exc()}"],
-                "warnings": [],
-            },
-            status=status.HTTP_400_BAD_REQUEST,
-        )
-
-    response_body = generate_response(imported_data, request)
-    response_status = (
-        status.HTTP_200_OK
-        if len(imported_data.errors) == 0
-        else status.HTTP_400_BAD_REQUEST
-    )
-
-    return Response(response_body, status=response_status)
+    job = get_object_or_404(ImportJob, id=job_id)
+    return Response(ImportJobSerializer(job).data)
@@ -1,11 +1,11 @@
 import logging
 
-import requests
-from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
+from portal.authentication import delete_tokens
 from portal.emails import send_password_reset_email
+from portal.github import GitHubError, github_client
 from portal.models import PasswordResetRequest, User
 from portal.views import CurrentUserInfo
 from rest_framework.authtoken.models import Token
@@ -59,6 +59,15 @@ class LoginView(APIView):
                 status=400,
                 data={"success": False, "error": e.message},
             )
+        except GitHubError as e:
+            logging.warning(e)
+            return Response(
+                status=503,
+                data={
+                    "success": False,
+                    "error": "GitHub is unavailable, please try again later",
+                },
+            )
         except Exception as e:
             logging.exception(e)
             return Response(
@@ -139,16 +148,7 @@ class LoginView(APIView):
         )
 
     def github_api_get_access_token(self, code: str) -> str:
-        access_token_response = requests.post(
-            "https://github.com/login/oauth/access_token",
-            json={
-                "client_id": settings.GITHUB_CLIENT_ID,
-                "client_secret": settings.GITHUB_CLIENT_SECRET,
-                "code": code,
-            },
-            headers={"Accept": "application/json"},
-        )
-        access_token_data = access_token_response.json()
+        access_token_data = github_client.get_access_token(code)
         try:
             access_token = access_token_data["access_token"]
         except KeyError:
@@ -157,12 +157,7 @@ class LoginView(APIView):
         return access_token
 
     def github_api_get_user_info(self, access_token: str) -> dict:
-        github_user_info_response = requests.get(
-            "https://api.github.com/user",
-            headers={"Authorization": f"token {access_token}"},
-        )
-        github_user_info = github_user_info_response.json()
-        return github_user_info
+        return github_client.get_user_info(access_token)
 
 
 def activate(request: Request, user: User, password: str) -> Response:
@@ -268,7 +263,7 @@ class ResetPasswordView(APIView):
         user.save()
 
         # Try to delete the token for the user so existing sessions are invalidated
-        Token.objects.filter(user=user).delete()
+        delete_tokens(user)
 
         # Log the user in with their new token
         request.user = user
@@ -361,7 +356,7 @@ class RequestPasswordResetView(APIView):
             super().__init__(data={"success": True})
             self.email = email
 
-        def close(self):
+        def request_password_reset(self):
             """
             If the user exists, generate a ResetPasswordToken and email them a link to
             reset their password.
@@ -382,6 +377,14 @@ class RequestPasswordResetView(APIView):
             # Email the user a link to reset their password
             send_password_reset_email(user, reset_request)
 
+        def close(self):
+            try:
+                self.request_password_reset()
+            finally:
+                # Sends request_finished, which closes or returns the database
+                # connection of the thread handling the request
+                super().close()
+
     def post(self, request):
         try:
             return self.RequestPasswordResetResponse(request.data["email"])
@@ -414,7 +417,7 @@ class InvalidateOtherSessionsView(APIView):
             )
 
         # Invalidate all other sessions
-        Token.objects.filter(user=request.user).delete()
+        delete_tokens(request.user)
 
         # Log the user in with their new token
         return successful_login_response(request)
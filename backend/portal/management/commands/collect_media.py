@@ -0,0 +1,108 @@
+import posixpath
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.utils import timezone
+from portal.images import DERIVATIVES_DIR, FORMATS, IMAGE_FIELDS, variants_field
+from portal.storage import ContentAddressedStorage
+
+
+def content_addressed_fields() -> list:
+    """
+    Returns the models and file fields stored in the content-addressed storage.
+    """
+    return [
+        (model, field)
+        for model in apps.get_models()
+        for field in model._meta.get_fields()
+        if isinstance(field, models.FileField)
+        and isinstance(field.storage, ContentAddressedStorage)
+    ]
+
+
+def referenced_names() -> set:
+    """
+    Returns the names of the files referenced by any instance, including the
+    derivatives of images.
+    """
+    names = set()
+    for model, field in content_addressed_fields():
+        names.update(
+            model.objects.exclude(**{field.name: ""})
+            .exclude(**{f"{field.name}__isnull": True})
+            .values_list(field.name, flat=True)
+        )
+    for model, field in IMAGE_FIELDS:
+        for variants in model.objects.exclude(
+            **{variants_field(field): {}}
+        ).values_list(variants_field(field), flat=True):
+            for sizes in variants.get("variants", {}).values():
+                names.update(sizes[extension] for extension in FORMATS)
+    return names
+
+
+def stored_names(directory: str):
+    """
+    Yields the names of the files in the directory of the storage and its
+    subdirectories.
+    """
+    if not default_storage.exists(directory):
+        return
+    subdirectories, files = default_storage.listdir(directory)
+    for file in files:
+        yield posixpath.join(directory, file)
+    for subdirectory in subdirectories:
+        yield from stored_names(posixpath.join(directory, subdirectory))
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the uploaded files and image derivatives that are no longer "
+        "referenced by any instance."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help=(
+                "Hours since a file was last saved before it can be deleted, so that "
+                "files saved for instances that aren't saved yet are kept."
+            ),
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the files that would be deleted without deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        directories = {
+            field.upload_to.rstrip("/") for _, field in content_addressed_fields()
+        } | {DERIVATIVES_DIR}
+        referenced = referenced_names()
+        cutoff = timezone.now() - timezone.timedelta(hours=options["min_age"])
+
+        num_deleted = 0
+        num_bytes = 0
+        for directory in sorted(directories):
+            for name in stored_names(directory):
+                if (
+                    name in referenced
+                    or default_storage.get_modified_time(name) > cutoff
+                ):
+                    continue
+                num_deleted += 1
+                num_bytes += default_storage.size(name)
+                if options["dry_run"]:
+                    self.stdout.write(name)
+                else:
+                    default_storage.delete_unreferenced(name)
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            f"{verb} {num_deleted} unreferenced files ({num_bytes / 1e6:.1f} MB)"
+        )
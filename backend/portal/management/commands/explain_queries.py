@@ -0,0 +1,96 @@
+import uuid
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from portal.models import (
+    ClientOrg,
+    Membership,
+    PasswordResetRequest,
+    Project,
+    Tag,
+    User,
+)
+from portal.pagination import ProjectPagination
+
+
+def canonical_queries() -> dict:
+    """
+    Returns the portal's most frequent queries by name, with sample values
+    taken from the database where possible.
+    """
+    project = Project.objects.order_by("-year").first()
+    year, term = (project.year, project.term) if project else (2022, "F")
+    org_id = ClientOrg.objects.values_list("id", flat=True).first() or uuid.uuid4()
+    user = User.objects.exclude(github_username="").first()
+    github_username = user.github_username if user else "octocat"
+    name = user.name if user else "Name"
+    email = user.email if user else "user@example.com"
+
+    # A page of the projects visible to anonymous users, as ordered by default
+    ordering = [
+        f"-{field}" if descending else field
+        for field, descending in ProjectPagination.orderings["-year"]
+    ]
+    published = ProjectPagination().prepare_queryset(
+        Project.objects.visible_to(AnonymousUser())
+    )
+
+    return {
+        "published_projects": published.order_by(*ordering)[:20],
+        "home_page_projects": Project.objects.filter(
+            is_published=True, display_on_home_page=True
+        ),
+        "projects_by_year_and_term": Project.objects.filter(year=year, term=term),
+        "projects_of_org": Project.objects.filter(client_org=org_id),
+        "users_by_year_term_and_role": User.objects.filter(
+            id__in=Membership.objects.filter(
+                year=year, term=term, role=Membership.STUDENT
+            ).values("user")
+        ),
+        "user_by_github_username": User.objects.filter(
+            github_username=github_username, github_user_id__isnull=True
+        ),
+        "users_by_name": User.objects.filter(name__in=[name]),
+        "users_by_email_prefix": User.objects.filter(
+            email__istartswith=email[: len(email) // 2]
+        ),
+        "projects_by_name_prefix": Project.objects.filter(
+            name__istartswith=project.name[:3] if project else "CMPUT"
+        ),
+        "tag_by_value": Tag.objects.filter(value__iexact="python"),
+        "unusable_reset_requests": PasswordResetRequest.objects.filter(
+            Q(created_at__lt=timezone.now() - PasswordResetRequest.VALID_DURATION)
+            | Q(used_at__isnull=False)
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Shows the plans and timings of the portal's most frequent queries "
+        "with EXPLAIN ANALYZE, to check that they use the expected indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help="Names of the queries to explain, all of them by default.",
+        )
+
+    def handle(self, *args, **options):
+        queries = canonical_queries()
+        names = options["names"] or list(queries)
+        unknown = set(names) - set(queries)
+        if unknown:
+            raise CommandError(
+                f"Unknown queries: {', '.join(sorted(unknown))}. "
+                f"Choose from: {', '.join(queries)}"
+            )
+
+        for name in names:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(queries[name].explain(analyze=True))
+            self.stdout.write("")
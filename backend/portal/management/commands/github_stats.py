@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from portal.github import github_stats, reset_github_stats
+
+
+class Command(BaseCommand):
+    help = "Shows the number, failures and latency of calls to GitHub."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the counts after showing them.",
+        )
+
+    def handle(self, *args, **options):
+        for endpoint, stats in github_stats().items():
+            average_ms = stats["average_ms"]
+            self.stdout.write(
+                f'{endpoint}: {stats["calls"]} calls, {stats["failures"]} failed, '
+                + (f"{average_ms:.0f} ms average" if average_ms is not None else "-")
+            )
+        if options["reset"]:
+            reset_github_stats()
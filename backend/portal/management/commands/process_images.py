@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from portal.images import process_images
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates the derivatives of uploaded images. "
+        "Runs until stopped unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the images without derivatives and exit.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait before checking for new images.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            num_processed = process_images()
+            if num_processed:
+                self.stdout.write(
+                    f"Processed {num_processed} images "
+                    f"in {time.monotonic() - start:.2f}s"
+                )
+
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
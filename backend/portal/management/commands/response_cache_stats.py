@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from portal.response_cache import reset_response_cache_stats, response_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Shows the hit rate of the cache of responses for anonymous users."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Reset the hit and miss counts after showing them.",
+        )
+
+    def handle(self, *args, **options):
+        stats = response_cache_stats()
+        hit_rate = stats["hit_rate"]
+        self.stdout.write(f'Hits: {stats["hits"]}')
+        self.stdout.write(f'Misses: {stats["misses"]}')
+        self.stdout.write(
+            f"Hit rate: {hit_rate:.1%}" if hit_rate is not None else "Hit rate: -"
+        )
+        if options["reset"]:
+            reset_response_cache_stats()
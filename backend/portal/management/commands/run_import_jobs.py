@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+from portal.import_jobs import run_import_jobs
+
+
+class Command(BaseCommand):
+    help = "Runs the queued CSV imports. Runs until stopped unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the queued imports and exit.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1,
+            help="Seconds to wait before checking for new imports when there are none.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            num_run = run_import_jobs()
+            if num_run:
+                self.stdout.write(
+                    f"Ran {num_run} imports in {time.monotonic() - start:.2f}s"
+                )
+
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
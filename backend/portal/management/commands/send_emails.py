@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+from portal.emails import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = "Sends the queued emails. Runs until stopped unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send the emails that are due and exit.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10,
+            help="Seconds to wait before checking for new emails when there are none.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Maximum number of emails to send over one connection.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.monotonic()
+            num_sent = send_queued_emails(options["batch_size"])
+            if num_sent:
+                duration = time.monotonic() - start
+                self.stdout.write(
+                    f"Sent {num_sent} emails in {duration:.2f}s"
+                    f" ({num_sent / duration:.1f} emails/s)"
+                )
+
+            if num_sent < options["batch_size"]:
+                # Everything that is due was tried
+                if options["once"]:
+                    return
+                time.sleep(options["interval"])
@@ -0,0 +1,121 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_memberships(apps, schema_editor):
+    Project = apps.get_model("portal", "Project")
+    ClientOrg = apps.get_model("portal", "ClientOrg")
+    Membership = apps.get_model("portal", "Membership")
+
+    memberships = []
+    for project in Project.objects.all():
+        if project.ta_id is not None:
+            memberships.append(
+                Membership(
+                    user_id=project.ta_id,
+                    project_id=project.id,
+                    client_org_id=project.client_org_id,
+                    role="TA",
+                )
+            )
+        if project.client_rep_id is not None:
+            memberships.append(
+                Membership(
+                    user_id=project.client_rep_id,
+                    project_id=project.id,
+                    client_org_id=project.client_org_id,
+                    role="CR",
+                )
+            )
+    for student in Project.students.through.objects.select_related("project"):
+        memberships.append(
+            Membership(
+                user_id=student.user_id,
+                project_id=student.project_id,
+                client_org_id=student.project.client_org_id,
+                role="ST",
+            )
+        )
+    for rep in ClientOrg.reps.through.objects.all():
+        memberships.append(
+            Membership(user_id=rep.user_id, client_org_id=rep.clientorg_id, role="OR")
+        )
+    Membership.objects.bulk_create(memberships)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0017_merge_20211122_2050"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Membership",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "role",
+                    models.CharField(
+                        choices=[
+                            ("ST", "Student"),
+                            ("TA", "TA"),
+                            ("CR", "Client Rep"),
+                            ("OR", "Org Rep"),
+                        ],
+                        max_length=2,
+                    ),
+                ),
+                (
+                    "client_org",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="portal.clientorg",
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to="portal.project",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="memberships",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="membership",
+            index=models.Index(
+                fields=["user", "project"], name="portal_memb_user_id_096aa8_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="membership",
+            index=models.Index(
+                fields=["user", "client_org"], name="portal_memb_user_id_7ed4c5_idx"
+            ),
+        ),
+        migrations.RunPython(populate_memberships, migrations.RunPython.noop),
+    ]
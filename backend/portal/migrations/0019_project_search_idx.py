@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:08
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0018_membership"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="project",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.search.SearchVector(
+                    "name", "tagline", "summary", config="english"
+                ),
+                name="project_search_idx",
+            ),
+        ),
+    ]
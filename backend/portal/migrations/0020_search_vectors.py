@@ -0,0 +1,96 @@
+# Generated by Django 3.2.25 on 2026-10-17 18:11
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def populate_search_vectors(apps, schema_editor):
+    User = apps.get_model("portal", "User")
+    ClientOrg = apps.get_model("portal", "ClientOrg")
+    Project = apps.get_model("portal", "Project")
+
+    User.objects.update(
+        search_vector=SearchVector("name", weight="A", config="english")
+        + SearchVector("github_username", weight="B", config="english")
+        + SearchVector("bio", weight="C", config="english")
+    )
+    ClientOrg.objects.update(
+        search_vector=SearchVector("name", weight="A", config="english")
+        + SearchVector("about", weight="C", config="english")
+    )
+    tags = (
+        Project.tags.through.objects.filter(project=OuterRef("pk"))
+        .values("project")
+        .annotate(values=StringAgg("tag__value", delimiter=" "))
+        .values("values")
+    )
+    org_name = ClientOrg.objects.filter(id=OuterRef("client_org")).values("name")
+    Project.objects.update(
+        search_vector=SearchVector("name", weight="A", config="english")
+        + SearchVector(
+            "tagline",
+            Subquery(tags),
+            Subquery(org_name),
+            weight="B",
+            config="english",
+        )
+        + SearchVector("summary", weight="C", config="english")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0019_project_search_idx"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="project",
+            name="project_search_idx",
+        ),
+        migrations.AddField(
+            model_name="clientorg",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="clientorg",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="portal_clie_search__8db47c_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="portal_proj_search__d5b74a_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="portal_user_search__d5d27f_gin"
+            ),
+        ),
+        migrations.RunPython(populate_search_vectors, migrations.RunPython.noop),
+    ]
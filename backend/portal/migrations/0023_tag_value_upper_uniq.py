@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+def merge_duplicate_tags(apps, schema_editor):
+    """
+    Merges tags whose values only differ by case into the oldest one,
+    so that the unique index on UPPER(value) can be created.
+    """
+    Tag = apps.get_model("portal", "Tag")
+    Through = apps.get_model("portal", "Project").tags.through
+
+    kept_tags = {}
+    for tag in Tag.objects.annotate(upper_value=Upper("value")).order_by("id"):
+        kept = kept_tags.setdefault(tag.upper_value, tag)
+        if kept.id == tag.id:
+            continue
+        Through.objects.bulk_create(
+            [
+                Through(project_id=project_id, tag_id=kept.id)
+                for project_id in Through.objects.filter(tag=tag).values_list(
+                    "project_id", flat=True
+                )
+            ],
+            ignore_conflicts=True,
+        )
+        tag.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0022_outgoing_email"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_tags, migrations.RunPython.noop),
+        migrations.RunSQL(
+            "CREATE UNIQUE INDEX tag_value_upper_uniq ON portal_tag (UPPER(value));",
+            "DROP INDEX tag_value_upper_uniq;",
+        ),
+    ]
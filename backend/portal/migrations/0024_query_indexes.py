@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0023_tag_value_upper_uniq"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="passwordresetrequest",
+            index=models.Index(fields=["created_at"], name="reset_request_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="passwordresetrequest",
+            index=models.Index(
+                condition=models.Q(("used_at__isnull", False)),
+                fields=["used_at"],
+                name="reset_request_used_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["is_published", "display_on_home_page"],
+                name="project_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(fields=["year", "term"], name="project_year_term_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["name"], name="portal_user_name_c50756_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                fields=["github_username"], name="portal_user_github__a54676_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:26
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def populate_years_and_terms(apps, schema_editor):
+    Project = apps.get_model("portal", "Project")
+    Membership = apps.get_model("portal", "Membership")
+
+    projects = Project.objects.filter(id=OuterRef("project"))
+    Membership.objects.filter(project__isnull=False).update(
+        year=Subquery(projects.values("year")),
+        term=Subquery(projects.values("term")),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0025_import_job"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="membership",
+            name="term",
+            field=models.CharField(blank=True, max_length=50),
+        ),
+        migrations.AddField(
+            model_name="membership",
+            name="year",
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="membership",
+            index=models.Index(
+                fields=["year", "term", "role", "user"], name="membership_year_term_idx"
+            ),
+        ),
+        migrations.RunPython(populate_years_and_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0026_membership_year_term"),
+    ]
+
+    # Admin searches by prefix filter on UPPER(column::text) LIKE 'PREFIX%', which
+    # these expression indexes match. text_pattern_ops makes LIKE usable whatever
+    # the database's collation is.
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX user_email_upper_prefix_idx "
+            "ON portal_user (UPPER(email::text) text_pattern_ops);",
+            "DROP INDEX user_email_upper_prefix_idx;",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX project_name_upper_prefix_idx "
+            "ON portal_project (UPPER(name::text) text_pattern_ops);",
+            "DROP INDEX project_name_upper_prefix_idx;",
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0027_admin_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clientorg",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="logo_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="project",
+            name="screenshot_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
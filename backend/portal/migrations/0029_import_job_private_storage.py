@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-17 19:40
+
+import portal.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0028_image_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="importjob",
+            name="file",
+            field=models.FileField(
+                storage=portal.storage.private_storage, upload_to="imports/"
+            ),
+        ),
+    ]
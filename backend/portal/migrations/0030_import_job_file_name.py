@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-17 20:14
+
+import portal.models
+import portal.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("portal", "0029_import_job_private_storage"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="importjob",
+            name="file",
+            field=models.FileField(
+                storage=portal.storage.private_storage,
+                upload_to=portal.models.import_file_name,
+            ),
+        ),
+    ]
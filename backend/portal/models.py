@@ -3,18 +3,58 @@ import uuid
 from django.contrib.auth import get_user_model
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
-from django.db.models.signals import post_save
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 from django.template.defaultfilters import truncatechars
 from django.utils import timezone
 
+from .authentication import uncache_tokens
 from .emails import send_activation_email
+from .response_cache import invalidate_responses
+from .storage import private_storage
+
+# Text search configuration used for full-text search
+SEARCH_CONFIG = "english"
+
+
+def fields_changed(update_fields, fields) -> bool:
+    """
+    Returns True if a save with the specified update_fields may have changed
+    any of the specified fields.
+    """
+    return update_fields is None or not set(update_fields).isdisjoint(fields)
 
 
 class UserManager(BaseUserManager):
     use_in_migrations = True
 
+    # Fields that make up the search vector of a user
+    SEARCH_FIELDS = ["name", "github_username", "bio"]
+
+    def update_search_vectors(self, ids):
+        """
+        Recomputes the search vectors of the specified users.
+        Must be called after changing their searched fields in ways that don't send
+        signals, such as bulk_create and queryset.update.
+        """
+        self.filter(id__in=ids).update(
+            search_vector=SearchVector("name", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("github_username", weight="B", config=SEARCH_CONFIG)
+            + SearchVector("bio", weight="C", config=SEARCH_CONFIG)
+        )
+
     def create_user(self, email, password, **extra_fields):
         """Creates, saves and returns a User."""
         user = self.model(email=self.normalize_email(email), **extra_fields)
@@ -40,6 +80,8 @@ class User(AbstractUser):
 
     # Fields
     # Set email field as username field
+    # Also searched by prefix in the admin, using the user_email_upper_prefix_idx index
+    # on UPPER(email) (created in migration 0027 as it needs an operator class)
     email = models.EmailField(unique=True)
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = []
@@ -48,56 +90,116 @@ class User(AbstractUser):
     name = models.CharField(max_length=90)
     bio = models.TextField(blank=True)
     image = models.ImageField(null=True, blank=True, upload_to=("users/user_image/"))
+    # Derivatives of the image, generated by the process_images worker, see images.py
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     website_link = models.URLField(blank=True)
     linkedin_link = models.URLField(blank=True)
     github_username = models.CharField(max_length=60, blank=True)
     github_user_id = models.CharField(max_length=35, null=True, blank=True, unique=True)
     activation_key = models.UUIDField(null=True, unique=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Last time the instance or anything included in its API representation changed
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            # Import looks up existing users by name and GitHub username,
+            # and GitHub logins look up users by GitHub username
+            models.Index(fields=["name"]),
+            models.Index(fields=["github_username"]),
+        ]
 
     def is_student_of(self, project):
-        return self in project.students.all()
+        return project.students.filter(pk=self.pk).exists()
 
     def is_rep_of(self, org):
-        return self in org.reps.all()
+        return org.reps.filter(pk=self.pk).exists()
 
     @property
     def is_activated(self):
         return self.activation_key is None
 
+    @property
+    def requires_activation(self):
+        """
+        True if the user has no password or GitHub username to log in with,
+        so they need an activation key and activation email.
+        """
+        return not self.has_usable_password() and not self.github_username
+
     def __str__(self):
         return f'<{self.__class__.__name__} id="{self.id}" email="{self.email}" name="{self.name}" github_username="{self.github_username}">'
 
 
+@receiver(pre_save, sender=User)
+def user_pre_save(sender, instance, raw, **kwargs):
+    """
+    Called before a User instance is saved.
+    """
+    if (
+        instance._state.adding
+        and not raw
+        and instance.is_activated
+        and instance.requires_activation
+    ):
+        # User has no password or GitHub username, so generate an activation key
+        # (before saving, to save the user only once)
+        instance.activation_key = uuid.uuid4()
+
+
 @receiver(post_save, sender=User)
-def user_post_save(sender, instance, created, **kwargs):
+def user_post_save(sender, instance, created, raw, update_fields, **kwargs):
     """
     Called after a User instance is saved.
     """
-    if created:
-        # User is newly-created
-        if not instance.has_usable_password() and not instance.github_username:
-            # User has no password or GitHub username, so generate an activation key and send an activation email
-            instance.activation_key = uuid.uuid4()
-            instance.save()
-            send_activation_email(instance)
+    if fields_changed(update_fields, User.objects.SEARCH_FIELDS):
+        User.objects.update_search_vectors([instance.id])
+
+    if created and not raw and not instance.is_activated:
+        # User is newly-created without a password or GitHub username, so send an activation email
+        send_activation_email(instance)
+
+    if not created:
+        # Requests must not be authenticated as the user from before the change,
+        # in case they were deactivated
+        uncache_tokens([instance.id])
 
 
 class ClientOrgManager(models.Manager):
+    # Fields that make up the search vector of an org
+    SEARCH_FIELDS = ["name", "about"]
+
+    def update_search_vectors(self, ids):
+        """
+        Recomputes the search vectors of the specified orgs.
+        Must be called after changing their searched fields in ways that don't send
+        signals, such as bulk_create and queryset.update.
+        """
+        self.filter(id__in=ids).update(
+            search_vector=SearchVector("name", weight="A", config=SEARCH_CONFIG)
+            + SearchVector("about", weight="C", config=SEARCH_CONFIG)
+        )
+
     # Defines which client orgs are visible to current user
     def visible_to(self, user):
         # Admins can see all orgs
         if user.is_superuser:
             return self.all()
 
-        projects = Project.objects.visible_to(user)
-        visible = self.filter(id__in=projects.values("client_org"))
+        visible = Q(
+            id__in=Project.objects.filter(is_published=True).values("client_org")
+        )
 
-        # Anons can only see projects visible to them
+        # Anons can only see orgs of published projects
         if user.is_anonymous:
-            return visible
+            return self.filter(visible)
 
-        # Everyone else sees visible projects and any they are the rep of
-        return (visible | self.filter(reps=user)).distinct("id")
+        # Everyone else sees orgs of published projects and any orgs they have a role in
+        return self.filter(
+            visible
+            | Q(id__in=Membership.objects.filter(user=user).values("client_org"))
+        )
 
 
 class ClientOrg(models.Model):
@@ -119,10 +221,18 @@ class ClientOrg(models.Model):
     image = models.ImageField(
         null=True, blank=True, upload_to=("client_orgs/org_image/")
     )
+    # Derivatives of the image, generated by the process_images worker, see images.py
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     website_link = models.URLField(blank=True)
     type = models.CharField(max_length=60, choices=CLIENT_TYPES, default="OTH")
     reps = models.ManyToManyField(get_user_model(), blank=True)
     testimonial = models.TextField(blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Last time the instance or anything included in its API representation changed
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [GinIndex(fields=["search_vector"])]
 
     def __str__(self):
         return f'<{self.__class__.__name__} id="{self.id}" name="{self.name}">'
@@ -136,6 +246,8 @@ class MailingList(models.Model):
 
 
 class Tag(models.Model):
+    # Also unique case-insensitively, by the tag_value_upper_uniq index on UPPER(value)
+    # (created in migration 0023 as unique expression constraints need Django 4.0)
     value = models.CharField(max_length=25, unique=True)
 
     def __str__(self):
@@ -143,21 +255,66 @@ class Tag(models.Model):
 
 
 class ProjectManager(models.Manager):
+    # Fields that make up the search vector of a project,
+    # besides the values of its tags and the name of its client org
+    SEARCH_FIELDS = ["name", "tagline", "summary", "client_org"]
+
+    def update_search_vectors(self, ids):
+        """
+        Recomputes the search vectors of the specified projects.
+        Must be called after changing their searched fields, tags or client org name
+        in ways that don't send signals, such as bulk_create and queryset.update.
+        """
+        tags = (
+            Project.tags.through.objects.filter(project=OuterRef("pk"))
+            .values("project")
+            .annotate(values=StringAgg("tag__value", delimiter=" "))
+            .values("values")
+        )
+        org_name = ClientOrg.objects.filter(id=OuterRef("client_org")).values("name")
+        self.filter(id__in=ids).update(
+            search_vector=SearchVector("name", weight="A", config=SEARCH_CONFIG)
+            + SearchVector(
+                "tagline",
+                Subquery(tags),
+                Subquery(org_name),
+                weight="B",
+                config=SEARCH_CONFIG,
+            )
+            + SearchVector("summary", weight="C", config=SEARCH_CONFIG)
+        )
+
+    def mark_updated(self, ids):
+        """
+        Bumps the updated_at stamps of the specified projects and of the client orgs
+        and users whose API representations include them.
+        Must be called after changing the projects or anything included in their
+        representations in ways that don't update the stamps, such as
+        queryset.update and M2M changes.
+        """
+        now = timezone.now()
+        memberships = Membership.objects.filter(project__in=ids)
+        self.filter(id__in=ids).update(updated_at=now)
+        ClientOrg.objects.filter(
+            Q(projects__in=ids) | Q(id__in=memberships.values("client_org"))
+        ).update(updated_at=now)
+        get_user_model().objects.filter(id__in=memberships.values("user")).update(
+            updated_at=now
+        )
+
     def visible_to(self, user):
         if user.is_superuser:
             return self.all()
 
-        published = self.filter(is_published=True)
+        published = Q(is_published=True)
 
         if user.is_anonymous:
-            return published
+            return self.filter(published)
 
-        return (
-            published
-            | self.filter(students__in=[user])
-            | self.filter(ta=user)
-            | self.filter(client_rep=user)
-        ).distinct("id")
+        # Users also see the projects they are a student, TA or client rep of
+        return self.filter(
+            published | Q(id__in=Membership.objects.filter(user=user).values("project"))
+        )
 
 
 class Project(models.Model):
@@ -186,6 +343,8 @@ class Project(models.Model):
     client_org = models.ForeignKey(
         ClientOrg, on_delete=models.CASCADE, null=True, related_name="projects"
     )
+    # Also searched by prefix in the admin, using the project_name_upper_prefix_idx
+    # index on UPPER(name) (created in migration 0027 as it needs an operator class)
     name = models.CharField(
         max_length=80, unique=True
     )  # unique because it's used as a primary key for the CSV import
@@ -201,6 +360,9 @@ class Project(models.Model):
     screenshot = models.ImageField(
         null=True, blank=True, upload_to=("projects/screenshot/")
     )
+    # Derivatives of the screenshot, generated by the process_images worker,
+    # see images.py
+    screenshot_variants = models.JSONField(default=dict, blank=True, editable=False)
     presentation = models.URLField(blank=True)
     review = models.TextField(blank=True)
     website_url = models.URLField(blank=True)
@@ -209,12 +371,370 @@ class Project(models.Model):
     logo_image = models.ImageField(
         null=True, blank=True, upload_to=("projects/logo_image/")
     )
+    # Derivatives of the logo image, generated by the process_images worker,
+    # see images.py
+    logo_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     storyboard = models.URLField(blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Last time the instance or anything included in its API representation changed
+    updated_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+            # Published and home page listings
+            models.Index(
+                fields=["is_published", "display_on_home_page"],
+                name="project_published_idx",
+            ),
+            # Filtering by year and term, and pages ordered by year
+            models.Index(fields=["year", "term"], name="project_year_term_idx"),
+        ]
 
     def __str__(self):
         return f'<{self.__class__.__name__} id="{self.id}" name="{self.name}">'
 
 
+class MembershipManager(models.Manager):
+    def refresh(self, project_ids=(), org_ids=()):
+        """
+        Rebuilds the student, TA and client rep memberships of the specified projects
+        and the rep memberships of the specified client orgs from their current state.
+        Must be called after changing these relationships in ways that don't send
+        signals, such as bulk_create, bulk_update and queryset.update.
+        """
+        memberships = []
+
+        if project_ids:
+            self.filter(project__in=project_ids).delete()
+
+            for project in Project.objects.filter(id__in=project_ids).values(
+                "id", "ta", "client_rep", "client_org", "year", "term"
+            ):
+                for role, user_id in [
+                    (Membership.TA, project["ta"]),
+                    (Membership.CLIENT_REP, project["client_rep"]),
+                ]:
+                    if user_id is not None:
+                        memberships.append(
+                            self.model(
+                                user_id=user_id,
+                                project_id=project["id"],
+                                client_org_id=project["client_org"],
+                                role=role,
+                                year=project["year"],
+                                term=project["term"],
+                            )
+                        )
+
+            students = Project.students.through.objects.filter(
+                project__in=project_ids
+            ).values_list(
+                "user",
+                "project",
+                "project__client_org",
+                "project__year",
+                "project__term",
+            )
+            for user_id, project_id, org_id, year, term in students:
+                memberships.append(
+                    self.model(
+                        user_id=user_id,
+                        project_id=project_id,
+                        client_org_id=org_id,
+                        role=Membership.STUDENT,
+                        year=year,
+                        term=term,
+                    )
+                )
+
+        if org_ids:
+            self.filter(client_org__in=org_ids, role=Membership.ORG_REP).delete()
+
+            reps = ClientOrg.reps.through.objects.filter(
+                clientorg__in=org_ids
+            ).values_list("user", "clientorg")
+            for user_id, org_id in reps:
+                memberships.append(
+                    self.model(
+                        user_id=user_id, client_org_id=org_id, role=Membership.ORG_REP
+                    )
+                )
+
+        self.bulk_create(memberships)
+
+
+class Membership(models.Model):
+    """
+    A role a user has on a project or client org, denormalized from the project's
+    students, TA and client rep and the org's reps so that the projects and orgs
+    visible to a user can be found with a single indexed lookup.
+    Project memberships also copy the project's year and term, so that users can
+    be filtered by the role, year and term they worked on a project.
+    Kept up to date by signals, don't modify directly.
+    """
+
+    objects = MembershipManager()
+
+    STUDENT = "ST"
+    TA = "TA"
+    CLIENT_REP = "CR"
+    ORG_REP = "OR"
+    ROLE_CHOICES = [
+        (STUDENT, "Student"),
+        (TA, "TA"),
+        (CLIENT_REP, "Client Rep"),
+        (ORG_REP, "Org Rep"),
+    ]
+
+    user = models.ForeignKey(
+        get_user_model(), on_delete=models.CASCADE, related_name="memberships"
+    )
+    # null for org reps, who aren't tied to a project
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, null=True, related_name="memberships"
+    )
+    client_org = models.ForeignKey(
+        ClientOrg, on_delete=models.CASCADE, null=True, related_name="memberships"
+    )
+    role = models.CharField(max_length=2, choices=ROLE_CHOICES)
+    # null and blank for org reps
+    year = models.PositiveBigIntegerField(null=True)
+    term = models.CharField(max_length=50, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "project"]),
+            models.Index(fields=["user", "client_org"]),
+            # Filtering users by year, term and role in the admin
+            models.Index(
+                fields=["year", "term", "role", "user"], name="membership_year_term_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f'<{self.__class__.__name__} user="{self.user_id}" project="{self.project_id}" client_org="{self.client_org_id}" role="{self.role}">'
+
+
+@receiver(post_save, sender=Project)
+def project_post_save(sender, instance, update_fields, **kwargs):
+    """
+    Called after a Project instance is saved. Its TA, client rep, org, year or term
+    may have changed.
+    """
+    # Before refreshing the memberships, so that a previous org is marked as well
+    Project.objects.mark_updated([instance.id])
+    if fields_changed(
+        update_fields, ["ta", "client_rep", "client_org", "year", "term"]
+    ):
+        Membership.objects.refresh(project_ids=[instance.id])
+    if fields_changed(update_fields, Project.objects.SEARCH_FIELDS):
+        Project.objects.update_search_vectors([instance.id])
+
+
+@receiver(post_save, sender=ClientOrg)
+def client_org_post_save(sender, instance, created, update_fields, **kwargs):
+    """
+    Called after a ClientOrg instance is saved.
+    Its name is part of the search vectors of its projects
+    and it's shown in the representations of its projects.
+    """
+    if fields_changed(update_fields, ClientOrg.objects.SEARCH_FIELDS):
+        ClientOrg.objects.update_search_vectors([instance.id])
+        if not created:
+            Project.objects.update_search_vectors(instance.projects.values("id"))
+    if not created and fields_changed(
+        update_fields, ["name", "image", "image_variants", "type"]
+    ):
+        Project.objects.mark_updated(instance.projects.values("id"))
+
+
+@receiver(post_save, sender=Tag)
+def tag_post_save(sender, instance, created, **kwargs):
+    """
+    Called after a Tag instance is saved. Its value is part of the search vectors
+    and representations of its projects.
+    """
+    if not created:
+        Project.objects.update_search_vectors(instance.project_set.values("id"))
+        Project.objects.mark_updated(instance.project_set.values("id"))
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_pre_delete(sender, instance, **kwargs):
+    # The tag's links to its projects are gone after it's deleted, so remember them
+    instance.deleted_project_ids = list(
+        instance.project_set.values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Tag)
+def tag_post_delete(sender, instance, **kwargs):
+    project_ids = getattr(instance, "deleted_project_ids", [])
+    Project.objects.update_search_vectors(project_ids)
+    Project.objects.mark_updated(project_ids)
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+def project_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Called before and after tags are added to or removed from a project.
+    """
+    if reverse and action == "pre_clear":
+        # A tag is being removed from all of its projects, remember which ones
+        instance.cleared_project_ids = list(
+            instance.project_set.values_list("id", flat=True)
+        )
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    if not reverse:
+        project_ids = [instance.id]
+    elif action == "post_clear":
+        project_ids = getattr(instance, "cleared_project_ids", [])
+    else:
+        project_ids = pk_set
+    Project.objects.update_search_vectors(project_ids)
+    Project.objects.mark_updated(project_ids)
+
+
+@receiver(m2m_changed, sender=Project.students.through)
+def project_students_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Called after students are added to or removed from a project.
+    """
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    if not reverse:
+        Membership.objects.refresh(project_ids=[instance.id])
+    elif action == "post_clear":
+        # A user was removed from all of their projects
+        Membership.objects.filter(user=instance, role=Membership.STUDENT).delete()
+    else:
+        Membership.objects.refresh(project_ids=pk_set)
+
+
+@receiver(m2m_changed, sender=ClientOrg.reps.through)
+def client_org_reps_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Called after reps are added to or removed from a client org.
+    """
+    if action not in ["post_add", "post_remove", "post_clear"]:
+        return
+
+    if not reverse:
+        Membership.objects.refresh(org_ids=[instance.id])
+    elif action == "post_clear":
+        # A user was removed from all of their orgs
+        Membership.objects.filter(user=instance, role=Membership.ORG_REP).delete()
+    else:
+        Membership.objects.refresh(org_ids=pk_set)
+
+
+def set_updated_at(sender, instance, raw, **kwargs):
+    """
+    Called before a User, ClientOrg or Project instance is saved.
+    Like auto_now, but keeps the stamps of instances loaded from fixtures.
+    """
+    if not raw:
+        instance.updated_at = timezone.now()
+
+
+for model in [User, ClientOrg, Project]:
+    pre_save.connect(set_updated_at, sender=model)
+
+
+@receiver(m2m_changed, sender=Project.students.through)
+def project_students_mark_updated(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Called before and after students are added to or removed from a project.
+    Removed students are marked before they're removed, added ones after.
+    """
+    if action not in ["pre_remove", "pre_clear", "post_add"]:
+        return
+
+    if not reverse:
+        Project.objects.mark_updated([instance.id])
+    elif action == "pre_clear":
+        Project.objects.mark_updated(
+            list(instance.student_projects.values_list("id", flat=True))
+        )
+    else:
+        Project.objects.mark_updated(pk_set)
+
+
+@receiver(m2m_changed, sender=ClientOrg.reps.through)
+def client_org_reps_mark_updated(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Called before and after reps are added to or removed from a client org.
+    """
+    if not reverse and action.startswith("post"):
+        orgs = ClientOrg.objects.filter(id=instance.id)
+    elif reverse and action == "pre_clear":
+        orgs = ClientOrg.objects.filter(reps=instance)
+    elif reverse and action in ["post_add", "post_remove"]:
+        orgs = ClientOrg.objects.filter(id__in=pk_set)
+    else:
+        return
+    orgs.update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Project)
+def project_pre_delete(sender, instance, **kwargs):
+    # Its org and users will no longer include it
+    Project.objects.mark_updated([instance.id])
+
+
+@receiver(pre_delete, sender=User)
+def user_pre_delete(sender, instance, **kwargs):
+    # Its projects and orgs will no longer include it
+    Project.objects.mark_updated(
+        list(instance.memberships.values_list("project", flat=True))
+    )
+    ClientOrg.objects.filter(reps=instance).update(updated_at=timezone.now())
+    # Its tokens will be deleted
+    uncache_tokens([instance.id])
+
+
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    Called after a change that may affect the responses cached for anonymous users.
+    """
+    if kwargs.get("action", "post").startswith("post"):
+        invalidate_responses()
+
+
+for model in [ClientOrg, Tag, Project]:
+    post_save.connect(invalidate_cached_responses, sender=model)
+    post_delete.connect(invalidate_cached_responses, sender=model)
+for through in [
+    Project.students.through,
+    Project.tags.through,
+    ClientOrg.reps.through,
+]:
+    m2m_changed.connect(invalidate_cached_responses, sender=through)
+post_delete.connect(invalidate_cached_responses, sender=User)
+
+
+@receiver(post_save, sender=User)
+def user_post_save_update_related(sender, instance, created, update_fields, **kwargs):
+    """
+    Called after a User instance is saved. Its name, image (and its derivatives) and
+    GitHub user ID are shown in the representations of its projects and orgs, other
+    fields don't matter to them (e.g. the last login time that is updated on every
+    login).
+    """
+    if not created and fields_changed(
+        update_fields, ["name", "image", "image_variants", "github_user_id"]
+    ):
+        invalidate_responses()
+        Project.objects.mark_updated(
+            list(instance.memberships.values_list("project", flat=True))
+        )
+        ClientOrg.objects.filter(reps=instance).update(updated_at=timezone.now())
+
+
 class Proposal(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     rep_name = models.CharField(max_length=95)
@@ -254,6 +774,17 @@ class PasswordResetRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     used_at = models.DateTimeField(null=True)
 
+    class Meta:
+        # For pruning expired and used requests
+        indexes = [
+            models.Index(fields=["created_at"], name="reset_request_created_idx"),
+            models.Index(
+                fields=["used_at"],
+                condition=Q(used_at__isnull=False),
+                name="reset_request_used_idx",
+            ),
+        ]
+
     @property
     def is_usable(self) -> bool:
         """
@@ -283,3 +814,127 @@ class PasswordResetRequest(models.Model):
             cls.objects.filter(created_at__lt=timezone.now() - cls.VALID_DURATION)
             | cls.objects.filter(used_at__isnull=False)
         ).delete()
+
+
+class OutgoingEmailManager(models.Manager):
+    def due(self):
+        """
+        Returns the unsent emails that should be tried now, oldest first.
+        """
+        return self.filter(
+            sent_at__isnull=True,
+            attempts__lt=self.model.MAX_ATTEMPTS,
+            next_attempt_at__lte=timezone.now(),
+        ).order_by("created_at")
+
+
+class OutgoingEmail(models.Model):
+    """
+    An email queued to be sent by the send_emails worker, see portal.emails.
+    """
+
+    objects = OutgoingEmailManager()
+
+    # How many times sending an email is tried before giving up on it
+    MAX_ATTEMPTS = 5
+    # How long to wait before the first retry, doubled for each further retry
+    RETRY_DELAY = timezone.timedelta(minutes=1)
+    # How long a worker has to send the emails it claimed before they're sent again
+    CLAIM_DURATION = timezone.timedelta(minutes=10)
+
+    subject = models.TextField()
+    body = models.TextField()
+    # Empty to send from DEFAULT_FROM_EMAIL
+    from_email = models.CharField(max_length=254, blank=True)
+    recipients = ArrayField(models.EmailField())
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                name="outgoingemail_unsent_idx",
+                condition=Q(sent_at__isnull=True),
+            )
+        ]
+
+    def set_failed(self, error: Exception):
+        """
+        Records the error of a failed attempt to send the email, which was counted
+        when it was claimed, and schedules the next one.
+        """
+        self.last_error = repr(error)
+        self.next_attempt_at = timezone.now() + self.RETRY_DELAY * 2 ** (
+            self.attempts - 1
+        )
+
+    def __str__(self):
+        return f'<{self.__class__.__name__} id="{self.id}" subject="{self.subject}" sent_at="{self.sent_at}">'
+
+
+def import_file_name(instance, filename: str) -> str:
+    """
+    Returns a random name for an uploaded CSV, as its original name may contain
+    personal data.
+    """
+    return f"imports/{uuid.uuid4()}.csv"
+
+
+class ImportJob(models.Model):
+    """
+    A CSV import or validation queued to be run by the run_import_jobs worker,
+    see portal.import_jobs.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    # How long a job can run before it's failed, as its worker must have stopped
+    MAX_RUN_DURATION = timezone.timedelta(minutes=30)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(
+        get_user_model(), on_delete=models.SET_NULL, null=True
+    )
+    # Dry runs validate the data in memory without writing anything
+    dry_run = models.BooleanField(default=False)
+    # Deleted once the job is done
+    file = models.FileField(upload_to=import_file_name, storage=private_storage)
+    # URL of the site the file was uploaded to, for the URLs in the result
+    base_url = models.URLField(blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    # The phase being run, one of import_jobs.PHASES
+    phase = models.CharField(max_length=10, blank=True)
+    # Numbers of rows read and of distinct users, orgs, projects and links in them
+    counts = models.JSONField(default=dict)
+    # Seconds taken by each phase
+    timings = models.JSONField(default=dict)
+    # Response of the import, with its errors and warnings
+    result = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_at"],
+                name="importjob_queued_idx",
+                condition=Q(status="queued"),
+            )
+        ]
+
+    def __str__(self):
+        return f'<{self.__class__.__name__} id="{self.id}" status="{self.status}">'
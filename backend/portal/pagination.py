@@ -0,0 +1,250 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import Project
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination.
+
+    Instead of using an offset, each page continues from the ordering values of the
+    last item of the previous page, which are encoded in the cursor of the next link.
+    The rows before the page aren't read and thrown away like with an offset, so each
+    page is a single range query that an index on the ordering fields can answer
+    directly, however deep it is. Orderings on annotations, such as the term rank of
+    projects, can't use an index, so their pages still sort every matching row.
+
+    Only paginates if the page_size query param is given,
+    so clients that don't ask for pages still get the full list.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering_query_param = "ordering"
+    invalid_cursor_message = "Invalid cursor"
+
+    # Maps the allowed values of the ordering query param to lists of
+    # (field, descending) tuples. The first one is the default.
+    # The fields together must uniquely identify an item.
+    orderings = {}
+
+    def prepare_queryset(self, queryset):
+        """
+        Returns the queryset with any annotations used in the orderings.
+        """
+        return queryset
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return None
+        if page_size <= 0:
+            return None
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request):
+        ordering = request.query_params.get(self.ordering_query_param)
+        if ordering not in self.orderings:
+            ordering = next(iter(self.orderings))
+        return ordering
+
+    def decode_cursor(self, request):
+        """
+        Returns the ordering values encoded in the cursor query param,
+        or None if there is no cursor.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode("ascii")))
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        # Cursors come from clients, so check that they have the shape of encode_cursor
+        if (
+            not isinstance(cursor, dict)
+            or cursor.get("ordering") != self.ordering
+            or not isinstance(cursor.get("values"), list)
+            or len(cursor["values"]) != len(self.orderings[self.ordering])
+            or not all(
+                isinstance(value, (str, int, float)) for value in cursor["values"]
+            )
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor["values"]
+
+    def encode_cursor(self, item):
+        values = [getattr(item, field) for field, _ in self.orderings[self.ordering]]
+        cursor = json.dumps({"ordering": self.ordering, "values": values})
+        return urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+
+    def after(self, values) -> Q:
+        """
+        Returns a filter matching the items that come after the item with the
+        specified ordering values.
+        """
+        fields = self.orderings[self.ordering]
+        after = Q()
+        for i, (field, descending) in enumerate(fields):
+            lookup = "lt" if descending else "gt"
+            condition = Q(**{f"{field}__{lookup}": values[i]})
+            for (equal_field, _), value in zip(fields[:i], values[:i]):
+                condition &= Q(**{equal_field: value})
+            after |= condition
+        return after
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if self.page_size is None:
+            return None
+
+        self.request = request
+        self.ordering = self.get_ordering(request)
+
+        queryset = self.prepare_queryset(queryset).order_by(
+            *[
+                f"-{field}" if descending else field
+                for field, descending in self.orderings[self.ordering]
+            ]
+        )
+        values = self.decode_cursor(request)
+        try:
+            if values is not None:
+                queryset = queryset.filter(self.after(values))
+
+            # Fetch one extra item to find out if there is a next page
+            page = list(queryset[: self.page_size + 1])
+        except (TypeError, ValueError, ValidationError):
+            # The values don't match the types of their fields
+            raise NotFound(self.invalid_cursor_message)
+        self.has_next = len(page) > self.page_size
+        page = page[: self.page_size]
+        self.next_cursor = self.encode_cursor(page[-1]) if self.has_next else None
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.ordering_query_param, self.ordering)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Number of results to return per page. Results are not paginated if not set.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "The pagination cursor value.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.ordering_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Which field to use when ordering the results.",
+                "schema": {"type": "string", "enum": list(self.orderings)},
+            },
+        ]
+
+
+class ProjectPagination(KeysetPagination):
+    """
+    Pages of projects, most recent first by default.
+    Projects in the same year are ordered by term, then by name. The term rank is
+    computed, so unlike ordering by name, ordering by year isn't fully indexed.
+    """
+
+    orderings = {
+        "-year": [("year", True), ("term_rank", True), ("name", False)],
+        "year": [("year", False), ("term_rank", False), ("name", True)],
+        "name": [("name", False)],
+        "-name": [("name", True)],
+    }
+
+    # Terms in ascending order, matched by both their short and long names
+    TERM_ORDER = ["SP", "SM", "F", "W"]
+
+    def prepare_queryset(self, queryset):
+        term_names = dict(Project.TERM_CHOICES)
+        return queryset.annotate(
+            term_rank=Case(
+                *[
+                    When(term__in=[term, term_names[term]], then=Value(rank))
+                    for rank, term in enumerate(self.TERM_ORDER)
+                ],
+                default=Value(-1),
+                output_field=IntegerField(),
+            )
+        )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator for admin changelists of large tables.
+
+    Counting every row of a large table is a full scan, so when the queryset isn't
+    filtered, the number of rows is estimated from PostgreSQL's statistics
+    (pg_class.reltuples), which ANALYZE and autovacuum keep up to date.
+    Filtered querysets and small tables are counted exactly.
+    """
+
+    # Tables estimated to have fewer rows than this are counted exactly
+    exact_count_threshold = 10000
+
+    def estimate_count(self):
+        """
+        Returns PostgreSQL's estimate of the number of rows of the queryset's table,
+        which is -1 if the table hasn't been analyzed yet.
+        """
+        queryset = self.object_list
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row else -1
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is None or query.where or query.distinct or query.combinator:
+            return super().count
+        estimate = self.estimate_count()
+        if estimate < self.exact_count_threshold:
+            return super().count
+        return estimate
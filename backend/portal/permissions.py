@@ -0,0 +1,99 @@
+"""
+Permissions based on the roles of the requesting user on projects and client orgs.
+
+The roles are read from the user's memberships, with one query per project or
+org, and memoized for the rest of the request, see permission_context.
+"""
+
+from rest_framework import exceptions
+from rest_framework.permissions import BasePermission
+
+from .models import Membership
+
+
+class PermissionContext:
+    """
+    The roles of a user on projects and client orgs, looked up as needed.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.project_roles_by_id = {}
+        self.org_roles_by_id = {}
+
+    def project_roles(self, project) -> set:
+        """
+        Returns the user's roles on the project, out of Membership.STUDENT,
+        Membership.TA and Membership.CLIENT_REP.
+        """
+        if self.user.is_anonymous:
+            return set()
+        if project.pk not in self.project_roles_by_id:
+            self.project_roles_by_id[project.pk] = set(
+                Membership.objects.filter(user=self.user, project=project).values_list(
+                    "role", flat=True
+                )
+            )
+        return self.project_roles_by_id[project.pk]
+
+    def org_roles(self, org) -> set:
+        """
+        Returns the user's roles on the client org itself, which is
+        Membership.ORG_REP if they are one of its reps.
+        """
+        if self.user.is_anonymous:
+            return set()
+        if org.pk not in self.org_roles_by_id:
+            self.org_roles_by_id[org.pk] = set(
+                Membership.objects.filter(
+                    user=self.user, client_org=org, project__isnull=True
+                ).values_list("role", flat=True)
+            )
+        return self.org_roles_by_id[org.pk]
+
+
+def permission_context(request) -> PermissionContext:
+    """
+    Returns the permission context of the request's user, shared by the rest of
+    the request.
+    """
+    context = getattr(request, "_permission_context", None)
+    if context is None or context.user != request.user:
+        context = PermissionContext(request.user)
+        request._permission_context = context
+    return context
+
+
+class RolePermission(BasePermission):
+    """
+    Allows superusers and users with one of the roles returned by get_roles.
+    """
+
+    def get_roles(self, context: PermissionContext, obj) -> set:
+        raise NotImplementedError
+
+    def has_object_permission(self, request, view, obj):
+        if request.user.is_anonymous:
+            # Anonymous users can't edit anything, so don't ask them to log in
+            raise exceptions.PermissionDenied()
+        return request.user.is_superuser or bool(
+            self.get_roles(permission_context(request), obj)
+        )
+
+
+class IsProjectMember(RolePermission):
+    """
+    Allows the students, TA and client rep of a project.
+    """
+
+    def get_roles(self, context, obj):
+        return context.project_roles(obj)
+
+
+class IsOrgRep(RolePermission):
+    """
+    Allows the reps of a client org.
+    """
+
+    def get_roles(self, context, obj):
+        return context.org_roles(obj)
@@ -0,0 +1,116 @@
+"""
+Cache of the rendered list responses sent to anonymous users.
+
+Anonymous users can only see published projects and their orgs, so they all get
+the same response for the same URL. Cached responses are keyed by a generation
+number, so bumping the generation invalidates all of them at once. The generation
+must be bumped after any change that could affect these responses, see
+invalidate_responses.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+
+KEY_PREFIX = "portal:responses"
+GENERATION_KEY = f"{KEY_PREFIX}:generation"
+HITS_KEY = f"{KEY_PREFIX}:hits"
+MISSES_KEY = f"{KEY_PREFIX}:misses"
+
+
+def get_generation() -> int:
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        # Start from the current time so that a generation that was evicted
+        # from the cache is never reused by responses cached before the eviction
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # No generation yet, so nothing is cached under it
+        get_generation()
+
+
+def invalidate_responses():
+    """
+    Invalidates all cached responses.
+    Must be called after any change to projects, client orgs, tags or users
+    that could be visible to anonymous users.
+    """
+    bump_generation()
+    # Responses cached while the change is still uncommitted are stale too
+    transaction.on_commit(bump_generation)
+
+
+def increment(key: str, delta: int = 1):
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, delta, timeout=None)
+
+
+def response_cache_stats() -> dict:
+    """
+    Returns the number of hits and misses of the response cache and its hit rate,
+    counted since they were last reset.
+    """
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else None,
+    }
+
+
+def reset_response_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+class AnonymousResponseCacheMixin:
+    """
+    A ListModelMixin viewset mixin that caches the rendered JSON list responses
+    sent to anonymous users for RESPONSE_CACHE_TIMEOUT seconds.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not request.user.is_anonymous or request.accepted_renderer.format != "json":
+            return super().list(request, *args, **kwargs)
+
+        key = f"{KEY_PREFIX}:{get_generation()}:{request.get_full_path()}"
+        cached = cache.get(key)
+        if cached is not None:
+            increment(HITS_KEY)
+            content, content_type, etag = cached
+            response = HttpResponse(content, content_type=content_type)
+            response["Vary"] = "Accept"
+            if etag is None:
+                return response
+            response["ETag"] = etag
+            return get_conditional_response(request, etag=etag, response=response)
+
+        increment(MISSES_KEY)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key,
+                    (
+                        response.content,
+                        response["Content-Type"],
+                        response.get("ETag"),
+                    ),
+                    settings.RESPONSE_CACHE_TIMEOUT,
+                )
+            )
+        return response
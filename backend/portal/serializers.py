@@ -1,7 +1,22 @@
+from collections import defaultdict
+
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import models
+from django.db.models import Count, Max, Prefetch, Q
 from rest_framework import serializers
 
-from .models import ClientOrg, MailingList, Project, Proposal, Tag
+from .images import variant_urls, variants_field
+from .models import (
+    ClientOrg,
+    ImportJob,
+    MailingList,
+    Membership,
+    Project,
+    Proposal,
+    Tag,
+)
 
 
 class DynamicFieldsModelSerializer(serializers.ModelSerializer):
@@ -25,14 +40,73 @@ class DynamicFieldsModelSerializer(serializers.ModelSerializer):
                 self.fields.pop(field_name)
 
 
+def requesting_user(request):
+    """
+    Returns the user of the request, or an anonymous user if there is no request.
+    """
+    return request.user if request is not None else AnonymousUser()
+
+
+class EagerLoadingMixin:
+    """
+    A serializer mixin that declares which related objects the serializer uses,
+    so that they can be loaded for a whole queryset in a fixed number of queries
+    instead of one or more queries per serialized instance.
+    """
+
+    # Forward foreign keys to load with a join
+    select_related_fields = []
+    # Many-to-many and reverse relationships to load with a query each
+    prefetch_related_fields = []
+
+    @classmethod
+    def get_prefetch_related(cls, request) -> list:
+        """
+        Returns the lookups to prefetch. Override to build request-dependent Prefetch objects.
+        """
+        return cls.prefetch_related_fields
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, request=None):
+        """
+        Returns the queryset with the serializer's related objects loaded up front.
+        """
+        return queryset.select_related(*cls.select_related_fields).prefetch_related(
+            *cls.get_prefetch_related(request)
+        )
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    The derivatives of an image field, see images.variant_urls.
+    Null until the process_images worker generates them.
+    """
+
+    def __init__(self, image_field: str, **kwargs):
+        self.image_field = image_field
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return variant_urls(
+            getattr(instance, self.image_field),
+            getattr(instance, variants_field(self.image_field)),
+            self.context.get("request"),
+        )
+
+
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
         exclude = ["id"]
 
 
-class ProjectShortSerializer(serializers.ModelSerializer):
+class ProjectShortSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    prefetch_related_fields = ["tags"]
+
     tags = TagSerializer(many=True, read_only=True)
+    logo_image_variants = ImageVariantsField("logo_image")
     # show long versions of choice fields (e.g. "Web App" instead of "WA")
     type = serializers.CharField(source="get_type_display")
 
@@ -47,31 +121,47 @@ class ProjectShortSerializer(serializers.ModelSerializer):
             "term",
             "logo_url",
             "logo_image",
+            "logo_image_variants",
             "type",
         ]
 
 
 class UserShortSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField("image")
+
     class Meta:
         model = get_user_model()
-        fields = ["id", "name", "image", "github_user_id"]
+        fields = ["id", "name", "image", "image_variants", "github_user_id"]
 
     read_only_fields = ["github_user_id"]
 
 
 class ClientOrgShortSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField("image")
     # show long versions of choice fields (e.g. "Web App" instead of "WA")
     type = serializers.CharField(source="get_type_display")
 
     class Meta:
         model = ClientOrg
-        fields = ["id", "name", "image", "type"]
+        fields = ["id", "name", "image", "image_variants", "type"]
+
+
+class UserListSerializer(serializers.ListSerializer):
+    """
+    Serializes many users, resolving the projects of all of them up front.
+    """
+
+    def to_representation(self, data):
+        users = list(data.all() if isinstance(data, models.Manager) else data)
+        self.child.resolve_projects(users)
+        return super().to_representation(users)
 
 
 class UserSerializer(serializers.ModelSerializer):
     student_projects = serializers.SerializerMethodField()
     ta_projects = serializers.SerializerMethodField()
     client_rep_projects = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField("image")
 
     class Meta:
         model = get_user_model()
@@ -81,6 +171,7 @@ class UserSerializer(serializers.ModelSerializer):
             "name",
             "bio",
             "image",
+            "image_variants",
             "website_link",
             "linkedin_link",
             "github_username",
@@ -90,27 +181,52 @@ class UserSerializer(serializers.ModelSerializer):
             "client_rep_projects",
         ]
         read_only_fields = ["github_username", "github_user_id"]
+        list_serializer_class = UserListSerializer
 
-    def get_student_projects(self, user_being_serialized):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Projects visible to the requesting user, by (user ID, role)
+        self.resolved_projects = defaultdict(list)
+        self.resolved_user_ids = set()
+
+    def resolve_projects(self, users):
+        """
+        Fetches the projects visible to the requesting user that the users are
+        students, TAs or client reps of in one query, and groups them by user and role.
+        Users whose projects were already resolved are skipped.
+        """
+        users = [user for user in users if user.pk not in self.resolved_user_ids]
+        if not users:
+            return
         requesting_user = serializers.CurrentUserDefault()(self)
-        queryset = Project.objects.visible_to(requesting_user).filter(
-            students__in=[user_being_serialized]
+        memberships = (
+            Membership.objects.filter(
+                user__in=[user.pk for user in users],
+                project__in=Project.objects.visible_to(requesting_user),
+            )
+            .select_related("project")
+            .prefetch_related("project__tags")
         )
-        return ProjectShortSerializer(instance=queryset, many=True).data
+        for membership in memberships:
+            self.resolved_projects[(membership.user_id, membership.role)].append(
+                membership.project
+            )
+        self.resolved_user_ids.update(user.pk for user in users)
+
+    def get_projects_with_role(self, user, role):
+        if user.pk not in self.resolved_user_ids:
+            self.resolve_projects([user])
+        projects = self.resolved_projects[(user.pk, role)]
+        return ProjectShortSerializer(instance=projects, many=True).data
+
+    def get_student_projects(self, user_being_serialized):
+        return self.get_projects_with_role(user_being_serialized, Membership.STUDENT)
 
     def get_ta_projects(self, user_being_serialized):
-        requesting_user = serializers.CurrentUserDefault()(self)
-        queryset = Project.objects.visible_to(requesting_user).filter(
-            ta=user_being_serialized
-        )
-        return ProjectShortSerializer(instance=queryset, many=True).data
+        return self.get_projects_with_role(user_being_serialized, Membership.TA)
 
     def get_client_rep_projects(self, user_being_serialized):
-        requesting_user = serializers.CurrentUserDefault()(self)
-        queryset = Project.objects.visible_to(requesting_user).filter(
-            client_rep=user_being_serialized
-        )
-        return ProjectShortSerializer(instance=queryset, many=True).data
+        return self.get_projects_with_role(user_being_serialized, Membership.CLIENT_REP)
 
     def to_representation(self, instance):
         # Remove 'email' field if user is not superuser or the requesting user
@@ -121,9 +237,12 @@ class UserSerializer(serializers.ModelSerializer):
         return super().to_representation(instance)
 
 
-class ClientOrgSerializer(serializers.ModelSerializer):
+class ClientOrgSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    prefetch_related_fields = ["reps"]
+
     projects = serializers.SerializerMethodField()
     reps = UserShortSerializer(many=True, read_only=True)
+    image_variants = ImageVariantsField("image")
 
     # show long versions of choice fields (e.g. "Web App" instead of "WA")
     type = serializers.CharField(source="get_type_display")
@@ -135,6 +254,7 @@ class ClientOrgSerializer(serializers.ModelSerializer):
             "name",
             "about",
             "image",
+            "image_variants",
             "website_link",
             "type",
             "projects",
@@ -142,26 +262,88 @@ class ClientOrgSerializer(serializers.ModelSerializer):
             "testimonial",
         ]
 
+    @classmethod
+    def get_prefetch_related(cls, request) -> list:
+        # Load the visible projects of every org in one query
+        visible_projects = Project.objects.visible_to(requesting_user(request))
+        return cls.prefetch_related_fields + [
+            Prefetch(
+                "projects",
+                queryset=ProjectShortSerializer.setup_eager_loading(visible_projects),
+                to_attr="visible_projects",
+            )
+        ]
+
     def get_projects(self, client_org):
-        requesting_user = serializers.CurrentUserDefault()(self)
-        queryset = Project.objects.visible_to(requesting_user).filter(
-            client_org=client_org
-        )
+        if hasattr(client_org, "visible_projects"):
+            queryset = client_org.visible_projects
+        else:
+            requesting_user = serializers.CurrentUserDefault()(self)
+            queryset = Project.objects.visible_to(requesting_user).filter(
+                client_org=client_org
+            )
         return ProjectShortSerializer(instance=queryset, many=True).data
 
 
+class ClientOrgDirectorySerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    """
+    A compact representation of client orgs for the org directory, with the number,
+    latest year and names of their projects visible to the requesting user instead
+    of the projects themselves. These are annotated in the same query as the orgs.
+    """
+
+    num_projects = serializers.IntegerField(read_only=True)
+    latest_year = serializers.IntegerField(read_only=True, allow_null=True)
+    project_names = serializers.ListField(child=serializers.CharField(), read_only=True)
+    image_variants = ImageVariantsField("image")
+
+    # show long versions of choice fields (e.g. "Web App" instead of "WA")
+    type = serializers.CharField(source="get_type_display")
+
+    class Meta:
+        model = ClientOrg
+        fields = [
+            "id",
+            "name",
+            "image",
+            "image_variants",
+            "type",
+            "about",
+            "testimonial",
+            "num_projects",
+            "latest_year",
+            "project_names",
+        ]
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, request=None):
+        visible = Q(projects__in=Project.objects.visible_to(requesting_user(request)))
+        return queryset.annotate(
+            num_projects=Count("projects", filter=visible),
+            latest_year=Max("projects__year", filter=visible),
+            project_names=ArrayAgg(
+                "projects__name", filter=visible, ordering="projects__name"
+            ),
+        )
+
+
 class MailingListSerializer(serializers.ModelSerializer):
     class Meta:
         model = MailingList
         fields = ["email"]
 
 
-class ProjectSerializer(DynamicFieldsModelSerializer):
+class ProjectSerializer(EagerLoadingMixin, DynamicFieldsModelSerializer):
+    select_related_fields = ["client_org", "ta", "client_rep"]
+    prefetch_related_fields = ["students", "tags"]
+
     client_org = ClientOrgShortSerializer(read_only=True)
     students = UserShortSerializer(many=True, read_only=True)
     ta = UserShortSerializer(read_only=True)
     client_rep = UserShortSerializer(read_only=True)
     tags = TagSerializer(many=True, required=False)
+    screenshot_variants = ImageVariantsField("screenshot")
+    logo_image_variants = ImageVariantsField("logo_image")
 
     # show long versions of choice fields (e.g. "Web App" instead of "WA")
     type = serializers.CharField(source="get_type_display")
@@ -169,10 +351,27 @@ class ProjectSerializer(DynamicFieldsModelSerializer):
 
     class Meta:
         model = Project
-        fields = "__all__"
+        exclude = ["search_vector", "updated_at"]
 
 
 class ProposalSerializer(serializers.ModelSerializer):
     class Meta:
         model = Proposal
         fields = "__all__"
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = [
+            "id",
+            "dry_run",
+            "status",
+            "phase",
+            "counts",
+            "timings",
+            "result",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
@@ -0,0 +1,115 @@
+"""
+Media storage that names files by the hash of their contents.
+
+Uploads are saved as <upload_to>/<sha256 of the contents><extension> instead of under
+their original names, so a file's URL never changes contents and can be cached
+forever (see deployment/portal-site). Saving bytes that are already stored, such as
+an image re-uploaded by an edit page, returns the existing file without writing it
+again.
+
+As files may be shared by several instances, they are never deleted when saved over
+or deleted through a model. The collect_media command deletes the files no longer
+referenced by any instance instead.
+"""
+
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def hashed_name(self, name: str, content) -> str:
+        """
+        Returns the name of the content in the directory of the specified name,
+        keeping its extension.
+        """
+        sha256 = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        content.seek(0)
+        directory, filename = posixpath.split(name)
+        extension = posixpath.splitext(filename)[1].lower()
+        return posixpath.join(directory, sha256.hexdigest() + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Marks the file as used, so that collect_media doesn't delete it
+            # before the instance referencing it is saved
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+    def get_available_name(self, name, max_length=None):
+        # Files with the same name have the same contents
+        return name
+
+    def _save(self, name, content):
+        """
+        Writes the content to a temporary file that is then moved in place, so that
+        the file is never seen partly written, and concurrent saves of the same
+        content both succeed.
+        """
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            # As FileSystemStorage, set the umask so the mode is applied exactly
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temp_file:
+            try:
+                for chunk in content.chunks():
+                    temp_file.write(chunk)
+            except Exception:
+                os.remove(temp_file.name)
+                raise
+        # Temporary files are only readable by their owner
+        os.chmod(temp_file.name, self.file_permissions_mode or 0o644)
+        os.replace(temp_file.name, full_path)
+        return name
+
+    def delete(self, name):
+        # Other instances may reference the file, see collect_media
+        pass
+
+    def delete_unreferenced(self, name):
+        super().delete(name)
+
+
+class PrivateStorage(FileSystemStorage):
+    """
+    Storage of files that aren't shared, such as CSV imports, which are deleted as
+    soon as they aren't needed. They're stored in IMPORT_ROOT, outside MEDIA_ROOT, so
+    that they're never served.
+    """
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, settings.IMPORT_ROOT)
+
+    def _clear_cached_properties(self, setting, **kwargs):
+        super()._clear_cached_properties(setting, **kwargs)
+        if setting == "IMPORT_ROOT":
+            self.__dict__.pop("base_location", None)
+            self.__dict__.pop("location", None)
+
+
+def private_storage():
+    return PrivateStorage()
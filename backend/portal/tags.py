@@ -0,0 +1,117 @@
+"""
+Assigning tags to projects.
+
+Tag values are case-insensitive: "python" and "Python" are the same tag, and
+the spelling of the first one created is kept. This is enforced by a unique
+index on UPPER(value), which the lookups here use.
+"""
+
+from django.db.models.functions import Upper
+
+from .models import Project, Tag
+from .response_cache import invalidate_responses
+
+MAX_LENGTH = Tag._meta.get_field("value").max_length
+
+
+def normalize_tag_values(values: list[str]) -> list[str]:
+    """
+    Strips and collapses the whitespace of the values and removes empty values
+    and case-insensitive duplicates, keeping the first spelling.
+    Raises a ValueError if a value is too long to be a tag.
+    """
+    normalized = {}
+    for value in values:
+        value = " ".join(value.split())
+        if len(value) > MAX_LENGTH:
+            raise ValueError(f'Tag "{value}" is longer than {MAX_LENGTH} characters')
+        if value != "":
+            normalized.setdefault(value.upper(), value)
+    return list(normalized.values())
+
+
+def find_tags(values: list[str]) -> dict[str, Tag]:
+    """
+    Returns the existing tags matching the values case-insensitively,
+    keyed by their uppercase values.
+    """
+    tags = Tag.objects.alias(upper_value=Upper("value")).filter(
+        upper_value__in=[value.upper() for value in values]
+    )
+    return {tag.value.upper(): tag for tag in tags}
+
+
+def get_or_create_tags(values: list[str]) -> list[Tag]:
+    """
+    Returns the tags with the normalized values, creating the missing ones.
+    Uses one query if all the tags exist, and three otherwise.
+    """
+    values = normalize_tag_values(values)
+    if not values:
+        return []
+
+    tags = find_tags(values)
+    missing = [Tag(value=value) for value in values if value.upper() not in tags]
+    if missing:
+        # Another request may create some of the same tags concurrently, so skip
+        # those and fetch them all again (ignore_conflicts doesn't set ids either)
+        Tag.objects.bulk_create(missing, ignore_conflicts=True)
+        tags = find_tags(values)
+    return [tags[value.upper()] for value in values]
+
+
+def tags_changed(project_ids: list):
+    """
+    Does the work of the m2m_changed receivers of Project.tags,
+    which aren't sent when the tags are changed through their through model.
+    """
+    Project.objects.update_search_vectors(project_ids)
+    Project.objects.mark_updated(project_ids)
+    invalidate_responses()
+
+
+def set_project_tags(project: Project, values: list[str]) -> list[Tag]:
+    """
+    Sets the tags of the project to the tags with the values, creating the missing
+    ones. Only the tags that changed are added or removed.
+    """
+    tags = get_or_create_tags(values)
+    tag_ids = {tag.id for tag in tags}
+    current_ids = set(project.tags.values_list("id", flat=True))
+    if tag_ids == current_ids:
+        return tags
+
+    Through = Project.tags.through
+    if current_ids - tag_ids:
+        Through.objects.filter(
+            project=project, tag_id__in=current_ids - tag_ids
+        ).delete()
+    if tag_ids - current_ids:
+        Through.objects.bulk_create(
+            [
+                Through(project=project, tag_id=tag_id)
+                for tag_id in tag_ids - current_ids
+            ],
+            ignore_conflicts=True,
+        )
+    tags_changed([project.id])
+    return tags
+
+
+def add_project_tags(project_ids: list, values: list[str]) -> list[Tag]:
+    """
+    Adds the tags with the values to many projects at once, creating the missing
+    tags. Projects keep their other tags and tags they already have.
+    """
+    tags = get_or_create_tags(values)
+    Through = Project.tags.through
+    Through.objects.bulk_create(
+        [
+            Through(project_id=project_id, tag_id=tag.id)
+            for project_id in project_ids
+            for tag in tags
+        ],
+        ignore_conflicts=True,
+    )
+    tags_changed(project_ids)
+    return tags
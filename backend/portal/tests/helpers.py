@@ -0,0 +1,215 @@
+import http.server
+import io
+import json
+import socketserver
+import tempfile
+import threading
+import time
+from typing import Callable
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+
+def assert_constant_queries(
+    test: TestCase, make_request: Callable, add_instances: Callable
+):
+    """
+    Asserts that the number of queries made by make_request doesn't grow
+    after add_instances adds more instances to the results of the request.
+    Used to catch N+1 queries in list endpoints.
+    """
+    with CaptureQueriesContext(connection) as queries_before:
+        response_before = make_request()
+    add_instances()
+    with CaptureQueriesContext(connection) as queries_after:
+        response_after = make_request()
+
+    # Make sure the added instances were actually part of the results
+    test.assertEqual(response_before.status_code, 200)
+    test.assertEqual(response_after.status_code, 200)
+    test.assertGreater(len(response_after.data), len(response_before.data))
+
+    test.assertEqual(
+        len(queries_before),
+        len(queries_after),
+        "Number of queries grew with the number of results:\n"
+        + "\n".join(query["sql"] for query in queries_after.captured_queries),
+    )
+
+
+class SMTPStandIn:
+    """
+    A minimal local SMTP server for tests, used as a context manager.
+    Records the messages it receives and the number of connections made to it,
+    and refuses the recipients in refused_recipients.
+    """
+
+    def __init__(self, refused_recipients=()):
+        self.refused_recipients = set(refused_recipients)
+        # (sender, recipients, data) tuples
+        self.messages = []
+        self.num_connections = 0
+
+    def __enter__(self):
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+            def handle(self):
+                stand_in.num_connections += 1
+                self.reply("220 localhost")
+                sender, recipients = None, []
+                for line in self.rfile:
+                    command = line.decode("ascii").strip()
+                    verb = command[:4].upper()
+                    if verb == "MAIL":
+                        sender = command.split(":", 1)[1].strip("<> ")
+                        self.reply("250 OK")
+                    elif verb == "RCPT":
+                        recipient = command.split(":", 1)[1].strip("<> ")
+                        if recipient in stand_in.refused_recipients:
+                            self.reply("550 Refused")
+                        else:
+                            recipients.append(recipient)
+                            self.reply("250 OK")
+                    elif verb == "DATA":
+                        self.reply("354 End data with <CR><LF>.<CR><LF>")
+                        data = b"".join(iter(self.rfile.readline, b".\r\n"))
+                        stand_in.messages.append((sender, recipients, data))
+                        sender, recipients = None, []
+                        self.reply("250 OK")
+                    elif verb == "RSET":
+                        sender, recipients = None, []
+                        self.reply("250 OK")
+                    elif verb == "QUIT":
+                        self.reply("221 Bye")
+                        return
+                    else:
+                        # EHLO, HELO and NOOP
+                        self.reply("250 localhost")
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def settings(self) -> dict:
+        """
+        Returns the settings for sending emails to this server over SMTP.
+        """
+        return {
+            "EMAIL_BACKEND": "django.core.mail.backends.smtp.EmailBackend",
+            "EMAIL_HOST": "127.0.0.1",
+            "EMAIL_PORT": self.port,
+            "EMAIL_USE_TLS": False,
+            "EMAIL_HOST_USER": "",
+            "EMAIL_HOST_PASSWORD": "",
+        }
+
+
+class FakeGitHub:
+    """
+    A local stand-in for GitHub's OAuth and user endpoints for tests, used as a
+    context manager. Takes delay seconds to answer, answers with the statuses in
+    failure_statuses before answering normally, and records the paths of the
+    requests it receives and the number of connections made to it.
+    """
+
+    def __init__(self, delay: float = 0, failure_statuses=()):
+        self.delay = delay
+        self.failure_statuses = list(failure_statuses)
+        self.paths = []
+        self.num_connections = 0
+        self.user = {"id": 1234, "login": "octocat"}
+
+    def __enter__(self):
+        fake = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            # Keep connections alive
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                fake.num_connections += 1
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                self.answer({"access_token": "token", "token_type": "bearer"})
+
+            def do_GET(self):
+                self.answer(fake.user)
+
+            def answer(self, data: dict):
+                fake.paths.append(self.path)
+                time.sleep(fake.delay)
+                status = fake.failure_statuses.pop(0) if fake.failure_statuses else 200
+                body = json.dumps(data if status == 200 else {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except OSError:
+                    # The client timed out and closed the connection
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def settings(self) -> dict:
+        """
+        Returns the settings for calling this server instead of GitHub.
+        """
+        url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        return {"GITHUB_URL": url, "GITHUB_API_URL": url}
+
+
+def use_temporary_media_root(test_case: TestCase):
+    """
+    Stores the files saved by the test case, including CSV imports, in temporary
+    directories, deleted after the test.
+    """
+    media_root = tempfile.TemporaryDirectory()
+    test_case.addCleanup(media_root.cleanup)
+    import_root = tempfile.TemporaryDirectory()
+    test_case.addCleanup(import_root.cleanup)
+    media_settings = override_settings(
+        MEDIA_ROOT=media_root.name, IMPORT_ROOT=import_root.name
+    )
+    media_settings.enable()
+    test_case.addCleanup(media_settings.disable)
+
+
+def image_file(name: str, size, mode="RGB", color="red", exif=None):
+    """
+    Returns an uploaded image of a single color, in PNG or JPEG depending on its name.
+    """
+    image = Image.new(mode, size, color)
+    buffer = io.BytesIO()
+    image_format = "PNG" if name.endswith(".png") else "JPEG"
+    if exif is None:
+        image.save(buffer, image_format)
+    else:
+        image.save(buffer, image_format, exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue())
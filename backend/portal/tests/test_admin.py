@@ -0,0 +1,162 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from portal.models import ClientOrg, Project, User
+from portal.pagination import EstimatedCountPaginator
+from rest_framework.test import APITestCase
+
+
+class UserAdminFilterTest(APITestCase):
+    """
+    Testing the role, term and year filters of the user changelist.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin@example.com", "password")
+        self.client.force_login(self.admin)
+        org = ClientOrg.objects.create(name="Org")
+        self.student = User.objects.create_user("student@example.com", "password")
+        self.ta = User.objects.create_user("ta@example.com", "password")
+        # TA in 2021, student in 2022
+        self.both = User.objects.create_user("both@example.com", "password")
+
+        project_2021 = Project.objects.create(
+            name="Project 2021", year=2021, term="F", client_org=org, ta=self.both
+        )
+        project_2021.students.add(self.student)
+        project_2022 = Project.objects.create(
+            name="Project 2022", year=2022, term="W", client_org=org, ta=self.ta
+        )
+        project_2022.students.add(self.both)
+
+    def filtered_users(self, **params) -> set:
+        response = self.client.get(reverse("admin:portal_user_changelist"), params)
+        self.assertEqual(response.status_code, 200)
+        return set(response.context["cl"].result_list)
+
+    def test_filters(self):
+        with self.subTest("Role"):
+            self.assertEqual(self.filtered_users(role="ta"), {self.ta, self.both})
+
+        with self.subTest("Year"):
+            self.assertEqual(
+                self.filtered_users(year="2021"), {self.student, self.both}
+            )
+
+        with self.subTest("Term"):
+            self.assertEqual(self.filtered_users(term="W"), {self.ta, self.both})
+
+        with self.subTest("Role, year and term must match the same project"):
+            self.assertEqual(self.filtered_users(role="ta", year="2021"), {self.both})
+            self.assertEqual(
+                self.filtered_users(role="students", year="2022", term="W"),
+                {self.both},
+            )
+            self.assertEqual(
+                self.filtered_users(role="ta", term="F", year="2022"), set()
+            )
+
+        with self.subTest("Invalid values are ignored"):
+            self.assertEqual(
+                self.filtered_users(role="ta", year="latest"), {self.ta, self.both}
+            )
+
+    def test_year_lookups(self):
+        response = self.client.get(reverse("admin:portal_user_changelist"))
+        year_filter = next(
+            spec
+            for spec in response.context["cl"].filter_specs
+            if getattr(spec, "parameter_name", None) == "year"
+        )
+        self.assertEqual(year_filter.lookup_choices, [(2021, "2021"), (2022, "2022")])
+
+
+class AdminChangelistTest(APITestCase):
+    """
+    Testing the searches, queries and counts of the changelists of large tables.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            "admin@example.com", "password", name="Grace Hopper"
+        )
+        self.client.force_login(self.admin)
+        self.user = User.objects.create_user(
+            "alovelace@example.com", "password", name="Ada Lovelace"
+        )
+        self.org = ClientOrg.objects.create(name="Foodbank Network")
+
+    def changelist(self, model: str, **params):
+        response = self.client.get(reverse(f"admin:portal_{model}_changelist"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    def add_project(self, name: str) -> Project:
+        return Project.objects.create(
+            name=name, year=2021, term="F", client_org=self.org, ta=self.user
+        )
+
+    def test_search(self):
+        project = self.add_project("Volunteer Scheduler")
+
+        with self.subTest("Users by email prefix"):
+            self.assertEqual(
+                list(self.changelist("user", q="alove").result_list), [self.user]
+            )
+
+        with self.subTest("Users by any word of their name"):
+            self.assertEqual(
+                list(self.changelist("user", q="lovelace").result_list), [self.user]
+            )
+
+        with self.subTest("Projects by name prefix and org name"):
+            for search in ["volunteer sch", "foodbank"]:
+                self.assertEqual(
+                    list(self.changelist("project", q=search).result_list), [project]
+                )
+
+        with self.subTest("Searches without words"):
+            self.assertEqual(self.changelist("user", q="@").result_count, 0)
+
+    def test_project_changelist_queries(self):
+        self.add_project("Project 1")
+        with CaptureQueriesContext(connection) as queries_before:
+            self.changelist("project")
+        for i in range(2, 5):
+            self.add_project(f"Project {i}")
+        with CaptureQueriesContext(connection) as queries_after:
+            self.changelist("project")
+        self.assertEqual(len(queries_before), len(queries_after))
+
+    def test_estimated_count(self):
+        class Paginator(EstimatedCountPaginator):
+            def estimate_count(self):
+                return 50000
+
+        with self.subTest("Unfiltered querysets of large tables are estimated"):
+            self.assertEqual(
+                Paginator(User.objects.order_by("email"), 100).count, 50000
+            )
+
+        with self.subTest("Filtered querysets are counted"):
+            self.assertEqual(
+                Paginator(
+                    User.objects.filter(name="Ada Lovelace").order_by("email"), 100
+                ).count,
+                1,
+            )
+
+        with self.subTest("Small tables are counted"):
+            self.assertEqual(
+                EstimatedCountPaginator(User.objects.order_by("email"), 100).count, 2
+            )
+
+        with self.subTest("Estimates are read from the table's statistics"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE portal_user")
+            self.assertEqual(
+                EstimatedCountPaginator(
+                    User.objects.order_by("email"), 100
+                ).estimate_count(),
+                2,
+            )
@@ -0,0 +1,97 @@
+from django.test import override_settings
+from django.urls import reverse
+from portal.models import User
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+
+class CachedTokenAuthenticationTest(APITestCase):
+    """
+    Testing that the users of tokens are cached, and evicted when they change
+    """
+
+    url = reverse("current-user-info")
+
+    def log_in(self, user) -> str:
+        token = Token.objects.get_or_create(user=user)[0].key
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        return token
+
+    def assertLoggedIn(self, user):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data["logged_in"])
+        self.assertEqual(response.data["id"], str(user.id))
+
+    def assertLoggedOut(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+
+    def test_cache(self):
+        user = User.objects.create_user("user@example.com", "password")
+        self.log_in(user)
+
+        with self.subTest("Users are cached"):
+            with self.assertNumQueries(1):
+                self.assertLoggedIn(user)
+            with self.assertNumQueries(0):
+                self.assertLoggedIn(user)
+
+        with self.subTest("Changed users are evicted"):
+            user.name = "Changed"
+            user.save()
+            with self.assertNumQueries(1):
+                self.assertLoggedIn(user)
+            self.assertEqual(self.client.get(self.url).data["name"], "Changed")
+
+        with self.subTest("Deactivated users are logged out"):
+            user.is_active = False
+            user.save()
+            self.assertLoggedOut()
+
+        with self.subTest("Deleted users are logged out"):
+            user = User.objects.create_user("deleted@example.com", "password")
+            self.log_in(user)
+            self.assertLoggedIn(user)
+            user.delete()
+            self.assertLoggedOut()
+
+        with self.subTest("Invalid tokens are not cached"):
+            self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+            self.assertLoggedOut()
+            with self.assertNumQueries(1):
+                self.assertLoggedOut()
+
+    @override_settings(TOKEN_CACHE_TIMEOUT=0)
+    def test_disabled_cache(self):
+        user = User.objects.create_user("user@example.com", "password")
+        self.log_in(user)
+        self.assertLoggedIn(user)
+        with self.assertNumQueries(1):
+            self.assertLoggedIn(user)
+
+    def test_deleted_tokens(self):
+        user = User.objects.create_user("user@example.com", "password")
+
+        with self.subTest("Logging out all sessions logs out the old token"):
+            old_token = self.log_in(user)
+            self.assertLoggedIn(user)
+            response = self.client.post(reverse("logout-all"))
+            self.assertEqual(response.status_code, 200)
+            self.assertLoggedOut()
+
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f"Token {response.data['token']}"
+            )
+            self.assertLoggedIn(user)
+            self.assertNotEqual(response.data["token"], old_token)
+
+        with self.subTest("Resetting the password logs out the old token"):
+            self.log_in(user)
+            self.assertLoggedIn(user)
+            response = self.client.post(
+                reverse("reset-password"),
+                {"currentPassword": "password", "newPassword": "a new password 123"},
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertLoggedOut()
@@ -1,5 +1,7 @@
 from django.urls import reverse
-from portal.models import User
+from portal.models import ClientOrg, Project, Tag, User
+from portal.serializers import ClientOrgDirectorySerializer
+from portal.tests.helpers import assert_constant_queries
 from rest_framework.test import APITestCase
 
 
@@ -193,3 +195,99 @@ class ClientOrgViewSetTest(APITestCase):
             self.assertNotEqual(
                 response.data["id"], "2b1f5466-9d6c-486c-8b49-e29690a35abe"
             )
+
+    def test_list_query_count(self):
+        def add_orgs(prefix):
+            for i in range(3):
+                org = ClientOrg.objects.create(name=f"{prefix} Org {i}")
+                org.reps.add(
+                    User.objects.create_user(f"{prefix}rep{i}@example.com", None)
+                )
+                project = Project.objects.create(
+                    name=f"{prefix} Project {i}",
+                    year=2021,
+                    term="F",
+                    is_published=True,
+                    client_org=org,
+                )
+                project.tags.add(Tag.objects.create(value=f"{prefix} Tag {i}"))
+
+        with self.subTest("Anonymous user"):
+            assert_constant_queries(
+                self,
+                lambda: self.client.get(reverse("org-list")),
+                lambda: add_orgs("anon"),
+            )
+
+        with self.subTest("Client rep"):
+            user = User.objects.get(id="dbfe48b1-5762-4b17-8560-b0d7e73d8bd9")
+            self.client.force_authenticate(user=user)
+            assert_constant_queries(
+                self,
+                lambda: self.client.get(reverse("org-list")),
+                lambda: add_orgs("rep"),
+            )
+
+    def test_directory(self):
+        org = ClientOrg.objects.create(name="Directory Org")
+        for name, year, is_published in [
+            ("Directory Project 1", 2020, True),
+            ("Directory Project 2", 2022, False),
+        ]:
+            Project.objects.create(
+                name=name,
+                year=year,
+                term="F",
+                is_published=is_published,
+                client_org=org,
+            )
+
+        def get_org(response):
+            return next(data for data in response.data if data["id"] == str(org.id))
+
+        with self.subTest("Anonymous users only count published projects"):
+            response = self.client.get(reverse("org-list"), {"compact": "true"})
+            self.assertEqual(response.status_code, 200)
+            data = get_org(response)
+            self.assertNotIn("projects", data)
+            self.assertEqual(data["num_projects"], 1)
+            self.assertEqual(data["latest_year"], 2020)
+            self.assertEqual(data["project_names"], ["Directory Project 1"])
+
+        with self.subTest("Admins count every project"):
+            user = User.objects.get(id="2b1f5466-9d6c-486c-8b49-e29690a35abe")
+            self.client.force_authenticate(user=user)
+            data = get_org(self.client.get(reverse("org-list"), {"compact": "true"}))
+            self.assertEqual(data["num_projects"], 2)
+            self.assertEqual(data["latest_year"], 2022)
+            self.assertEqual(
+                data["project_names"], ["Directory Project 1", "Directory Project 2"]
+            )
+
+        with self.subTest("Orgs without projects"):
+            empty_org = ClientOrg.objects.create(name="Empty Org")
+            data = next(
+                data
+                for data in self.client.get(
+                    reverse("org-list"), {"compact": "true"}
+                ).data
+                if data["id"] == str(empty_org.id)
+            )
+            self.assertEqual(data["num_projects"], 0)
+            self.assertIsNone(data["latest_year"])
+            self.assertEqual(data["project_names"], [])
+
+        with self.subTest("Without a request, only published projects are counted"):
+            queryset = ClientOrgDirectorySerializer.setup_eager_loading(
+                ClientOrg.objects.filter(id=org.id)
+            )
+            self.assertEqual(queryset.get().num_projects, 1)
+
+        with self.subTest("Directory is listed in constant queries"):
+            assert_constant_queries(
+                self,
+                lambda: self.client.get(reverse("org-list"), {"compact": "true"}),
+                lambda: ClientOrg.objects.bulk_create(
+                    [ClientOrg(name=f"Directory Org {i}") for i in range(3)]
+                ),
+            )
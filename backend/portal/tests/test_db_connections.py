@@ -0,0 +1,86 @@
+from config.db.base import DatabaseWrapper, PoolTimeout, pools
+from django.db import OperationalError, connection
+from django.test import TestCase
+
+
+class DatabaseConnectionTest(TestCase):
+    """
+    Testing the health checks and pooling of database connections
+    """
+
+    def create_connection(self, **settings):
+        # Another connection to the default database, as the postgres app
+        # looks up connections by alias
+        wrapper = DatabaseWrapper({**connection.settings_dict, **settings}, "default")
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def create_pool(self, **settings):
+        # Registered first to run after the connections are returned to the pool
+        self.addCleanup(
+            lambda: pools.pop(("default", connection.settings_dict["NAME"])).close()
+        )
+        return [
+            self.create_connection(POOL_SIZE=1, POOL_TIMEOUT=0.1, **settings)
+            for _ in range(2)
+        ]
+
+    def backend_pid(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def terminate(self, pid):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", [pid])
+
+    def start_request(self, wrapper):
+        # What the request_started signal does
+        wrapper.close_if_unusable_or_obsolete()
+
+    def test_health_checks(self):
+        with self.subTest("Closed connections are replaced"):
+            wrapper = self.create_connection(CONN_MAX_AGE=60, CONN_HEALTH_CHECKS=True)
+            pid = self.backend_pid(wrapper)
+            self.start_request(wrapper)
+            self.assertEqual(self.backend_pid(wrapper), pid)
+
+            self.terminate(pid)
+            self.start_request(wrapper)
+            self.assertNotEqual(self.backend_pid(wrapper), pid)
+
+        with self.subTest("Closed connections fail without health checks"):
+            wrapper = self.create_connection(CONN_MAX_AGE=60)
+            self.terminate(self.backend_pid(wrapper))
+            self.start_request(wrapper)
+            with self.assertRaises(OperationalError):
+                self.backend_pid(wrapper)
+
+    def test_pool(self):
+        first, second = self.create_pool(CONN_HEALTH_CHECKS=True)
+
+        with self.subTest("Closed connections are reused"):
+            pid = self.backend_pid(first)
+            first.close()
+            self.assertEqual(self.backend_pid(second), pid)
+
+        with self.subTest("Waiting for a connection times out"):
+            with self.assertRaises(PoolTimeout):
+                self.backend_pid(first)
+
+        with self.subTest("Connections in a transaction are rolled back"):
+            second.set_autocommit(False)
+            with second.cursor() as cursor:
+                cursor.execute("CREATE TEMPORARY TABLE rolled_back (id int)")
+            second.close()
+            with first.cursor() as cursor:
+                cursor.execute(
+                    "SELECT count(*) FROM pg_tables WHERE tablename = 'rolled_back'"
+                )
+                self.assertEqual(cursor.fetchone()[0], 0)
+
+        with self.subTest("Idle connections that were closed are replaced"):
+            pid = self.backend_pid(first)
+            first.close()
+            self.terminate(pid)
+            self.assertNotEqual(self.backend_pid(second), pid)
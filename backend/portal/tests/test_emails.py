@@ -0,0 +1,145 @@
+import socket
+from unittest.mock import patch
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from portal.emails import queue_email, send_proposal_email, send_queued_emails
+from portal.models import OutgoingEmail, Proposal
+from portal.tests.helpers import SMTPStandIn
+
+
+def queue_emails(recipients):
+    for recipient in recipients:
+        OutgoingEmail.objects.create(
+            subject="Subject", body="Body", recipients=[recipient]
+        )
+
+
+class EmailQueueTest(TestCase):
+    """
+    Testing the queueing of emails and the sending of queued emails
+    """
+
+    def test_queued_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            queue_email("Subject", "Body", None, ["user@example.com"])
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+        callbacks[0]()
+        self.assertEqual(send_queued_emails(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["user@example.com"])
+        self.assertIsNotNone(OutgoingEmail.objects.get().sent_at)
+
+        # Sent emails aren't sent again
+        self.assertEqual(send_queued_emails(), 0)
+
+    def test_send_over_one_connection(self):
+        queue_emails([f"user{i}@example.com" for i in range(5)])
+
+        with SMTPStandIn() as smtp, override_settings(**smtp.settings()):
+            self.assertEqual(send_queued_emails(batch_size=3), 3)
+            self.assertEqual(send_queued_emails(batch_size=3), 2)
+
+        self.assertEqual(smtp.num_connections, 2)
+        self.assertEqual(
+            [recipients for sender, recipients, data in smtp.messages],
+            [[f"user{i}@example.com"] for i in range(5)],
+        )
+
+    def test_retry_refused_email(self):
+        queue_emails(["refused@example.com", "user@example.com"])
+
+        with SMTPStandIn(refused_recipients=["refused@example.com"]) as smtp:
+            with override_settings(**smtp.settings()):
+                self.assertEqual(send_queued_emails(), 1)
+
+                refused = OutgoingEmail.objects.get(recipients=["refused@example.com"])
+                self.assertIsNone(refused.sent_at)
+                self.assertEqual(refused.attempts, 1)
+                self.assertGreater(refused.next_attempt_at, timezone.now())
+
+                # Not retried until the retry delay has passed
+                self.assertEqual(send_queued_emails(), 0)
+
+        self.assertEqual(len(smtp.messages), 1)
+
+    def test_retry_with_server_down(self):
+        queue_emails(["user@example.com"])
+
+        # Find a port that nothing is listening on
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            port = unused.getsockname()[1]
+
+        with override_settings(
+            EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+            EMAIL_HOST="127.0.0.1",
+            EMAIL_PORT=port,
+            EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER="",
+        ):
+            self.assertEqual(send_queued_emails(), 0)
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn("ConnectionRefusedError", email.last_error)
+
+    def test_invalid_email(self):
+        OutgoingEmail.objects.create(
+            subject="Before", body="Body", recipients=["user@example.com"]
+        )
+        OutgoingEmail.objects.create(
+            subject="Bad\nheader", body="Body", recipients=["user@example.com"]
+        )
+        OutgoingEmail.objects.create(
+            subject="After", body="Body", recipients=["user@example.com"]
+        )
+
+        self.assertEqual(send_queued_emails(), 2)
+        self.assertEqual(send_queued_emails(), 0)
+        self.assertEqual(
+            [message.subject for message in mail.outbox], ["Before", "After"]
+        )
+
+        invalid = OutgoingEmail.objects.get(subject="Bad\nheader")
+        self.assertIsNone(invalid.sent_at)
+        self.assertEqual(invalid.attempts, 1)
+        self.assertIn("BadHeaderError", invalid.last_error)
+        self.assertEqual(OutgoingEmail.objects.filter(sent_at__isnull=False).count(), 2)
+
+    def test_unexpected_error(self):
+        queue_emails(["user@example.com"])
+
+        for _ in range(OutgoingEmail.MAX_ATTEMPTS):
+            with patch("portal.emails.EmailMessage", side_effect=RuntimeError("Bug")):
+                with self.assertRaises(RuntimeError):
+                    send_queued_emails()
+            # Retried once the claim expires
+            OutgoingEmail.objects.update(next_attempt_at=timezone.now())
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.attempts, OutgoingEmail.MAX_ATTEMPTS)
+        self.assertIsNone(email.sent_at)
+
+        # Given up on once out of attempts
+        self.assertEqual(send_queued_emails(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_proposal_subject(self):
+        proposal = Proposal(
+            rep_name="Eve\nBcc: eve@example.com",
+            email="eve@example.com",
+            project_info="Info",
+            date=timezone.now().date(),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            send_proposal_email(proposal, ["admin@example.com"])
+
+        self.assertEqual(send_queued_emails(), 1)
+        self.assertEqual(
+            mail.outbox[0].subject,
+            "New CMPUT 401 project proposal from Eve Bcc: eve@example.com",
+        )
+        self.assertEqual(mail.outbox[0].bcc, [])
@@ -0,0 +1,124 @@
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from portal.models import ClientOrg, Project, Tag, User
+from rest_framework.test import APITestCase
+
+
+class ConditionalGetTest(APITestCase):
+    """
+    Testing the ETags and 304 responses of the project, org and user endpoints
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            "student@example.com", "password", name="Student"
+        )
+        self.org = ClientOrg.objects.create(name="Org")
+        self.project = Project.objects.create(
+            name="Project", year=2021, term="F", client_org=self.org, is_published=True
+        )
+        self.project.students.add(self.student)
+
+        # Authenticate so that the responses aren't served from the anonymous cache
+        self.client.force_authenticate(
+            user=User.objects.create_user("viewer@example.com", "password")
+        )
+
+    def assert_etag_changes(self, url, change):
+        """
+        Asserts that a conditional request for the url is answered with 304 using a
+        single query, and that the ETag of the url changes after calling change.
+        """
+        # Moves the stamps into the past, so that the stamps set by change are later
+        # even if the clock hasn't ticked since they were last set
+        for model in [User, ClientOrg, Project]:
+            model.objects.update(
+                updated_at=F("updated_at") - timezone.timedelta(seconds=1)
+            )
+
+        etag = self.client.get(url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_project_detail(self):
+        url = reverse("project-detail", args=(self.project.id,))
+
+        with self.subTest("Adding a tag"):
+            tag = Tag.objects.create(value="Django")
+            self.assert_etag_changes(url, lambda: self.project.tags.add(tag))
+
+        with self.subTest("Renaming a tag"):
+            tag.value = "Flask"
+            self.assert_etag_changes(url, tag.save)
+
+        with self.subTest("Renaming a student"):
+            self.student.name = "Renamed"
+            self.assert_etag_changes(url, self.student.save)
+
+        with self.subTest("Renaming the org"):
+            self.org.name = "Renamed"
+            self.assert_etag_changes(url, self.org.save)
+
+    def test_org_detail(self):
+        url = reverse("org-detail", args=(self.org.id,))
+
+        with self.subTest("Adding a rep"):
+            self.assert_etag_changes(url, lambda: self.org.reps.add(self.student))
+
+        with self.subTest("Changing a project's tagline"):
+            self.project.tagline = "New tagline"
+            self.assert_etag_changes(url, self.project.save)
+
+        with self.subTest("Unpublishing a project"):
+            Project.objects.create(
+                name="Other",
+                year=2021,
+                term="F",
+                client_org=self.org,
+                is_published=True,
+            )
+            self.project.is_published = False
+            self.assert_etag_changes(url, self.project.save)
+
+    def test_user_detail(self):
+        url = reverse("user-detail", args=(self.student.id,))
+
+        with self.subTest("Renaming a project of the user"):
+            self.project.name = "Renamed"
+            self.assert_etag_changes(url, self.project.save)
+
+        with self.subTest("Removing the user from a project"):
+            self.assert_etag_changes(
+                url, lambda: self.project.students.remove(self.student)
+            )
+
+    def test_lists(self):
+        with self.subTest("Publishing a project"):
+            unpublished = Project.objects.create(
+                name="Unpublished", year=2021, term="F"
+            )
+            unpublished.is_published = True
+            self.assert_etag_changes(reverse("project-list"), unpublished.save)
+
+        with self.subTest("Changing the type of an org"):
+            self.org.type = "NP"
+            self.assert_etag_changes(reverse("org-list"), self.org.save)
+
+        with self.subTest("ETags depend on the query params"):
+            etag = self.client.get(reverse("project-list"))["ETag"]
+            response = self.client.get(
+                f'{reverse("project-list")}?page_size=1', HTTP_IF_NONE_MATCH=etag
+            )
+            self.assertEqual(response.status_code, 200)
+
+    def test_not_found(self):
+        response = self.client.get(reverse("project-detail", args=("invalid",)))
+        self.assertEqual(response.status_code, 404)
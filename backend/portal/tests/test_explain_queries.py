@@ -0,0 +1,50 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from portal.management.commands.explain_queries import canonical_queries
+
+
+class ExplainQueriesTest(TestCase):
+    """
+    Testing the command that explains the portal's frequent queries
+    """
+
+    def explain(self, *names) -> str:
+        output = StringIO()
+        call_command("explain_queries", *names, stdout=output)
+        return output.getvalue()
+
+    def test_explain_queries(self):
+        with self.subTest("All queries are explained by default"):
+            output = self.explain()
+            for name in canonical_queries():
+                self.assertIn(name, output)
+            self.assertIn("actual time", output)
+
+        with self.subTest("Queries can be chosen"):
+            output = self.explain("tag_by_value")
+            self.assertNotIn("published_projects", output)
+
+        with self.subTest("Unknown queries are rejected"):
+            with self.assertRaises(CommandError):
+                self.explain("unknown")
+
+    def test_indexes_are_usable(self):
+        # The tables are too small for the planner to prefer indexes on its own
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+        for name, index in [
+            ("tag_by_value", "tag_value_upper_uniq"),
+            ("home_page_projects", "project_published_idx"),
+            ("projects_by_year_and_term", "project_year_term_idx"),
+            ("users_by_year_term_and_role", "membership_year_term_idx"),
+            ("users_by_email_prefix", "user_email_upper_prefix_idx"),
+            ("projects_by_name_prefix", "project_name_upper_prefix_idx"),
+            ("unusable_reset_requests", "reset_request_used_idx"),
+            ("user_by_github_username", "portal_user_github__a54676_idx"),
+        ]:
+            with self.subTest(name):
+                self.assertIn(index, self.explain(name))
@@ -0,0 +1,113 @@
+from django.test import override_settings
+from django.urls import reverse
+from portal.github import GitHubClient, GitHubError, github_stats, reset_github_stats
+from portal.models import User
+from portal.tests.helpers import FakeGitHub
+from rest_framework.test import APITestCase
+
+
+class GitHubClientTest(APITestCase):
+    """
+    Testing the client for GitHub against a local stand-in for GitHub
+    """
+
+    def setUp(self):
+        reset_github_stats()
+        self.addCleanup(reset_github_stats)
+
+    def test_requests(self):
+        with FakeGitHub() as github, override_settings(**github.settings()):
+            client = GitHubClient()
+
+            with self.subTest("Responses are returned"):
+                self.assertEqual(
+                    client.get_access_token("code")["access_token"], "token"
+                )
+                self.assertEqual(client.get_user_info("token"), github.user)
+
+            with self.subTest("Connections are reused"):
+                client.get_user_info("token")
+                self.assertEqual(len(github.paths), 3)
+                self.assertEqual(github.num_connections, 1)
+
+            with self.subTest("Calls are counted"):
+                stats = github_stats()
+                self.assertEqual(stats["access_token"]["calls"], 1)
+                self.assertEqual(stats["user"]["calls"], 2)
+                self.assertEqual(stats["user"]["failures"], 0)
+                self.assertIsNotNone(stats["user"]["average_ms"])
+
+    @override_settings(GITHUB_READ_TIMEOUT=0.2)
+    def test_timeouts(self):
+        with FakeGitHub(delay=1) as github, override_settings(**github.settings()):
+            client = GitHubClient()
+
+            with self.subTest("Slow responses time out"):
+                with self.assertRaises(GitHubError):
+                    client.get_access_token("code")
+
+            with self.subTest("Exchanging codes isn't retried"):
+                self.assertEqual(github.paths, ["/login/oauth/access_token"])
+                self.assertEqual(github_stats()["access_token"]["failures"], 1)
+
+    @override_settings(GITHUB_RETRIES=2)
+    def test_retries(self):
+        with self.subTest("Unavailable responses are retried"):
+            with FakeGitHub(failure_statuses=[503, 502]) as github, override_settings(
+                **github.settings()
+            ):
+                self.assertEqual(GitHubClient().get_user_info("token"), github.user)
+                self.assertEqual(github.paths, ["/user"] * 3)
+
+        with self.subTest("Retries are bounded"):
+            with FakeGitHub(failure_statuses=[503] * 5) as github, override_settings(
+                **github.settings()
+            ):
+                with self.assertRaises(GitHubError):
+                    GitHubClient().get_user_info("token")
+                self.assertEqual(github.paths, ["/user"] * 3)
+
+        with self.subTest("Errors are not retried"):
+            with FakeGitHub(failure_statuses=[401]) as github, override_settings(
+                **github.settings()
+            ):
+                with self.assertRaises(GitHubError):
+                    GitHubClient().get_user_info("token")
+                self.assertEqual(github.paths, ["/user"])
+
+        with self.subTest("Changes to the setting apply to existing clients"):
+            client = GitHubClient()
+            with FakeGitHub(failure_statuses=[503]) as github, override_settings(
+                GITHUB_RETRIES=0, **github.settings()
+            ):
+                with self.assertRaises(GitHubError):
+                    client.get_user_info("token")
+                self.assertEqual(github.paths, ["/user"])
+
+    def test_github_login(self):
+        url = reverse("login", kwargs={"auth_type": "oauth2"})
+        user = User.objects.create_user(
+            "octocat@example.com",
+            None,
+            github_username="octocat",
+            github_user_id="1234",
+        )
+
+        with self.subTest("Logging in calls GitHub"):
+            with FakeGitHub() as github, override_settings(**github.settings()):
+                response = self.client.post(
+                    url, {"provider": "GitHub", "code": "12345"}
+                )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["user"]["id"], str(user.id))
+            self.assertEqual(github.paths, ["/login/oauth/access_token", "/user"])
+
+        with self.subTest("Logging in fails when GitHub is unavailable"):
+            with FakeGitHub(failure_statuses=[503]) as github, override_settings(
+                **github.settings()
+            ):
+                response = self.client.post(
+                    url, {"provider": "GitHub", "code": "12345"}
+                )
+            self.assertEqual(response.status_code, 503)
+            self.assertFalse(response.data["success"])
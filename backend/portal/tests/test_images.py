@@ -0,0 +1,172 @@
+from unittest.mock import patch
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from PIL import Image
+from portal.images import process_images
+from portal.models import ClientOrg, Project, User
+from portal.serializers import ProjectSerializer
+from portal.tests.helpers import image_file, use_temporary_media_root
+from rest_framework.test import APITestCase
+
+
+def open_derivative(url: str) -> Image.Image:
+    with default_storage.open(url.split("/media/", 1)[1]) as file:
+        image = Image.open(file)
+        image.load()
+    return image
+
+
+class ImageVariantsTest(APITestCase):
+    """
+    Testing the derivatives of uploaded images made by the process_images worker.
+    """
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        self.org = ClientOrg.objects.create(name="Org")
+        self.project = Project.objects.create(
+            name="Project", year=2022, term="F", client_org=self.org, is_published=True
+        )
+
+    def get_project(self) -> dict:
+        response = self.client.get(
+            reverse("project-detail", kwargs={"pk": self.project.id})
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_variants(self):
+        # A photo taken sideways, rotated by its EXIF orientation
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = "Camera maker"
+        self.project.screenshot = image_file("screenshot.jpg", (2000, 1000), exif=exif)
+        self.project.save()
+
+        with self.subTest("No variants until processed"):
+            self.assertIsNone(self.get_project()["screenshot_variants"])
+
+        self.assertEqual(process_images(), 1)
+        variants = self.get_project()["screenshot_variants"]
+
+        with self.subTest("Variants fit their sizes in both formats, without EXIF"):
+            for variant, (width, height) in {
+                "thumbnail": (80, 160),
+                "card": (240, 480),
+                "full": (800, 1600),
+            }.items():
+                self.assertEqual(variants[variant]["width"], width)
+                self.assertEqual(variants[variant]["height"], height)
+                for extension, image_format in [("webp", "WEBP"), ("jpeg", "JPEG")]:
+                    self.assertTrue(
+                        variants[variant][extension].startswith("http://testserver/")
+                    )
+                    image = open_derivative(variants[variant][extension])
+                    self.assertEqual(image.format, image_format)
+                    self.assertEqual(image.size, (width, height))
+                    self.assertEqual(len(image.getexif()), 0)
+
+        with self.subTest("srcset lists each variant"):
+            self.assertEqual(
+                variants["srcset"]["webp"],
+                f"{variants['thumbnail']['webp']} 80w, "
+                f"{variants['card']['webp']} 240w, "
+                f"{variants['full']['webp']} 800w",
+            )
+
+        with self.subTest("Processed images aren't processed again"):
+            self.assertEqual(process_images(), 0)
+
+        with self.subTest("Variants of a previous image are ignored and replaced"):
+            self.project.screenshot = image_file("screenshot.jpg", (100, 50))
+            self.project.save()
+            self.assertIsNone(self.get_project()["screenshot_variants"])
+
+            self.assertEqual(process_images(), 1)
+            variants = self.get_project()["screenshot_variants"]
+            self.assertEqual(variants["full"]["width"], 100)
+            # Smaller than every variant, so they are the same file
+            self.assertEqual(variants["thumbnail"]["webp"], variants["full"]["webp"])
+            self.assertEqual(
+                variants["srcset"]["jpeg"], f"{variants['thumbnail']['jpeg']} 100w"
+            )
+
+    def test_identical_derivatives_are_stored_once(self):
+        self.project.logo_image = image_file("logo.png", (600, 600))
+        self.project.save()
+        self.org.image = image_file("org.png", (600, 600))
+        self.org.save()
+        self.assertEqual(process_images(), 2)
+
+        self.project.refresh_from_db()
+        self.org.refresh_from_db()
+        self.assertNotEqual(self.project.logo_image.name, self.org.image.name)
+        self.assertEqual(
+            self.project.logo_image_variants["variants"],
+            self.org.image_variants["variants"],
+        )
+
+    def test_transparency(self):
+        self.project.logo_image = image_file(
+            "logo.png", (200, 200), mode="RGBA", color=(0, 0, 0, 0)
+        )
+        self.project.save()
+        process_images()
+        variants = self.get_project()["logo_image_variants"]
+
+        self.assertEqual(open_derivative(variants["card"]["webp"]).mode, "RGBA")
+        self.assertEqual(
+            open_derivative(variants["card"]["jpeg"]).getpixel((0, 0)),
+            (255, 255, 255),
+        )
+
+    def test_unreadable_image(self):
+        self.project.screenshot = SimpleUploadedFile("screenshot.jpg", b"not an image")
+        self.project.save()
+
+        self.assertEqual(process_images(), 1)
+        self.project.refresh_from_db()
+        self.assertIn("error", self.project.screenshot_variants)
+
+        with self.subTest("Not retried"):
+            self.assertEqual(process_images(), 0)
+
+        with self.subTest("The original image is shown instead"):
+            data = self.get_project()
+            self.assertIsNone(data["screenshot_variants"])
+            self.assertTrue(data["screenshot"].endswith(".jpg"))
+
+    def test_unexpected_error(self):
+        self.project.screenshot = image_file("screenshot.jpg", (300, 300))
+        self.project.save()
+
+        with patch(
+            "portal.images.default_storage.save", side_effect=OSError("Disk full")
+        ):
+            self.assertEqual(process_images(), 0)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.screenshot_variants, {})
+
+        with self.subTest("Retried on the next run"):
+            self.assertEqual(process_images(), 1)
+            self.assertIsNotNone(self.get_project()["screenshot_variants"])
+
+    def test_related_instances_are_updated(self):
+        user = User.objects.create_user("user@example.com", "password")
+        self.project.students.add(user)
+        user.image = image_file("user.jpg", (300, 300))
+        user.save()
+        self.org.image = image_file("org.jpg", (300, 300))
+        self.org.save()
+        self.project.refresh_from_db()
+        updated_at = self.project.updated_at
+
+        self.assertEqual(process_images(), 2)
+
+        self.project.refresh_from_db()
+        self.assertGreater(self.project.updated_at, updated_at)
+        data = ProjectSerializer(self.project).data
+        self.assertIsNotNone(data["students"][0]["image_variants"])
+        self.assertIsNotNone(data["client_org"]["image_variants"])
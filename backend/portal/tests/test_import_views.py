@@ -1,8 +1,26 @@
-import pandas as pd
+import json
+import os
+import uuid
+
+from django.conf import settings
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from portal.import_views import CSVData, import_data
-from portal.models import ClientOrg, Project, User
+from django.utils import timezone
+from portal.import_jobs import JobRequest, run_import_jobs
+from portal.import_views import (
+    CSVData,
+    generate_response,
+    import_data,
+    parse_csv,
+    save_data,
+    validate_data,
+)
+from portal.models import ClientOrg, ImportJob, OutgoingEmail, Project, User
+from portal.serializers import ClientOrgSerializer, ProjectSerializer, UserSerializer
+from portal.tests.helpers import use_temporary_media_root
 from rest_framework.test import APITestCase
 
 VALID_CSV = b"""project_name,project_year,project_term,client_org_name,client_rep_email,client_rep_name,client_rep_github_username,ta_email,ta_name,ta_github_username,student_email,student_name,student_github_username
@@ -24,6 +42,17 @@ BAD_DATA_CSV = b"""project_name,project_year,project_term,client_org_name,client
                 ,,,,,,,,,,,,"""
 
 
+def normalize(data):
+    """
+    Converts serialized data to plain JSON types with lists in a fixed order.
+    """
+    if isinstance(data, dict):
+        return {key: normalize(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return sorted((normalize(item) for item in data), key=repr)
+    return data
+
+
 class CSVImportTest(APITestCase):
     """
     Testing the CSV validation and importing functionality.
@@ -32,6 +61,22 @@ class CSVImportTest(APITestCase):
     # "CMPUT 401 Project Portal" and its org/users created, but not "New Project"
     fixtures = ["csv_import_test.json"]
 
+    def setUp(self):
+        use_temporary_media_root(self)
+
+    def run_job(self, url: str, csv: bytes) -> dict:
+        """
+        Uploads the CSV, runs the queued job like the worker would,
+        and returns the finished job.
+        """
+        response = self.client.post(url, {"file": SimpleUploadedFile("data.csv", csv)})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], "queued")
+        run_import_jobs()
+        response = self.client.get(reverse("import_job", args=(response.data["id"],)))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
     # Test the CSV validation view
     def test_validate_view(self):
         with self.subTest("Anonymous users can't validate"):
@@ -62,13 +107,17 @@ class CSVImportTest(APITestCase):
             self.client.force_authenticate(user=user)
 
             # Act
-            csv_file = SimpleUploadedFile("data.csv", VALID_CSV)
-            response = self.client.post(reverse("validate_csv"), {"file": csv_file})
+            job = self.run_job(reverse("validate_csv"), VALID_CSV)
 
             # Assert
-            self.assertEqual(response.status_code, 200)
-            self.assertEqual(len(response.data["errors"]), 0)
-            self.assertEqual(len(response.data["warnings"]), 0)
+            self.assertEqual(job["status"], "succeeded")
+            self.assertEqual(len(job["result"]["errors"]), 0)
+            self.assertEqual(len(job["result"]["warnings"]), 0)
+            self.assertEqual(
+                job["counts"],
+                {"rows": 9, "users": 10, "orgs": 1, "projects": 2, "links": 9},
+            )
+            self.assertEqual(set(job["timings"]), {"parse", "validate", "respond"})
 
         with self.subTest("400 response if no file is uploaded"):
             # Arrange
@@ -82,32 +131,30 @@ class CSVImportTest(APITestCase):
             self.assertEqual(response.status_code, 400)
             self.assertTrue(response.data["errors"][0].startswith("Error parsing CSV"))
 
-        with self.subTest("400 response if CSV is invalid"):
+        with self.subTest("Job fails if CSV is invalid"):
             # Arrange
             user = User.objects.get(id="656098e6-990b-41e2-9c01-5686798f5bc0")  # Admin
             self.client.force_authenticate(user=user)
 
             # Act
-            csv_file = SimpleUploadedFile("data.csv", INVALID_CSV)
-            response = self.client.post(reverse("validate_csv"), {"file": csv_file})
+            job = self.run_job(reverse("validate_csv"), INVALID_CSV)
 
             # Assert
-            self.assertEqual(response.status_code, 400)
-            self.assertTrue(response.data["errors"][0].startswith("Error parsing CSV"))
+            self.assertEqual(job["status"], "failed")
+            self.assertTrue(job["result"]["errors"][0].startswith("Error parsing CSV"))
 
-        with self.subTest("400 response if data import fails"):
+        with self.subTest("Job fails if data import fails"):
             # Arrange
             user = User.objects.get(id="656098e6-990b-41e2-9c01-5686798f5bc0")  # Admin
             self.client.force_authenticate(user=user)
 
             # Act
-            csv_file = SimpleUploadedFile("data.csv", BAD_DATA_CSV)
-            response = self.client.post(reverse("validate_csv"), {"file": csv_file})
+            job = self.run_job(reverse("validate_csv"), BAD_DATA_CSV)
 
             # Assert
-            self.assertEqual(response.status_code, 400)
+            self.assertEqual(job["status"], "failed")
             self.assertTrue(
-                response.data["errors"][0].startswith("Error importing data")
+                job["result"]["errors"][0].startswith("Error importing data")
             )
 
         with self.subTest("Validate endpoint does not modify any data"):
@@ -116,62 +163,149 @@ class CSVImportTest(APITestCase):
             self.client.force_authenticate(user=user)
 
             # Act
-            csv_file = SimpleUploadedFile("data.csv", VALID_CSV)
-            response = self.client.post(reverse("validate_csv"), {"file": csv_file})
+            job = self.run_job(reverse("validate_csv"), VALID_CSV)
 
             # Assert
-            self.assertEqual(response.status_code, 200)
-            self.assertEqual(len(response.data["errors"]), 0)
-            self.assertEqual(len(response.data["warnings"]), 0)
+            self.assertEqual(job["status"], "succeeded")
             self.assertEqual(Project.objects.filter(name="New Project").count(), 0)
             self.assertEqual(
                 User.objects.filter(email__startswith="newstudent").count(), 0
             )
 
+    def test_import_view(self):
+        user = User.objects.get(id="656098e6-990b-41e2-9c01-5686798f5bc0")  # Admin
+        self.client.force_authenticate(user=user)
+
+        with self.subTest("Jobs are queued until the worker runs them"):
+            response = self.client.post(
+                reverse("import_csv"),
+                {"file": SimpleUploadedFile("data.csv", VALID_CSV)},
+            )
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(Project.objects.filter(name="New Project").count(), 0)
+            job = ImportJob.objects.get(id=response.data["id"])
+            self.assertEqual(job.status, ImportJob.QUEUED)
+            self.assertFalse(job.dry_run)
+            upload = job.file.name
+
+        with self.subTest("Uploads are stored privately under random names"):
+            self.assertEqual(upload, f"imports/{uuid.UUID(upload[8:-4])}.csv")
+            path = os.path.realpath(job.file.path)
+            self.assertTrue(path.startswith(os.path.realpath(settings.IMPORT_ROOT)))
+            self.assertFalse(path.startswith(os.path.realpath(settings.MEDIA_ROOT)))
+
+        with self.subTest("Imports are saved"):
+            with self.captureOnCommitCallbacks(execute=True):
+                run_import_jobs()
+            job.refresh_from_db()
+            self.assertEqual(job.status, ImportJob.SUCCEEDED)
+            self.assertEqual(job.result["errors"], [])
+            self.assertEqual(
+                Project.objects.filter(name__endswith="New Project").count(), 1
+            )
+            self.assertEqual(
+                User.objects.filter(email__startswith="newstudent").count(), 2
+            )
+
+        with self.subTest("Uploads are deleted once imported"):
+            self.assertFalse(job.file)
+            self.assertFalse(job.file.storage.exists(upload))
+
+        with self.subTest("Failed imports change nothing"):
+            num_projects = Project.objects.count()
+            job = self.run_job(reverse("import_csv"), BAD_DATA_CSV)
+            self.assertEqual(job["status"], "failed")
+            self.assertEqual(Project.objects.count(), num_projects)
+
+        with self.subTest("Non-admins can't see jobs"):
+            self.client.force_authenticate(
+                user=User.objects.get(id="10d5efa9-0f37-4fab-88f3-ed036ab2442e")
+            )
+            response = self.client.get(reverse("import_job", args=(job["id"],)))
+            self.assertEqual(response.status_code, 403)
+
+    def test_stale_jobs(self):
+        def running_job(started_at):
+            return ImportJob.objects.create(
+                file=SimpleUploadedFile("data.csv", VALID_CSV),
+                status=ImportJob.RUNNING,
+                started_at=started_at,
+            )
+
+        stale = running_job(timezone.now() - ImportJob.MAX_RUN_DURATION * 2)
+        upload = stale.file.name
+        running = running_job(timezone.now())
+
+        self.assertEqual(run_import_jobs(), 0)
+
+        with self.subTest("Jobs running for too long are failed"):
+            stale.refresh_from_db()
+            self.assertEqual(stale.status, ImportJob.FAILED)
+            self.assertEqual(len(stale.result["errors"]), 1)
+            self.assertIsNotNone(stale.finished_at)
+            self.assertFalse(stale.file.storage.exists(upload))
+
+        with self.subTest("Running jobs are left to finish"):
+            running.refresh_from_db()
+            self.assertEqual(running.status, ImportJob.RUNNING)
+            self.assertTrue(running.file)
+
+    def test_parse_csv(self):
+        with self.subTest("Distinct users, orgs, projects and links are kept"):
+            data = parse_csv(SimpleUploadedFile("data.csv", VALID_CSV))
+            # 8 students, 1 TA and 1 client rep
+            self.assertEqual(len(data.users), 10)
+            self.assertEqual(
+                data.users[0], ("wfenton@ualberta.ca", "Will Fenton", "willfenton")
+            )
+            self.assertEqual(len(data.client_orgs), 1)
+            self.assertEqual(len(data.projects), 2)
+            self.assertEqual(data.projects[1][1:], ("2021", "Winter"))
+            self.assertEqual(len(data.links), 9)
+
+        with self.subTest("Repeated links are ordered by their last row"):
+            header = b"project_name,project_year,project_term,client_org_name,client_rep_email,client_rep_name,client_rep_github_username,ta_email,ta_name,ta_github_username,student_email,student_name,student_github_username"
+            rows = [
+                b"A,2021,Fall,Org 1,rep@example.com,Rep,,ta@example.com,TA,,s@example.com,S,",
+                b"A,2021,Fall,Org 2,rep@example.com,Rep,,ta@example.com,TA,,s@example.com,S,",
+                b"A,2021,Fall,Org 1,rep@example.com,Rep,,ta@example.com,TA,,s@example.com,S,",
+            ]
+            data = parse_csv(
+                SimpleUploadedFile("data.csv", b"\r\n".join([header] + rows))
+            )
+            self.assertEqual([link[1] for link in data.links], ["Org 2", "Org 1"])
+
+        with self.subTest("Missing columns are rejected"):
+            with self.assertRaises(ValueError):
+                parse_csv(SimpleUploadedFile("data.csv", b"project_name\nA"))
+
     def test_import_data_happy_path(self):
         with self.subTest("Happy path"):
             # Arrange
-            users = pd.DataFrame(
+            users = [
+                ["student1@example.com", "Student 1", "student1"],
+                ["student2@example.com", "Student 2", "student2"],
+                ["ta@example.com", "Teaching Assistant", "ta"],
+                ["rep@example.com", "Client Representative", "rep"],
+            ]
+            client_orgs = ["Client Organization"]
+            projects = [["Project", "2021", "Fall"]]
+            links = [
                 [
-                    ["student1@example.com", "Student 1", "student1"],
-                    ["student2@example.com", "Student 2", "student2"],
-                    ["ta@example.com", "Teaching Assistant", "ta"],
-                    ["rep@example.com", "Client Representative", "rep"],
+                    "Project",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "student1@example.com",
                 ],
-                columns=["email", "name", "github_username"],
-            )
-            client_orgs = pd.DataFrame(
-                [["Client Organization"]], columns=["client_org_name"]
-            )
-            projects = pd.DataFrame(
-                [["Project", "2021", "Fall"]],
-                columns=["project_name", "project_year", "project_term"],
-            )
-            links = pd.DataFrame(
                 [
-                    [
-                        "Project",
-                        "Client Organization",
-                        "rep@example.com",
-                        "ta@example.com",
-                        "student1@example.com",
-                    ],
-                    [
-                        "Project",
-                        "Client Organization",
-                        "rep@example.com",
-                        "ta@example.com",
-                        "student2@example.com",
-                    ],
+                    "Project",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "student2@example.com",
                 ],
-                columns=[
-                    "project_name",
-                    "client_org_name",
-                    "client_rep_email",
-                    "ta_email",
-                    "student_email",
-                ],
-            )
+            ]
             csv_data = CSVData(users, client_orgs, projects, links)
 
             # Act
@@ -218,42 +352,25 @@ class CSVImportTest(APITestCase):
 
         with self.subTest("Happy path using existing data"):
             # Arrange
-            users = pd.DataFrame(
-                [["wfenton@ualberta.ca", "", ""], ["aakindel@ualberta.ca", "", ""]],
-                columns=["email", "name", "github_username"],
-            )
-            client_orgs = pd.DataFrame(
-                [["Client Organization"]], columns=["client_org_name"]
-            )
-            projects = pd.DataFrame(
-                [["Project", "2021", "Fall"]],
-                columns=["project_name", "project_year", "project_term"],
-            )
-            links = pd.DataFrame(
+            users = [["wfenton@ualberta.ca", "", ""], ["aakindel@ualberta.ca", "", ""]]
+            client_orgs = ["Client Organization"]
+            projects = [["Project", "2021", "Fall"]]
+            links = [
                 [
-                    [
-                        "Project",
-                        "Client Organization",
-                        "rep@example.com",
-                        "ta@example.com",
-                        "aakindel@ualberta.ca",
-                    ],
-                    [
-                        "Project",
-                        "Client Organization",
-                        "rep@example.com",
-                        "ta@example.com",
-                        "wfenton@ualberta.ca",
-                    ],
+                    "Project",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "aakindel@ualberta.ca",
                 ],
-                columns=[
-                    "project_name",
-                    "client_org_name",
-                    "client_rep_email",
-                    "ta_email",
-                    "student_email",
+                [
+                    "Project",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "wfenton@ualberta.ca",
                 ],
-            )
+            ]
             csv_data = CSVData(users, client_orgs, projects, links)
 
             # Act
@@ -280,48 +397,31 @@ class CSVImportTest(APITestCase):
     def test_import_data_sad_path(self):
         with self.subTest("Error when importing user with same name as existing user"):
             # Arrange
-            users = pd.DataFrame(
+            users = [
+                ["student1@example.com", "Student 1", "student1"],
+                ["student2@example.com", "Student 2", "student2"],
+                ["ta@example.com", "Teaching Assistant", "ta"],
+                # there is already a user with the name "Ildar Akhmetov"
+                ["rep@example.com", "Ildar Akhmetov", "rep"],
+            ]
+            client_orgs = ["Client Organization"]
+            projects = [["Project", "2021", "Fall"]]
+            links = [
                 [
-                    ["student1@example.com", "Student 1", "student1"],
-                    ["student2@example.com", "Student 2", "student2"],
-                    ["ta@example.com", "Teaching Assistant", "ta"],
-                    # there is already a user with the name "Ildar Akhmetov"
-                    ["rep@example.com", "Ildar Akhmetov", "rep"],
+                    "Project",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "student1@example.com",
                 ],
-                columns=["email", "name", "github_username"],
-            )
-            client_orgs = pd.DataFrame(
-                [["Client Organization"]], columns=["client_org_name"]
-            )
-            projects = pd.DataFrame(
-                [["Project", "2021", "Fall"]],
-                columns=["project_name", "project_year", "project_term"],
-            )
-            links = pd.DataFrame(
                 [
-                    [
-                        "Project",
-                        "Client Organization",
-                        "rep@example.com",
-                        "ta@example.com",
-                        "student1@example.com",
-                    ],
-                    [
-                        "Project",
-                        "Client Organization",
-                        "rep@example.com",
-                        "ta@example.com",
-                        "student2@example.com",
-                    ],
-                ],
-                columns=[
-                    "project_name",
-                    "client_org_name",
-                    "client_rep_email",
-                    "ta_email",
-                    "student_email",
+                    "Project",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "student2@example.com",
                 ],
-            )
+            ]
             csv_data = CSVData(users, client_orgs, projects, links)
 
             # Act
@@ -350,48 +450,31 @@ class CSVImportTest(APITestCase):
             "Error when importing user with same github username as existing user"
         ):
             # Arrange
-            users = pd.DataFrame(
+            users = [
+                ["student1@example.com", "Student 1", "student1"],
+                ["student2@example.com", "Student 2", "student2"],
+                ["ta@example.com", "Teaching Assistant", "ta"],
+                # there is already a user with the github username "aakindel"
+                ["rep@example.com", "Client Representative", "aakindel"],
+            ]
+            client_orgs = ["Client Organization"]
+            projects = [["Project", "2021", "Fall"]]
+            links = [
                 [
-                    ["student1@example.com", "Student 1", "student1"],
-                    ["student2@example.com", "Student 2", "student2"],
-                    ["ta@example.com", "Teaching Assistant", "ta"],
-                    # there is already a user with the github username "aakindel"
-                    ["rep@example.com", "Client Representative", "aakindel"],
+                    "Project",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "student1@example.com",
                 ],
-                columns=["email", "name", "github_username"],
-            )
-            client_orgs = pd.DataFrame(
-                [["Client Organization"]], columns=["client_org_name"]
-            )
-            projects = pd.DataFrame(
-                [["Project", "2021", "Fall"]],
-                columns=["project_name", "project_year", "project_term"],
-            )
-            links = pd.DataFrame(
                 [
-                    [
-                        "Project",
-                        "Client Organization",
-                        "rep@example.com",
-                        "ta@example.com",
-                        "student1@example.com",
-                    ],
-                    [
-                        "Project",
-                        "Client Organization",
-                        "rep@example.com",
-                        "ta@example.com",
-                        "student2@example.com",
-                    ],
-                ],
-                columns=[
-                    "project_name",
-                    "client_org_name",
-                    "client_rep_email",
-                    "ta_email",
-                    "student_email",
+                    "Project",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "student2@example.com",
                 ],
-            )
+            ]
             csv_data = CSVData(users, client_orgs, projects, links)
 
             # Act
@@ -415,3 +498,190 @@ class CSVImportTest(APITestCase):
                 ClientOrg.objects.filter(name="Client Organization").count(), 0
             )
             self.assertEqual(Project.objects.filter(name="Project").count(), 0)
+
+    def test_import_data_query_count(self):
+        def csv_data(num_students):
+            users = [
+                [f"student{i}@example.com", f"Student {i}", f"student{i}"]
+                for i in range(num_students)
+            ] + [
+                ["ta@example.com", "Teaching Assistant", "ta"],
+                ["rep@example.com", "Client Representative", "rep"],
+                # existing user
+                ["wfenton@ualberta.ca", "", ""],
+            ]
+            client_orgs = ["Client Organization", "CMPUT 401"]
+            projects = [
+                [f"Project {num_students}", "2021", "Fall"],
+                ["CMPUT 401 Project Portal", "2021", "Fall"],
+            ]
+            links = [
+                [
+                    f"Project {num_students}",
+                    "Client Organization",
+                    "rep@example.com",
+                    "ta@example.com",
+                    f"student{i}@example.com",
+                ]
+                for i in range(num_students)
+            ] + [
+                [
+                    "CMPUT 401 Project Portal",
+                    "CMPUT 401",
+                    "rep@example.com",
+                    "ta@example.com",
+                    "wfenton@ualberta.ca",
+                ]
+            ]
+            return CSVData(users, client_orgs, projects, links)
+
+        def count_queries(data):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as queries:
+                    imported_data = import_data(data)
+                transaction.set_rollback(True)
+            self.assertEqual(len(imported_data.errors), 0)
+            return len(queries)
+
+        # The number of queries doesn't depend on the number of rows
+        self.assertEqual(count_queries(csv_data(2)), count_queries(csv_data(200)))
+
+    def test_import_activation_emails(self):
+        users = [
+            ["student1@example.com", "Student 1", ""],
+            ["student2@example.com", "Student 2", ""],
+            ["ta@example.com", "Teaching Assistant", "ta"],
+            ["rep@example.com", "Client Representative", "rep"],
+        ]
+        client_orgs = ["Client Organization"]
+        projects = [["Project", "2021", "Fall"]]
+        links = [
+            [
+                "Project",
+                "Client Organization",
+                "rep@example.com",
+                "ta@example.com",
+                f"student{i}@example.com",
+            ]
+            for i in (1, 2)
+        ]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            imported_data = import_data(CSVData(users, client_orgs, projects, links))
+        self.assertEqual(len(imported_data.errors), 0)
+
+        with self.subTest("Users without a GitHub username get activation emails"):
+            self.assertEqual(imported_data.num_activation_emails, 2)
+            self.assertEqual(
+                sorted(
+                    recipients
+                    for recipients, in OutgoingEmail.objects.values_list("recipients")
+                ),
+                [["student1@example.com"], ["student2@example.com"]],
+            )
+            for user in User.objects.filter(email__startswith="student"):
+                self.assertFalse(user.is_activated)
+                self.assertFalse(user.has_usable_password())
+
+        with self.subTest("Users with a GitHub username are activated"):
+            self.assertTrue(User.objects.get(email="ta@example.com").is_activated)
+
+    def test_validate_data(self):
+        data = parse_csv(SimpleUploadedFile("data.csv", VALID_CSV))
+        request = JobRequest(
+            ImportJob(
+                created_by=User.objects.get(id="656098e6-990b-41e2-9c01-5686798f5bc0"),
+                base_url="http://testserver/",
+            )
+        )
+
+        with self.subTest("Validation only reads from the database"):
+            with CaptureQueriesContext(connection) as queries:
+                validated_data = validate_data(data)
+                response = generate_response(validated_data, request)
+            self.assertEqual(
+                [
+                    query["sql"]
+                    for query in queries
+                    if not query["sql"].startswith("SELECT")
+                ],
+                [],
+            )
+            self.assertEqual(Project.objects.filter(name="New Project").count(), 0)
+
+        with self.subTest("Validation sorts the data like the import"):
+            with transaction.atomic():
+                imported_data = import_data(data)
+                transaction.set_rollback(True)
+
+            self.assertEqual(validated_data.errors, imported_data.errors)
+            self.assertEqual(
+                validated_data.num_activation_emails,
+                imported_data.num_activation_emails,
+            )
+            for key in [
+                "new_users",
+                "existing_users",
+                "new_orgs",
+                "existing_orgs",
+                "new_projects",
+                "existing_projects",
+            ]:
+                self.assertEqual(
+                    [instance.name for instance in getattr(validated_data, key)],
+                    [instance.name for instance in getattr(imported_data, key)],
+                )
+            self.assertEqual(len(validated_data.new_users), 2)
+
+        with self.subTest("Validation responses show the data as imported"):
+            with self.captureOnCommitCallbacks(execute=True):
+                save_data(validated_data)
+
+            def serialize(serializer, model, instances):
+                return serializer(
+                    model.objects.filter(
+                        id__in=[instance.id for instance in instances]
+                    ),
+                    many=True,
+                    context={"request": request},
+                ).data
+
+            imported = {
+                "users": {
+                    "new": serialize(UserSerializer, User, validated_data.new_users),
+                    "existing": serialize(
+                        UserSerializer, User, validated_data.existing_users
+                    ),
+                },
+                "orgs": {
+                    "new": serialize(
+                        ClientOrgSerializer, ClientOrg, validated_data.new_orgs
+                    ),
+                    "existing": serialize(
+                        ClientOrgSerializer, ClientOrg, validated_data.existing_orgs
+                    ),
+                },
+                "projects": {
+                    "new": serialize(
+                        ProjectSerializer, Project, validated_data.new_projects
+                    ),
+                    "existing": serialize(
+                        ProjectSerializer, Project, validated_data.existing_projects
+                    ),
+                },
+            }
+            for key in imported:
+                self.assertEqual(
+                    normalize(
+                        json.loads(json.dumps(response[key], cls=DjangoJSONEncoder))
+                    ),
+                    normalize(
+                        json.loads(json.dumps(imported[key], cls=DjangoJSONEncoder))
+                    ),
+                )
+
+        with self.subTest("Validation finds the same errors as the import"):
+            users = [["rep@example.com", "Ildar Akhmetov", "rep"]]
+            data = CSVData(users, [], [], [])
+            self.assertEqual(validate_data(data).errors, import_data(data).errors)
+            self.assertEqual(len(validate_data(data).errors), 1)
@@ -4,8 +4,10 @@ from unittest.mock import MagicMock, patch
 
 from django.conf import settings
 from django.core import mail
+from django.core.signals import request_finished
 from django.http.response import HttpResponse
 from django.urls import reverse
+from portal.emails import send_queued_emails
 from portal.login_views import LoginView
 from portal.models import PasswordResetRequest, User
 from portal.serializers import UserShortSerializer
@@ -592,6 +594,15 @@ class RequestPasswordResetViewTest(APITestCase):
             "http://example.com/reset-password/{reset_key}"
         )
 
+    def post_request(self, data: dict) -> HttpResponse:
+        """
+        Requests a password reset and sends the emails it queued.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, data)
+        send_queued_emails()
+        return response
+
     def assert_successful_response(self, response: HttpResponse):
         """
         Assert that the response indicates success.
@@ -641,7 +652,7 @@ class RequestPasswordResetViewTest(APITestCase):
         user = create_activated_user_with_password(self, email, existing_password)
 
         # Request a password reset
-        response = self.client.post(self.url, {"email": email})
+        response = self.post_request({"email": email})
 
         self.assert_successful_password_reset_request(user, response)
 
@@ -658,7 +669,7 @@ class RequestPasswordResetViewTest(APITestCase):
         user = create_activated_user_without_password(self, email, "2342341")
 
         # Request a password reset
-        response = self.client.post(self.url, {"email": email})
+        response = self.post_request({"email": email})
 
         self.assert_successful_password_reset_request(user, response)
 
@@ -677,7 +688,7 @@ class RequestPasswordResetViewTest(APITestCase):
         self.num_sent_emails_before = len(mail.outbox)
 
         # Request a password reset
-        response = self.client.post(self.url, {"email": email})
+        response = self.post_request({"email": email})
 
         self.assert_successful_password_reset_request(user, response)
 
@@ -694,14 +705,14 @@ class RequestPasswordResetViewTest(APITestCase):
         user = create_activated_user_with_password(self, email, "testpassword55555")
 
         # Request a password reset for the first time
-        response = self.client.post(self.url, {"email": email})
+        response = self.post_request({"email": email})
 
         first_password_reset_request = self.assert_successful_password_reset_request(
             user, response
         )
 
         # Request a password reset for the second time
-        response = self.client.post(self.url, {"email": email})
+        response = self.post_request({"email": email})
 
         second_password_reset_request = self.assert_successful_password_reset_request(
             user, response
@@ -717,7 +728,7 @@ class RequestPasswordResetViewTest(APITestCase):
         Tests a password reset request for a non-existent user.
         """
         # Request a password reset
-        response = self.client.post(self.url, {"email": "nonexistentuser@example.com"})
+        response = self.post_request({"email": "nonexistentuser@example.com"})
 
         # Assert that the response is successful
         self.assert_successful_response(response)
@@ -725,6 +736,26 @@ class RequestPasswordResetViewTest(APITestCase):
         # Assert that no email was sent
         self.assertEqual(len(mail.outbox), self.num_sent_emails_before)
 
+    def test_request_finished_after_reset(self):
+        """
+        Tests that the end of the request is signalled after the password reset
+        request is created, so that its database connection is released.
+        """
+        email = "testuser@example.com"
+        create_activated_user_with_password(self, email, "testpassword55555")
+        num_requests = PasswordResetRequest.objects.count()
+
+        num_requests_when_finished = []
+
+        def request_finished_receiver(**kwargs):
+            num_requests_when_finished.append(PasswordResetRequest.objects.count())
+
+        request_finished.connect(request_finished_receiver)
+        self.addCleanup(request_finished.disconnect, request_finished_receiver)
+        self.post_request({"email": email})
+
+        self.assertEqual(num_requests_when_finished, [num_requests + 1])
+
     def test_missing_email(self):
         """
         Tests a password reset request that is missing the email field.
@@ -2,7 +2,9 @@ from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.core import mail
 from django.test import TestCase
-from portal.models import Project, User
+from portal.emails import send_queued_emails
+from portal.filters import search_query
+from portal.models import ClientOrg, Membership, Project, Tag, User
 
 
 class ProjectModelTest(TestCase):
@@ -106,6 +108,169 @@ class ProjectModelTest(TestCase):
             )
 
 
+class MembershipModelTest(TestCase):
+    """
+    Testing that memberships are kept in sync with project and org relationships
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user("student@example.com", "password")
+        self.ta = User.objects.create_user("ta@example.com", "password")
+        self.rep = User.objects.create_user("rep@example.com", "password")
+        self.org = ClientOrg.objects.create(name="Org")
+        self.project = Project.objects.create(
+            name="Project", year=2021, term="F", client_org=self.org
+        )
+
+    def roles(self, user):
+        return set(
+            Membership.objects.filter(user=user).values_list(
+                "project", "client_org", "role"
+            )
+        )
+
+    def test_project_changes(self):
+        with self.subTest("Setting the TA and client rep"):
+            self.project.ta = self.ta
+            self.project.client_rep = self.rep
+            self.project.save()
+            self.assertEqual(
+                self.roles(self.ta), {(self.project.id, self.org.id, Membership.TA)}
+            )
+            self.assertEqual(
+                self.roles(self.rep),
+                {(self.project.id, self.org.id, Membership.CLIENT_REP)},
+            )
+
+        with self.subTest("Adding and removing students"):
+            self.project.students.add(self.student)
+            self.assertEqual(
+                self.roles(self.student),
+                {(self.project.id, self.org.id, Membership.STUDENT)},
+            )
+            self.project.students.remove(self.student)
+            self.assertEqual(self.roles(self.student), set())
+
+        with self.subTest("Adding and clearing projects from the student side"):
+            self.student.student_projects.add(self.project)
+            self.assertEqual(
+                self.roles(self.student),
+                {(self.project.id, self.org.id, Membership.STUDENT)},
+            )
+            self.student.student_projects.clear()
+            self.assertEqual(self.roles(self.student), set())
+
+        with self.subTest("Changing the TA"):
+            self.project.ta = self.student
+            self.project.save()
+            self.assertEqual(self.roles(self.ta), set())
+            self.assertEqual(
+                self.roles(self.student),
+                {(self.project.id, self.org.id, Membership.TA)},
+            )
+
+    def test_year_and_term(self):
+        self.project.ta = self.ta
+        self.project.save()
+        self.project.students.add(self.student)
+
+        with self.subTest("Project memberships copy the project's year and term"):
+            self.assertEqual(
+                set(Membership.objects.values_list("user", "year", "term")),
+                {(self.ta.id, 2021, "F"), (self.student.id, 2021, "F")},
+            )
+
+        with self.subTest("Changing the year and term"):
+            self.project.year = 2022
+            self.project.term = "W"
+            self.project.save()
+            self.assertEqual(
+                set(Membership.objects.values_list("user", "year", "term")),
+                {(self.ta.id, 2022, "W"), (self.student.id, 2022, "W")},
+            )
+
+        with self.subTest("Org reps have no year or term"):
+            self.org.reps.add(self.rep)
+            self.assertEqual(
+                Membership.objects.get(user=self.rep).year,
+                None,
+            )
+
+    def test_org_changes(self):
+        with self.subTest("Adding reps"):
+            self.org.reps.add(self.rep)
+            self.assertEqual(
+                self.roles(self.rep), {(None, self.org.id, Membership.ORG_REP)}
+            )
+
+        with self.subTest("Clearing reps"):
+            self.org.reps.clear()
+            self.assertEqual(self.roles(self.rep), set())
+
+        with self.subTest("Deleting an org deletes its memberships"):
+            self.project.students.add(self.student)
+            self.org.delete()
+            self.assertEqual(self.roles(self.student), set())
+
+
+class SearchVectorTest(TestCase):
+    """
+    Testing that search vectors are kept in sync with the searched fields
+    """
+
+    def setUp(self):
+        self.org = ClientOrg.objects.create(name="Foodbank Network")
+        self.project = Project.objects.create(
+            name="Volunteer Scheduler", year=2021, term="F", client_org=self.org
+        )
+        self.tag = Tag.objects.create(value="Django")
+
+    def matches(self, model, search):
+        return set(model.objects.filter(search_vector=search_query(search)))
+
+    def test_project_search_vector(self):
+        with self.subTest("Searching a new project's name and org name"):
+            self.assertEqual(self.matches(Project, "scheduler"), {self.project})
+            self.assertEqual(self.matches(Project, "foodbank"), {self.project})
+
+        with self.subTest("Saving changed fields"):
+            self.project.tagline = "Shifts for kitchens"
+            self.project.save()
+            self.assertEqual(self.matches(Project, "kitchen"), {self.project})
+
+        with self.subTest("Adding, renaming and removing tags"):
+            self.project.tags.add(self.tag)
+            self.assertEqual(self.matches(Project, "django"), {self.project})
+            self.tag.value = "Flask"
+            self.tag.save()
+            self.assertEqual(self.matches(Project, "django"), set())
+            self.assertEqual(self.matches(Project, "flask"), {self.project})
+            self.tag.project_set.clear()
+            self.assertEqual(self.matches(Project, "flask"), set())
+
+        with self.subTest("Deleting a tag"):
+            self.project.tags.add(self.tag)
+            self.tag.delete()
+            self.assertEqual(self.matches(Project, "flask"), set())
+
+        with self.subTest("Renaming the org"):
+            self.org.name = "Pantry Alliance"
+            self.org.save()
+            self.assertEqual(self.matches(Project, "foodbank"), set())
+            self.assertEqual(self.matches(Project, "pantry"), {self.project})
+            self.assertEqual(self.matches(ClientOrg, "pantry"), {self.org})
+
+    def test_user_search_vector(self):
+        user = User.objects.create_user(
+            "user@example.com", "password", name="Ada Lovelace"
+        )
+        self.assertEqual(self.matches(User, "lovelace"), {user})
+
+        user.bio = "Enjoys compilers"
+        user.save()
+        self.assertEqual(self.matches(User, "compiler"), {user})
+
+
 class UserModelTest(TestCase):
     def setUp(self):
         # Set the email backend to an in-memory backend so sent emails can be checked
@@ -119,9 +284,18 @@ class UserModelTest(TestCase):
             "http://example.com/activate/{activation_key}"
         )
 
+    def create_user(self, *args, **kwargs) -> User:
+        """
+        Creates a user and sends the emails it queued.
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            user = User.objects.create_user(*args, **kwargs)
+        send_queued_emails()
+        return user
+
     def test_creating_user_with_password(self):
         # Try to create a user with a password
-        user = User.objects.create_user("testuser@example.com", "password")
+        user = self.create_user("testuser@example.com", "password")
 
         # Assert that the user is saved
         self.assertIsNotNone(user.pk)
@@ -134,7 +308,7 @@ class UserModelTest(TestCase):
 
     def test_creating_user_without_password(self):
         # Try to create a user without a password
-        user = User.objects.create_user("testuser@example.com", None)
+        user = self.create_user("testuser@example.com", None)
 
         # Assert that the user is saved
         self.assertIsNotNone(user.pk)
@@ -155,7 +329,7 @@ class UserModelTest(TestCase):
 
     def test_creating_user_without_password_but_with_github_username(self):
         # Try to create a user without a password but with a github username
-        user = User.objects.create_user(
+        user = self.create_user(
             "testuser@example.com", None, github_username="testuser"
         )
 
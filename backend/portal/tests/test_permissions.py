@@ -0,0 +1,117 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from django.urls import reverse
+from portal.models import ClientOrg, Membership, Project, User
+from portal.permissions import PermissionContext
+from rest_framework.test import APITestCase
+
+
+class PermissionContextTest(TestCase):
+    """
+    Testing the lookup of the roles of users on projects and client orgs
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user("student@example.com", "password")
+        self.ta = User.objects.create_user("ta@example.com", "password")
+        self.rep = User.objects.create_user("rep@example.com", "password")
+        self.org = ClientOrg.objects.create(name="Org")
+        self.org.reps.add(self.rep)
+        self.project = Project.objects.create(
+            name="Project",
+            year=2021,
+            term="F",
+            ta=self.ta,
+            client_rep=self.rep,
+            client_org=self.org,
+        )
+        self.project.students.add(self.student)
+
+    def test_project_roles(self):
+        with self.subTest("Roles are looked up once per project"):
+            context = PermissionContext(self.student)
+            with self.assertNumQueries(1):
+                self.assertEqual(context.project_roles(self.project), {"ST"})
+                self.assertEqual(context.project_roles(self.project), {"ST"})
+
+        with self.subTest("Each role is found"):
+            self.assertEqual(
+                PermissionContext(self.ta).project_roles(self.project), {"TA"}
+            )
+            self.assertEqual(
+                PermissionContext(self.rep).project_roles(self.project), {"CR"}
+            )
+
+        with self.subTest("Anonymous users have no roles"):
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    PermissionContext(AnonymousUser()).project_roles(self.project),
+                    set(),
+                )
+
+    def test_org_roles(self):
+        with self.subTest("Reps of the org are found"):
+            context = PermissionContext(self.rep)
+            with self.assertNumQueries(1):
+                self.assertEqual(context.org_roles(self.org), {Membership.ORG_REP})
+                self.assertEqual(context.org_roles(self.org), {Membership.ORG_REP})
+
+        with self.subTest("Roles on the org's projects don't count"):
+            self.assertEqual(PermissionContext(self.student).org_roles(self.org), set())
+
+
+class UpdatePermissionTest(APITestCase):
+    """
+    Testing who can edit projects and client orgs
+    """
+
+    def setUp(self):
+        self.ta = User.objects.create_user("ta@example.com", "password")
+        self.student = User.objects.create_user("student@example.com", "password")
+        self.rep = User.objects.create_user("rep@example.com", "password")
+        self.org = ClientOrg.objects.create(name="Org")
+        self.org.reps.add(self.rep)
+        self.project = Project.objects.create(
+            name="Project",
+            year=2021,
+            term="F",
+            ta=self.ta,
+            client_org=self.org,
+            is_published=True,
+        )
+        self.project.students.add(self.student)
+
+    def test_project(self):
+        url = reverse("project-detail", args=(self.project.id,))
+
+        with self.subTest("TAs can edit fields students can't"):
+            self.client.force_authenticate(self.ta)
+            response = self.client.patch(url, {"review": "Great"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["review"], "Great")
+
+        with self.subTest("Projects without a client rep can be edited"):
+            self.client.force_authenticate(self.student)
+            response = self.client.patch(url, {"name": "Renamed", "review": "Bad"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["name"], "Renamed")
+            self.assertEqual(response.data["review"], "Great")
+
+        with self.subTest("Org reps can't edit the org's projects"):
+            self.client.force_authenticate(self.rep)
+            response = self.client.patch(url, {"name": "Rep"})
+            self.assertEqual(response.status_code, 403)
+
+    def test_org(self):
+        url = reverse("org-detail", args=(self.org.id,))
+
+        with self.subTest("Reps can edit the org"):
+            self.client.force_authenticate(self.rep)
+            response = self.client.patch(url, {"name": "Renamed"})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["name"], "Renamed")
+
+        with self.subTest("Members of the org's projects can't edit it"):
+            self.client.force_authenticate(self.student)
+            response = self.client.patch(url, {"name": "Student"})
+            self.assertEqual(response.status_code, 403)
@@ -1,7 +1,9 @@
 import json
+from base64 import urlsafe_b64encode
 
 from django.urls import reverse
-from portal.models import Tag, User
+from portal.models import ClientOrg, Project, Tag, User
+from portal.tests.helpers import assert_constant_queries
 from rest_framework.test import APITestCase
 
 
@@ -447,6 +449,35 @@ class ProjectViewSetTest(APITestCase):
                 [{"value": "Django"}, {"value": "Python"}, {"value": "Testing"}],
             )
 
+        with self.subTest("Tags sent as JSON strings by forms are accepted"):
+            response = self.client.patch(
+                reverse(
+                    "project-detail", args=("3606e866-2614-4383-b031-69f70a737603",)
+                ),
+                {"tags": json.dumps([{"value": "Django"}, {"value": "Flask, Jinja"}])},
+            )
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                response.data["tags"], [{"value": "Django"}, {"value": "Flask, Jinja"}]
+            )
+
+        with self.subTest("Invalid tags are rejected"):
+            for tags in [
+                '[{"value": "Django"',
+                [{"name": "Django"}],
+                [{"value": "x" * 26}],
+            ]:
+                response = self.client.patch(
+                    reverse(
+                        "project-detail",
+                        args=("3606e866-2614-4383-b031-69f70a737603",),
+                    ),
+                    json.dumps({"tags": tags}),
+                    content_type="application/json",
+                )
+                self.assertEqual(response.status_code, 400)
+
     """
     Tests the list endpoint
     """
@@ -513,3 +544,184 @@ class ProjectViewSetTest(APITestCase):
                 response_project_ids,
                 home_page_projects,
             )
+
+    def test_list_query_count(self):
+        def add_projects(prefix):
+            org = ClientOrg.objects.create(name=f"{prefix} Org")
+            tag = Tag.objects.create(value=f"{prefix} Tag")
+            for i in range(3):
+                project = Project.objects.create(
+                    name=f"{prefix} Project {i}",
+                    year=2021,
+                    term="F",
+                    is_published=True,
+                    display_on_home_page=True,
+                    client_org=org,
+                    ta=User.objects.create_user(f"{prefix}ta{i}@example.com", None),
+                    client_rep=User.objects.create_user(
+                        f"{prefix}rep{i}@example.com", None
+                    ),
+                )
+                project.students.add(
+                    User.objects.create_user(f"{prefix}student{i}@example.com", None)
+                )
+                project.tags.add(tag)
+
+        with self.subTest("Anonymous user"):
+            assert_constant_queries(
+                self,
+                lambda: self.client.get(reverse("project-list")),
+                lambda: add_projects("anon"),
+            )
+
+        with self.subTest("Authenticated user with ?home_page=true"):
+            user = User.objects.get(id="298d72d5-8610-4f06-adab-1ff176df486d")
+            self.client.force_authenticate(user=user)
+            assert_constant_queries(
+                self,
+                lambda: self.client.get(f'{reverse("project-list")}?home_page=true'),
+                lambda: add_projects("auth"),
+            )
+
+    def test_list_filters(self):
+        web_app = Project.objects.create(
+            name="Web App Project",
+            type="WA",
+            year=2019,
+            term="Winter",
+            tagline="Connecting food banks with volunteers",
+            is_published=True,
+        )
+        web_app.tags.add(Tag.objects.create(value="React"))
+
+        def list_project_names(query):
+            response = self.client.get(f'{reverse("project-list")}?{query}')
+            self.assertEqual(response.status_code, 200)
+            return {project["name"] for project in response.data}
+
+        with self.subTest("Filter by type, using short or long name"):
+            self.assertEqual(list_project_names("type=WA"), {web_app.name})
+            self.assertEqual(list_project_names("type=Web App"), {web_app.name})
+
+        with self.subTest("Filter by term, using short or long name"):
+            self.assertEqual(list_project_names("term=W"), {web_app.name})
+            self.assertEqual(list_project_names("term=Winter"), {web_app.name})
+
+        with self.subTest("Filter by year"):
+            self.assertEqual(list_project_names("year=2019"), {web_app.name})
+            response = self.client.get(f'{reverse("project-list")}?year=last')
+            self.assertEqual(response.status_code, 400)
+
+        with self.subTest("Filter by tag, case-insensitive"):
+            self.assertEqual(list_project_names("tag=react"), {web_app.name})
+
+        with self.subTest("Filter by client org"):
+            self.assertEqual(
+                list_project_names("client_org=e0b72d39-9843-4b45-8cdf-741db9ce159f"),
+                {
+                    "Published Project",
+                    "Another Published Project",
+                    "Yet Another Published Project",
+                },
+            )
+
+        with self.subTest("Search matches word prefixes in any order"):
+            self.assertEqual(
+                list_project_names("search=volunteer food"), {web_app.name}
+            )
+            self.assertEqual(list_project_names("search=foo"), {web_app.name})
+            self.assertEqual(list_project_names("search=food unrelated"), set())
+
+        with self.subTest("Search matches tags and org names"):
+            self.assertEqual(list_project_names("search=react"), {web_app.name})
+            web_app.client_org = ClientOrg.objects.create(name="Harvest Collective")
+            web_app.save()
+            self.assertEqual(list_project_names("search=harvest"), {web_app.name})
+
+        with self.subTest("Search results are ordered by relevance"):
+            Project.objects.create(
+                name="Volunteer Portal",
+                year=2019,
+                term="F",
+                tagline="Volunteer sign ups",
+                is_published=True,
+            )
+            response = self.client.get(f'{reverse("project-list")}?search=volunteer')
+            self.assertEqual(
+                [project["name"] for project in response.data],
+                ["Volunteer Portal", web_app.name],
+            )
+
+    def test_list_pagination(self):
+        for year in [2018, 2019, 2020]:
+            for term in ["Winter", "F", "SP"]:
+                Project.objects.create(
+                    name=f"Project {year} {term}",
+                    year=year,
+                    term=term,
+                    is_published=True,
+                )
+        num_published = Project.objects.filter(is_published=True).count()
+
+        def list_all_pages(url):
+            names = []
+            while url is not None:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(response.data["results"]), 4)
+                names += [project["name"] for project in response.data["results"]]
+                url = response.data["next"]
+            return names
+
+        with self.subTest("Pages are most recent first, ordered by term within a year"):
+            names = list_all_pages(f'{reverse("project-list")}?page_size=4')
+            self.assertEqual(len(names), num_published)
+            # after the 2021 projects from the fixture
+            self.assertEqual(
+                names[3:6],
+                ["Project 2020 Winter", "Project 2020 F", "Project 2020 SP"],
+            )
+
+        with self.subTest("Reverse order"):
+            names = list_all_pages(
+                f'{reverse("project-list")}?page_size=4&ordering=year'
+            )
+            self.assertEqual(
+                names[:3],
+                ["Project 2018 SP", "Project 2018 F", "Project 2018 Winter"],
+            )
+
+        with self.subTest("Pages are combined with filters"):
+            names = list_all_pages(f'{reverse("project-list")}?page_size=4&term=F')
+            self.assertEqual(len(names), 3 + 3)  # 3 from the fixture
+
+        with self.subTest("Invalid cursor"):
+            response = self.client.get(
+                f'{reverse("project-list")}?page_size=4&cursor=invalid'
+            )
+            self.assertEqual(response.status_code, 404)
+
+        with self.subTest("Cursors with invalid values"):
+            for cursor in [
+                [1, 2],
+                "s",
+                {"ordering": "-year", "values": 5},
+                {"ordering": "-year", "values": [2020, 1]},
+                {"ordering": "-year", "values": [None, 1, "x"]},
+                {"ordering": "-year", "values": ["abc", "x", "y"]},
+                {"ordering": "-year", "values": [2020, "x", "y"]},
+            ]:
+                encoded = urlsafe_b64encode(json.dumps(cursor).encode()).decode()
+                response = self.client.get(
+                    f'{reverse("project-list")}?page_size=1&cursor={encoded}'
+                )
+                self.assertEqual(response.status_code, 404, cursor)
+
+    def test_years(self):
+        Project.objects.create(
+            name="Old Project", year=2015, term="F", is_published=True
+        )
+        Project.objects.create(name="Hidden Project", year=2010, term="F")
+        response = self.client.get(reverse("project-years"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, [2021, 2015])
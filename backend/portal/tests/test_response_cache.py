@@ -0,0 +1,80 @@
+from django.contrib.admin.sites import site
+from django.urls import reverse
+from portal.admin import make_published
+from portal.models import ClientOrg, Project, Tag, User
+from portal.response_cache import response_cache_stats
+from rest_framework.test import APITestCase
+
+
+class AnonymousResponseCacheTest(APITestCase):
+    """
+    Testing the caching of project and org listings for anonymous users
+    """
+
+    def setUp(self):
+        self.org = ClientOrg.objects.create(name="Org")
+        self.project = Project.objects.create(
+            name="Project", year=2021, term="F", client_org=self.org, is_published=True
+        )
+
+    def list_project_names(self, query=""):
+        response = self.client.get(f'{reverse("project-list")}?{query}')
+        self.assertEqual(response.status_code, 200)
+        return [project["name"] for project in response.json()]
+
+    def test_cached_responses(self):
+        with self.subTest("Repeated anonymous requests are served from the cache"):
+            self.list_project_names()
+            with self.assertNumQueries(0):
+                self.assertEqual(self.list_project_names(), [self.project.name])
+            self.assertEqual(
+                response_cache_stats(), {"hits": 1, "misses": 1, "hit_rate": 0.5}
+            )
+
+        with self.subTest("Different query params are cached separately"):
+            self.assertEqual(self.list_project_names("home_page=true"), [])
+
+        with self.subTest("Authenticated requests aren't cached"):
+            user = User.objects.create_user("user@example.com", "password")
+            self.client.force_authenticate(user=user)
+            self.client.get(reverse("project-list"))
+            self.client.get(reverse("project-list"))
+            self.assertEqual(
+                response_cache_stats(), {"hits": 1, "misses": 2, "hit_rate": 1 / 3}
+            )
+
+    def test_invalidation(self):
+        def assert_invalidated(change, expected_names):
+            self.list_project_names()
+            change()
+            self.assertEqual(self.list_project_names(), expected_names)
+
+        with self.subTest("Saving a project"):
+            self.project.name = "Renamed"
+            assert_invalidated(self.project.save, ["Renamed"])
+
+        with self.subTest("Changing the tags of a project"):
+            tag = Tag.objects.create(value="Django")
+            assert_invalidated(lambda: self.project.tags.add(tag), ["Renamed"])
+            response = self.client.get(reverse("project-list"))
+            self.assertEqual(response.json()[0]["tags"], [{"value": "Django"}])
+
+        with self.subTest("Renaming an org"):
+            self.client.get(reverse("org-list"))
+            self.org.name = "New Org Name"
+            self.org.save()
+            response = self.client.get(reverse("org-list"))
+            self.assertEqual(response.json()[0]["name"], "New Org Name")
+
+        with self.subTest("Publishing projects with the admin action"):
+            unpublished = Project.objects.create(
+                name="Unpublished", year=2021, term="F"
+            )
+            assert_invalidated(
+                lambda: make_published(
+                    site._registry[Project],
+                    None,
+                    Project.objects.filter(id=unpublished.id),
+                ),
+                ["Renamed", "Unpublished"],
+            )
@@ -0,0 +1,69 @@
+from django.urls import reverse
+from portal.models import ClientOrg, Project, User
+from rest_framework.test import APITestCase
+
+
+class SearchViewTest(APITestCase):
+    """
+    Testing the search across projects, orgs and users
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(
+            "student@example.com", "password", name="Garden Student"
+        )
+        self.org = ClientOrg.objects.create(name="Garden Club", about="Gardening")
+        self.published = Project.objects.create(
+            name="Garden Planner",
+            year=2021,
+            term="F",
+            tagline="Plan your garden",
+            client_org=self.org,
+            is_published=True,
+        )
+        self.hidden_org = ClientOrg.objects.create(name="Secret Garden")
+        self.unpublished = Project.objects.create(
+            name="Unpublished Project",
+            year=2021,
+            term="F",
+            summary="A garden",
+            client_org=self.hidden_org,
+        )
+        self.unpublished.students.add(self.student)
+
+    def search(self, search):
+        response = self.client.get(f'{reverse("search")}?search={search}')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_search(self):
+        with self.subTest("Anonymous user only sees published projects and orgs"):
+            results = self.search("garden")
+            self.assertEqual(
+                {(result["type"], result["data"]["name"]) for result in results},
+                {
+                    ("project", self.published.name),
+                    ("org", self.org.name),
+                    ("user", self.student.name),
+                },
+            )
+
+        with self.subTest("Results are ordered by rank"):
+            ranks = [result["rank"] for result in results]
+            self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+        with self.subTest("Members also see their unpublished projects and orgs"):
+            self.client.force_authenticate(user=self.student)
+            results = self.search("garden")
+            self.assertIn(
+                ("project", self.unpublished.name),
+                {(result["type"], result["data"]["name"]) for result in results},
+            )
+            self.assertIn(
+                ("org", self.hidden_org.name),
+                {(result["type"], result["data"]["name"]) for result in results},
+            )
+
+        with self.subTest("Searching without words returns nothing"):
+            self.assertEqual(self.search(""), [])
+            self.assertEqual(self.search("!?"), [])
@@ -0,0 +1,138 @@
+import os
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from portal.images import process_images
+from portal.models import ClientOrg, ImportJob, User
+from portal.tests.helpers import image_file, use_temporary_media_root
+from rest_framework.test import APITestCase
+
+
+def make_old(name: str):
+    """
+    Sets the modification time of the stored file to two days ago.
+    """
+    two_days_ago = (timezone.now() - timezone.timedelta(days=2)).timestamp()
+    os.utime(default_storage.path(name), (two_days_ago, two_days_ago))
+
+
+class ContentAddressedStorageTest(APITestCase):
+    """
+    Testing the storage naming files by content hash, and the collect_media command
+    deleting unreferenced files.
+    """
+
+    def setUp(self):
+        use_temporary_media_root(self)
+        self.org = ClientOrg.objects.create(name="Org")
+
+    def test_save(self):
+        name = default_storage.save("dir/First.TXT", ContentFile(b"contents"))
+
+        with self.subTest("Named by content hash in the same directory"):
+            self.assertEqual(
+                name,
+                "dir/d1b2a59fbea7e20077af9f91b27e95e865061b270be03ff539ab3b73587882e8"
+                ".txt",
+            )
+            with default_storage.open(name) as file:
+                self.assertEqual(file.read(), b"contents")
+
+        with self.subTest("Saving the same contents returns the existing file"):
+            make_old(name)
+            self.assertEqual(
+                default_storage.save("dir/second.txt", ContentFile(b"contents")), name
+            )
+            self.assertEqual(default_storage.listdir("dir"), ([], [name[4:]]))
+            # Marked as used, so that collect_media keeps it
+            self.assertGreater(
+                default_storage.get_modified_time(name),
+                timezone.now() - timezone.timedelta(minutes=1),
+            )
+
+        with self.subTest("Different contents are saved separately"):
+            self.assertNotEqual(
+                default_storage.save("dir/first.txt", ContentFile(b"other")), name
+            )
+
+        with self.subTest("Deleting keeps the file, which may be shared"):
+            default_storage.delete(name)
+            self.assertTrue(default_storage.exists(name))
+
+    def test_reupload(self):
+        admin = User.objects.create_superuser("admin@example.com", "password")
+        self.client.force_authenticate(admin)
+        url = reverse("org-detail", kwargs={"pk": self.org.id})
+
+        response = self.client.patch(
+            url, {"image": image_file("logo.png", (100, 100))}, format="multipart"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(process_images(), 1)
+        self.org.refresh_from_db()
+        image_name = self.org.image.name
+
+        # The edit page sends the same image again
+        response = self.client.patch(
+            url,
+            {"about": "About", "image": image_file("logo.png", (100, 100))},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.org.refresh_from_db()
+        self.assertEqual(self.org.image.name, image_name)
+        self.assertEqual(
+            default_storage.listdir("client_orgs/org_image")[1], [image_name[22:]]
+        )
+
+        with self.subTest("Its derivatives are still current"):
+            self.assertEqual(process_images(), 0)
+            self.assertIsNotNone(response.data["image_variants"])
+
+    def test_collect_media(self):
+        self.org.image = image_file("org.png", (100, 100))
+        self.org.save()
+        process_images()
+        self.org.refresh_from_db()
+        derivatives = {
+            sizes[extension]
+            for sizes in self.org.image_variants["variants"].values()
+            for extension in ["webp", "jpeg"]
+        }
+        referenced = {self.org.image.name} | derivatives
+        unreferenced = default_storage.save(
+            "client_orgs/org_image/old.png", ContentFile(b"old")
+        )
+        recent = default_storage.save(
+            "projects/screenshot/new.png", ContentFile(b"new")
+        )
+        for name in referenced | {unreferenced}:
+            make_old(name)
+        job = ImportJob.objects.create(file=ContentFile(b"name\n", name="import.csv"))
+        two_days_ago = (timezone.now() - timezone.timedelta(days=2)).timestamp()
+        os.utime(job.file.path, (two_days_ago, two_days_ago))
+
+        with self.subTest("Dry run"):
+            out = StringIO()
+            call_command("collect_media", "--dry-run", stdout=out)
+            self.assertEqual(
+                out.getvalue().splitlines(),
+                [unreferenced, "Would delete 1 unreferenced files (0.0 MB)"],
+            )
+            self.assertTrue(default_storage.exists(unreferenced))
+
+        call_command("collect_media", stdout=StringIO())
+
+        with self.subTest("Unreferenced files are deleted"):
+            self.assertFalse(default_storage.exists(unreferenced))
+
+        with self.subTest("Referenced and recent files are kept"):
+            for name in referenced | {recent}:
+                self.assertTrue(default_storage.exists(name), name)
+
+        with self.subTest("Imports aren't collected"):
+            self.assertTrue(job.file.storage.exists(job.file.name))
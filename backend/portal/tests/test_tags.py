@@ -0,0 +1,85 @@
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from portal.models import Project, Tag
+from portal.tags import (
+    add_project_tags,
+    get_or_create_tags,
+    normalize_tag_values,
+    set_project_tags,
+)
+
+
+class TagAssignmentTest(TestCase):
+    """
+    Testing the creation of tags and their assignment to projects
+    """
+
+    def setUp(self):
+        self.python = Tag.objects.create(value="Python")
+        self.project = Project.objects.create(name="Project", year=2021, term="F")
+
+    def tag_values(self, project):
+        return sorted(project.tags.values_list("value", flat=True))
+
+    def test_normalize_tag_values(self):
+        with self.subTest("Whitespace, empty values and duplicates are removed"):
+            self.assertEqual(
+                normalize_tag_values(
+                    [" Machine   learning ", "", "  ", "python", "PYTHON"]
+                ),
+                ["Machine learning", "python"],
+            )
+
+        with self.subTest("Values that are too long are rejected"):
+            with self.assertRaises(ValueError):
+                normalize_tag_values(["x" * 26])
+
+    def test_get_or_create_tags(self):
+        with self.subTest("Existing tags are matched case-insensitively"):
+            with self.assertNumQueries(1):
+                self.assertEqual(get_or_create_tags(["python"]), [self.python])
+
+        with self.subTest("Missing tags are created in bulk"):
+            with self.assertNumQueries(3):
+                tags = get_or_create_tags(["Django", "python", "React"])
+            self.assertEqual([tag.value for tag in tags], ["Django", "Python", "React"])
+            self.assertEqual(Tag.objects.count(), 3)
+
+        with self.subTest("Tag values are unique case-insensitively"):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                Tag.objects.create(value="DJANGO")
+
+    def test_set_project_tags(self):
+        with self.subTest("Tags are created and added"):
+            set_project_tags(self.project, ["python", "Django"])
+            self.assertEqual(self.tag_values(self.project), ["Django", "Python"])
+
+        with self.subTest("Only the changed tags are added or removed"):
+            Tag.objects.create(value="React")
+            # Finding the tags and the project's tags, removing and adding a tag,
+            # and updating the search vector and the updated_at of the project,
+            # its org and its members
+            with self.assertNumQueries(8):
+                set_project_tags(self.project, ["Python", "React"])
+            self.assertEqual(self.tag_values(self.project), ["Python", "React"])
+
+        with self.subTest("Setting the same tags doesn't change them"):
+            with self.assertNumQueries(2):
+                set_project_tags(self.project, ["react", "PYTHON"])
+
+        with self.subTest("Tags are searchable"):
+            self.assertTrue(
+                Project.objects.filter(search_vector="react").filter(id=self.project.id)
+            )
+
+    def test_add_project_tags(self):
+        other = Project.objects.create(name="Other", year=2021, term="F")
+        self.project.tags.add(self.python)
+
+        add_project_tags([self.project.id, other.id], ["python", "Django"])
+
+        self.assertEqual(self.tag_values(self.project), ["Django", "Python"])
+        self.assertEqual(self.tag_values(other), ["Django", "Python"])
+        self.assertTrue(
+            Project.objects.filter(search_vector="django").filter(id=other.id)
+        )
@@ -1,7 +1,9 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from portal.models import User
-from portal.serializers import UserShortSerializer
-from rest_framework.test import APITestCase
+from portal.models import Project, Tag, User
+from portal.serializers import UserSerializer, UserShortSerializer
+from rest_framework.test import APIRequestFactory, APITestCase
 
 
 class UserViewSetTest(APITestCase):
@@ -256,6 +258,7 @@ class UserViewSetTest(APITestCase):
             "name": "Another User",
             "bio": "",
             "image": None,
+            "image_variants": None,
             "website_link": "",
             "linkedin_link": "",
             "github_user_id": None,
@@ -300,6 +303,68 @@ class UserViewSetTest(APITestCase):
             )
             assert_correct_response(expected_data_with_email)
 
+    def test_retrieve_projects(self):
+        """
+        Tests that a retrieved user's projects are grouped by role and only include
+        projects visible to the requesting user.
+        """
+        user = User.objects.get(id="702cc082-e726-4d84-b311-2e0ad5d4ca0e")
+        published = Project.objects.create(
+            name="Published", year=2021, term="F", is_published=True, ta=user
+        )
+        published.students.add(user)
+        unpublished = Project.objects.create(
+            name="Unpublished", year=2021, term="F", client_rep=user
+        )
+
+        def project_names(response, field):
+            return [project["name"] for project in response.data[field]]
+
+        with self.subTest("Anonymous request"):
+            self.client.force_authenticate(None)
+            response = self.client.get(reverse("user-detail", args=(user.id,)))
+            self.assertEqual(project_names(response, "student_projects"), ["Published"])
+            self.assertEqual(project_names(response, "ta_projects"), ["Published"])
+            self.assertEqual(project_names(response, "client_rep_projects"), [])
+
+        with self.subTest("Request by the user"):
+            self.client.force_authenticate(user)
+            response = self.client.get(reverse("user-detail", args=(user.id,)))
+            self.assertEqual(project_names(response, "student_projects"), ["Published"])
+            self.assertEqual(project_names(response, "ta_projects"), ["Published"])
+            self.assertEqual(
+                project_names(response, "client_rep_projects"), [unpublished.name]
+            )
+
+    def test_serialize_many_query_count(self):
+        """
+        Tests that serializing many users doesn't make queries per user.
+        """
+        request = APIRequestFactory().get("/")
+        request.user = User.objects.get(id="2daa98fb-ddc8-4ec4-80cb-8c141b5ea8fd")
+
+        def add_users(prefix):
+            tag = Tag.objects.create(value=prefix)
+            for i in range(3):
+                user = User.objects.create_user(f"{prefix}{i}@example.com", None)
+                project = Project.objects.create(
+                    name=f"{prefix} {i}", year=2021, term="F", ta=user, client_rep=user
+                )
+                project.students.add(user)
+                project.tags.add(tag)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                UserSerializer(
+                    User.objects.all(), many=True, context={"request": request}
+                ).data
+            return len(queries)
+
+        add_users("before")
+        queries_before = count_queries()
+        add_users("after")
+        self.assertEqual(count_queries(), queries_before)
+
 
 class CurrentUserInfoViewTest(APITestCase):
     url = reverse("current-user-info")
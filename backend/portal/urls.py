@@ -11,10 +11,14 @@ urlpatterns += [
     path("users/me/", views.CurrentUserInfo.as_view(), name="current-user-info")
 ]
 
+# Search across projects, orgs and users
+urlpatterns += [path("search/", views.SearchView.as_view(), name="search")]
+
 # CSV import
 urlpatterns += [
     path("csv/validate/", import_views.validate_csv, name="validate_csv"),
     path("csv/import/", import_views.import_csv, name="import_csv"),
+    path("csv/jobs/<uuid:job_id>/", import_views.import_job, name="import_job"),
 ]
 
 # API router
@@ -5,22 +5,43 @@ from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from portal.emails import send_proposal_email
 from rest_framework import exceptions, mixins, status, viewsets
+from rest_framework.decorators import action
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import ClientOrg, MailingList, Project, Proposal, Tag
+from .etags import ConditionalListMixin, ConditionalRetrieveMixin
+from .filters import ProjectFilter, ranked_matches, search_query
+from .models import ClientOrg, MailingList, Membership, Project, Proposal
+from .pagination import ProjectPagination
+from .permissions import IsOrgRep, IsProjectMember, permission_context
+from .response_cache import AnonymousResponseCacheMixin
 from .serializers import (
+    ClientOrgDirectorySerializer,
     ClientOrgSerializer,
+    ClientOrgShortSerializer,
     ProjectSerializer,
+    ProjectShortSerializer,
     ProposalSerializer,
-    TagSerializer,
     UserSerializer,
     UserShortSerializer,
 )
+from .tags import set_project_tags
+
+
+class EagerLoadingViewSetMixin:
+    """
+    A GenericViewSet mixin that applies the serializer's eager loading plan
+    to the querysets used for listing and retrieving instances.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return self.get_serializer_class().setup_eager_loading(queryset, self.request)
 
 
 class UserViewSet(
+    ConditionalRetrieveMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     viewsets.GenericViewSet,
@@ -101,7 +122,64 @@ class CurrentUserInfo(APIView):
         }
 
 
+class SearchView(APIView):
+    # Maximum number of results of each type
+    MAX_RESULTS = 10
+
+    def get(self, request: Request) -> Response:
+        """
+        Full-text search over the projects, client orgs and users visible to the user
+        making the request, using the search query param.
+        Returns a list of the best matches of every type, ordered by rank.
+        Each result has the following keys:
+        - type: "project", "org" or "user"
+        - rank: how well it matches the search
+        - data: the result serialized by the ProjectShortSerializer,
+          ClientOrgShortSerializer or UserShortSerializer respectively
+        """
+        query = search_query(request.query_params.get("search", ""))
+        if query is None:
+            return Response([])
+
+        user = request.user
+        searches = [
+            (
+                "project",
+                ProjectShortSerializer.setup_eager_loading(
+                    Project.objects.visible_to(user)
+                ),
+                ProjectShortSerializer,
+            ),
+            ("org", ClientOrg.objects.visible_to(user), ClientOrgShortSerializer),
+            (
+                "user",
+                get_user_model().objects.filter(is_active=True),
+                UserShortSerializer,
+            ),
+        ]
+
+        results = []
+        for type, queryset, serializer_class in searches:
+            for instance in ranked_matches(queryset, query)[: self.MAX_RESULTS]:
+                results.append(
+                    {
+                        "type": type,
+                        "rank": instance.rank,
+                        "data": serializer_class(
+                            instance, context={"request": request}
+                        ).data,
+                    }
+                )
+
+        results.sort(key=lambda result: result["rank"], reverse=True)
+        return Response(results)
+
+
 class ClientOrgViewSet(
+    AnonymousResponseCacheMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    EagerLoadingViewSetMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -114,43 +192,27 @@ class ClientOrgViewSet(
     serializer_class = ClientOrgSerializer
 
     def get_queryset(self):
-        return ClientOrg.objects.visible_to(self.request.user)
+        return ClientOrg.objects.visible_to(self.request.user).order_by("name")
 
-    def update(self, request, pk=None):
-        org = get_object_or_404(self.get_queryset(), pk=pk)
-        current_user = request.user
+    def get_serializer_class(self):
+        # The org directory only needs the counts of the orgs' projects
+        if self.action == "list" and self.request.query_params.get("compact") == "true":
+            return ClientOrgDirectorySerializer
+        return super().get_serializer_class()
 
-        # Only the orgs client rep or an admin can edit orgs fields
-        if current_user.is_anonymous or (
-            not current_user.is_rep_of(org) and not current_user.is_superuser
-        ):
-            raise exceptions.PermissionDenied()
-
-        else:
-            serializer = ClientOrgSerializer(
-                org, context={"request": request}, data=request.data
-            )
+    def get_permissions(self):
+        if self.action in ["update", "partial_update"]:
+            # Only the org's client reps or an admin can edit its fields
+            return [IsOrgRep()]
+        return super().get_permissions()
 
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
-
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
-    def partial_update(self, request, pk=None):
+    def update(self, request, pk=None, partial=False):
         org = get_object_or_404(self.get_queryset(), pk=pk)
-        current_user = request.user
-
-        # Only the orgs client rep or an admin can edit orgs fields
-        if current_user.is_anonymous or (
-            not current_user.is_rep_of(org) and not current_user.is_superuser
-        ):
-            raise exceptions.PermissionDenied()
+        self.check_object_permissions(request, org)
 
-        else:
-            serializer = ClientOrgSerializer(
-                org, context={"request": request}, data=request.data, partial=True
-            )
+        serializer = ClientOrgSerializer(
+            org, context={"request": request}, data=request.data, partial=partial
+        )
 
         if serializer.is_valid():
             serializer.save()
@@ -158,8 +220,15 @@ class ClientOrgViewSet(
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def partial_update(self, request, pk=None):
+        return self.update(request, pk, partial=True)
+
 
 class ProjectViewSet(
+    AnonymousResponseCacheMixin,
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    EagerLoadingViewSetMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
@@ -170,6 +239,8 @@ class ProjectViewSet(
     """
 
     serializer_class = ProjectSerializer
+    filter_backends = [ProjectFilter]
+    pagination_class = ProjectPagination
     # Sets which fields a user can edit
     serializer_fields = [
         "id",
@@ -195,53 +266,65 @@ class ProjectViewSet(
     ]
 
     def get_queryset(self):
+        # Unpaginated lists are ordered by name, pages and searches use their own order
+        queryset = Project.objects.visible_to(self.request.user).order_by("name")
         if self.request.query_params.get("home_page") == "true":
-            return Project.objects.visible_to(self.request.user).filter(
-                display_on_home_page=True
-            )
+            return queryset.filter(display_on_home_page=True)
         else:
-            return Project.objects.visible_to(self.request.user)
+            return queryset
 
-    def update(self, request, pk=None):
+    @action(detail=False)
+    def years(self, request):
+        """
+        Get the years of all projects visible to the user, most recent first.
+        """
+        years = (
+            Project.objects.visible_to(request.user)
+            .order_by("-year")
+            .values_list("year", flat=True)
+            .distinct()
+        )
+        return Response(list(years))
+
+    def get_permissions(self):
+        if self.action in ["update", "partial_update"]:
+            # Only users related to the project or an admin can edit it
+            return [IsProjectMember()]
+        return super().get_permissions()
+
+    def update(self, request, pk=None, partial=False):
         project = get_object_or_404(self.get_queryset(), pk=pk)
-        current_user = request.user
-
-        # User has no relation to the project
-        if current_user.is_anonymous or (
-            current_user.id != project.client_rep.id
-            and not current_user.is_student_of(project)
-            and not current_user.id == project.ta.id
-            and not current_user.is_superuser
-        ):
-            raise exceptions.PermissionDenied()
+        self.check_object_permissions(request, project)
+        roles = permission_context(request).project_roles(project)
+
+        request_data = request.data.copy()
+
+        # Any related user can edit the tags
+        if "tags" in request.data.keys():
+            self.set_tags(request.data["tags"], project)
+            del request_data["tags"]
+
+        # TAs and Admins can edit all fields of a project
+        if Membership.TA in roles or request.user.is_superuser:
+            serializer = ProjectSerializer(project, data=request_data, partial=partial)
+
+        # Client reps can edit all fields except publication status of a project
+        elif Membership.CLIENT_REP in roles:
+            serializer = ProjectSerializer(
+                project,
+                data=request_data,
+                fields=self.serializer_fields,
+                partial=partial,
+            )
 
+        # Students can't edit publication status or client review of a project
         else:
+            student_fields = self.serializer_fields[:]
+            student_fields.remove("review")
 
-            request_data = request.data.copy()
-
-            # Any related user can edit the tags
-            if "tags" in request.data.keys():
-                self.set_tags(request.data["tags"], project)
-                del request_data["tags"]
-
-            # TAs and Admins can edit all fields of a project
-            if current_user.id == project.ta.id or current_user.is_superuser:
-                serializer = ProjectSerializer(project, data=request.data)
-
-            # Client reps can edit all fields except publication status of a project
-            elif current_user.id == project.client_rep.id:
-                serializer = ProjectSerializer(
-                    project, data=request_data, fields=self.serializer_fields
-                )
-
-            # Students can't edit publication status or client review of a project
-            elif current_user.is_student_of(project):
-                student_fields = self.serializer_fields[:]
-                student_fields.remove("review")
-
-                serializer = ProjectSerializer(
-                    project, data=request_data, fields=student_fields
-                )
+            serializer = ProjectSerializer(
+                project, data=request_data, fields=student_fields, partial=partial
+            )
 
         if serializer.is_valid():
             serializer.save()
@@ -251,96 +334,31 @@ class ProjectViewSet(
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def partial_update(self, request, pk=None):
-        project = get_object_or_404(self.get_queryset(), pk=pk)
-        current_user = request.user
-
-        # User has no relation to the project
-        if current_user.is_anonymous or (
-            current_user.id != project.client_rep.id
-            and not current_user.is_student_of(project)
-            and not current_user.id == project.ta.id
-            and not current_user.is_superuser
-        ):
-            raise exceptions.PermissionDenied()
-
-        else:
-
-            request_data = request.data.copy()
-
-            # Any related user can edit the tags
-            if "tags" in request.data.keys():
-                self.set_tags(request.data["tags"], project)
-                del request_data["tags"]
-
-            # TAs and Admins can edit all fields of a project
-            if current_user.id == project.ta.id or current_user.is_superuser:
-                serializer = ProjectSerializer(project, data=request_data, partial=True)
-
-            # Client reps can edit all fields except publication status of a project
-            elif current_user.id == project.client_rep.id:
-                serializer = ProjectSerializer(
-                    project,
-                    data=request_data,
-                    fields=self.serializer_fields,
-                    partial=True,
-                )
-
-            # Students can't edit publication status or client review of a project
-            elif current_user.is_student_of(project):
-                student_fields = self.serializer_fields[:]
-                student_fields.remove("review")
-
-                serializer = ProjectSerializer(
-                    project, data=request_data, fields=student_fields, partial=True
-                )
-
-        if serializer.is_valid():
-            serializer.save()
-            serializer = ProjectSerializer(project)
-            return Response(serializer.data)
-
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return self.update(request, pk, partial=True)
 
     """
     If tags were edited, apply the changes
     """
 
     def set_tags(self, tags, project):
-        json_tags = tags
-
-        if not (type(tags) is list):
-            if tags == "[]":
-                project.tags.clear()
-                return
-
-            json_tags = []
-            for tag in tags[1:-1].split(","):
-                json_tags.append(json.loads(tag))
-
-        # Remove all tags
-        project.tags.clear()
-        for tag in json_tags:
-            # Create tag if new
-            if not Tag.objects.filter(value__iexact=tag["value"]):
-                self.create_tag(tag)
-
-            # If tag is not a repeat, add it to tags
-            if tag not in project.tags.values():
-                t = Tag.objects.get(value__iexact=tag["value"])
-                project.tags.add(t)
-
-    """
-    If a new tag is discovered, create it
-    """
-
-    def create_tag(self, tag):
-        # Create a new tag
-        serializer = TagSerializer(data=tag)
-        if serializer.is_valid():
-            serializer.save()
+        # Multipart requests send the tags as a JSON string
+        if isinstance(tags, str):
+            try:
+                tags = json.loads(tags)
+            except json.JSONDecodeError:
+                raise exceptions.ValidationError({"tags": ["Invalid JSON."]})
+
+        if not isinstance(tags, list) or not all(
+            isinstance(tag, dict) and isinstance(tag.get("value"), str) for tag in tags
+        ):
+            raise exceptions.ValidationError(
+                {"tags": ['Expected a list of {"value": ...} objects.']}
+            )
 
-        else:
-            raise exceptions.ValidationError()
+        try:
+            set_project_tags(project, [tag["value"] for tag in tags])
+        except ValueError as error:
+            raise exceptions.ValidationError({"tags": [str(error)]})
 
 
 class ProposalViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+
+"""
+Measures the latency of /api/projects/ with each way of reusing database
+connections, against the database configured in backend/.env.
+
+Each mode runs in its own process, since the database settings are read once.
+Requests are made with Django's test client, which doesn't close database
+connections at the end of requests, so that is done like in a worker.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Environment settings of each mode
+MODES = {
+    "no reuse": {"PORTAL_DB_CONN_MAX_AGE": "0"},
+    "persistent": {
+        "PORTAL_DB_CONN_MAX_AGE": "600",
+        "PORTAL_DB_CONN_HEALTH_CHECKS": "true",
+    },
+    "pool": {"PORTAL_DB_CONN_MAX_AGE": "0", "PORTAL_DB_POOL_SIZE": "4"},
+}
+
+
+def measure(num_requests: int, num_threads: int) -> list[float]:
+    """
+    Returns the latencies of the requests in milliseconds.
+    """
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+    import django
+
+    django.setup()
+
+    from django.db import close_old_connections
+    from django.test import Client
+
+    def request(_):
+        client = Client(HTTP_HOST="cmput401.ca")
+        start = time.perf_counter()
+        # What the request_started and request_finished signals do in a worker
+        close_old_connections()
+        response = client.get("/api/projects/")
+        close_old_connections()
+        latency = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"Got status code {response.status_code}")
+        return latency
+
+    # Warm up, so that imports and the first connections aren't measured
+    request(None)
+
+    with ThreadPoolExecutor(num_threads) as executor:
+        return list(executor.map(request, range(num_requests)))
+
+
+def percentile(latencies: list[float], percent: int) -> float:
+    return statistics.quantiles(latencies, n=100, method="inclusive")[percent - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark database connection reuse on /api/projects/."
+    )
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="Number of threads making requests, like gunicorn's --threads",
+    )
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode is not None:
+        # Running one mode in a child process
+        print(json.dumps(measure(args.requests, args.threads)))
+        return
+
+    print(f"{args.requests} requests, {args.threads} threads")
+    print(f"{'mode':<12}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+    for mode, settings in MODES.items():
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode]
+            + ["--requests", str(args.requests), "--threads", str(args.threads)],
+            env={
+                **os.environ,
+                **settings,
+                # Don't serve the anonymous listings from the cache
+                "PORTAL_RESPONSE_CACHE_TIMEOUT": "0",
+            },
+            cwd=BASE_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        latencies = json.loads(output)
+        print(
+            f"{mode:<12}{percentile(latencies, 50):>10.2f}"
+            f"{percentile(latencies, 99):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+
+"""
+Compares the throughput of gunicorn's sync and threaded (gthread) workers while
+some users log in with GitHub, against the database configured in backend/.env.
+
+GitHub is replaced by a local server that takes --github-delay seconds to exchange
+OAuth codes. While --slow-logins clients keep logging in, --clients clients fetch
+/api/projects/ as fast as they can, and the rate and latency of their requests is
+reported for each kind of worker.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# gunicorn options of each kind of worker, with as many processes as deployed
+PROFILES = {
+    "sync": ["--workers", "3"],
+    "gthread": ["--workers", "3", "--worker-class", "gthread", "--threads", "8"],
+}
+
+# Host accepted by ALLOWED_HOSTS
+HOST = "cmput401.ca"
+
+
+def start_fake_github(delay: float) -> ThreadingHTTPServer:
+    """
+    Starts a server answering like GitHub's OAuth token exchange and user API,
+    taking delay seconds to exchange codes.
+    """
+
+    class FakeGitHubHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(delay)
+            self.send_json({"access_token": "fake"})
+
+        def do_GET(self):
+            # A GitHub user without a portal account, so logins fail after the
+            # slow part is done
+            self.send_json({"id": 0, "login": "load-test"})
+
+        def send_json(self, data):
+            body = json.dumps(data).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(options: list[str], port: int, github_url: str):
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--bind", f"127.0.0.1:{port}"]
+        # Load the app before forking, so that workers loading it isn't measured
+        + ["--preload"] + options + ["config.wsgi:application"],
+        cwd=BASE_DIR,
+        env={
+            **os.environ,
+            "GITHUB_URL": github_url,
+            "GITHUB_API_URL": github_url,
+            # Don't serve the anonymous listings from the cache
+            "PORTAL_RESPONSE_CACHE_TIMEOUT": "0",
+        },
+        stderr=subprocess.DEVNULL,
+    )
+
+    # Wait until the server answers
+    for _ in range(100):
+        try:
+            requests.get(
+                f"http://127.0.0.1:{port}/api/projects/",
+                headers={"Host": HOST},
+                timeout=10,
+            )
+            return process
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("gunicorn didn't start")
+
+
+def run_clients(port: int, args) -> tuple[list[float], int]:
+    """
+    Runs the clients for args.duration seconds.
+    Returns the latencies of the /api/projects/ requests in milliseconds,
+    and the number of failed requests.
+    """
+    url = f"http://127.0.0.1:{port}/api"
+    end = time.monotonic() + args.duration
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def log_in():
+        with requests.Session() as session:
+            while time.monotonic() < end:
+                session.post(
+                    f"{url}/login/oauth2/",
+                    json={"provider": "GitHub", "code": "code"},
+                    headers={"Host": HOST},
+                )
+
+    def list_projects():
+        nonlocal errors
+        with requests.Session() as session:
+            while time.monotonic() < end:
+                start = time.perf_counter()
+                try:
+                    response = session.get(
+                        f"{url}/projects/", headers={"Host": HOST}, timeout=30
+                    )
+                    ok = response.status_code == 200
+                except requests.RequestException:
+                    ok = False
+                latency = (time.perf_counter() - start) * 1000
+                with lock:
+                    if ok:
+                        latencies.append(latency)
+                    else:
+                        errors += 1
+
+    threads = [threading.Thread(target=log_in) for _ in range(args.slow_logins)]
+    threads += [threading.Thread(target=list_projects) for _ in range(args.clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test gunicorn's sync and gthread workers."
+    )
+    parser.add_argument("--duration", type=float, default=10, help="Seconds per run")
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--slow-logins", type=int, default=3)
+    parser.add_argument("--github-delay", type=float, default=2)
+    args = parser.parse_args()
+
+    github = start_fake_github(args.github_delay)
+    github_url = f"http://127.0.0.1:{github.server_address[1]}"
+
+    print(
+        f"{args.clients} clients and {args.slow_logins} GitHub logins taking"
+        f" {args.github_delay}s each, for {args.duration}s"
+    )
+    print(
+        f"{'workers':<10}{'requests/s':>12}{'p50 (ms)':>10}{'p99 (ms)':>10}{'errors':>8}"
+    )
+    for profile, options in PROFILES.items():
+        port = free_port()
+        process = start_gunicorn(options, port, github_url)
+        try:
+            latencies, errors = run_clients(port, args)
+        finally:
+            process.terminate()
+            process.wait()
+
+        if len(latencies) < 2:
+            print(f"{profile:<10}{len(latencies) / args.duration:>12.1f}{errors:>28}")
+            continue
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        print(
+            f"{profile:<10}{len(latencies) / args.duration:>12.1f}"
+            f"{percentiles[49]:>10.1f}{percentiles[98]:>10.1f}{errors:>8}"
+        )
+
+    github.shutdown()
+
+
+if __name__ == "__main__":
+    main()
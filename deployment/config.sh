@@ -8,3 +8,12 @@ PORTAL_SITE_CONFIG=/etc/nginx/sites-available/portal
 
 # Path to the gunicorn.service file
 GUNICORN_SERVICE=/etc/systemd/system/gunicorn.service
+
+# Path to the email-worker.service file
+EMAIL_WORKER_SERVICE=/etc/systemd/system/email-worker.service
+
+# Path to the import-worker.service file
+IMPORT_WORKER_SERVICE=/etc/systemd/system/import-worker.service
+
+# Path to the image-worker.service file
+IMAGE_WORKER_SERVICE=/etc/systemd/system/image-worker.service
@@ -34,6 +34,18 @@ npm run build
 echo "Updating gunicorn config file..."
 sudo cp $PROJECT_DIR/deployment/gunicorn.service $GUNICORN_SERVICE
 
+# Update the email worker config file
+echo "Updating email worker config file..."
+sudo cp $PROJECT_DIR/deployment/email-worker.service $EMAIL_WORKER_SERVICE
+
+# Update the import worker config file
+echo "Updating import worker config file..."
+sudo cp $PROJECT_DIR/deployment/import-worker.service $IMPORT_WORKER_SERVICE
+
+# Update the image worker config file
+echo "Updating image worker config file..."
+sudo cp $PROJECT_DIR/deployment/image-worker.service $IMAGE_WORKER_SERVICE
+
 # Update the nginx config file
 echo "Updating nginx config file..."
 sudo cp $PROJECT_DIR/deployment/portal-site $PORTAL_SITE_CONFIG
@@ -42,9 +54,15 @@ sudo cp $PROJECT_DIR/deployment/portal-site $PORTAL_SITE_CONFIG
 echo "Issuing systemctl daemon-reload..."
 sudo systemctl daemon-reload
 
-# Restart gunicorn and nginx
+# Restart gunicorn, the workers and nginx
 echo "Restarting gunicorn..."
 sudo systemctl restart gunicorn
+echo "Restarting email worker..."
+sudo systemctl restart email-worker
+echo "Restarting import worker..."
+sudo systemctl restart import-worker
+echo "Restarting image worker..."
+sudo systemctl restart image-worker
 echo "Restarting nginx..."
 sudo systemctl restart nginx
 
@@ -6,9 +6,11 @@ import axios, {
 } from "axios"
 import { Dispatch } from "react"
 import ClientOrg from "../models/client-org"
+import ClientOrgDirectoryEntry from "../models/client-org-directory-entry"
 import User from "../models/user"
 import config from "./config"
 import Project from "../models/project"
+import ProjectPage, { ProjectListParams } from "../models/project-page"
 import ProposalForm from "../models/proposal-form"
 import {
     ActivateRequest,
@@ -22,7 +24,14 @@ import {
 } from "../models/login"
 import CurrentUserInfo from "../models/current-user-info"
 import Action from "../global-state/action"
-import ImportCsvResponse from "../models/import"
+import ImportCsvResponse, { ImportJob } from "../models/import"
+
+// How often to check if an import job is done
+const IMPORT_JOB_POLL_INTERVAL_MS = 1000
+// How long to wait for an import job to finish, including behind other jobs,
+// before giving up. Jobs running for more than 30 minutes are failed by the
+// worker
+const IMPORT_JOB_TIMEOUT_MS = 60 * 60 * 1000
 
 /**
  * Returns an appropriate error message for a given error object.
@@ -113,6 +122,13 @@ export default class PortalApi {
             .get<ClientOrg[]>("/orgs/")
             .then((response) => response.data)
 
+    getClientOrgDirectory = async (): Promise<ClientOrgDirectoryEntry[]> =>
+        this.axiosInstance
+            .get<ClientOrgDirectoryEntry[]>("/orgs/", {
+                params: { compact: true },
+            })
+            .then((response) => response.data)
+
     getClientOrg = async (id: string): Promise<ClientOrg> =>
         this.axiosInstance
             .get<ClientOrg>(`/orgs/${id}/`)
@@ -144,6 +160,24 @@ export default class PortalApi {
             .get<Project[]>(`/projects/?home_page=${homePageOnly}`)
             .then((response) => response.data)
 
+    /**
+     * Get the first page of projects matching the params.
+     * Pass the next URL of a page to get the page after it.
+     */
+    getProjectsPage = async (
+        params: ProjectListParams,
+        nextUrl: string | null = null
+    ): Promise<ProjectPage> =>
+        (nextUrl === null
+            ? this.axiosInstance.get<ProjectPage>("/projects/", { params })
+            : this.axiosInstance.get<ProjectPage>(nextUrl)
+        ).then((response) => response.data)
+
+    getProjectYears = async (): Promise<number[]> =>
+        this.axiosInstance
+            .get<number[]>("/projects/years/")
+            .then((response) => response.data)
+
     getProject = async (id: string): Promise<Project> =>
         this.axiosInstance
             .get<Project>(`/projects/${id}/`)
@@ -167,28 +201,54 @@ export default class PortalApi {
             .patch<FormData>(`/projects/${projectId}/`, projectData)
             .then(() => {})
 
-    validateCsv = async (csvFile: File): Promise<ImportCsvResponse> => {
-        const formData = new FormData()
-        formData.append("file", csvFile)
+    /**
+     * Waits for a validation or import of a CSV file to finish,
+     * and returns its result.
+     * Throws an error if it fails without a result,
+     * or if it isn't done by the deadline.
+     */
+    waitForImportJob = async (
+        job: ImportJob,
+        deadline: number = Date.now() + IMPORT_JOB_TIMEOUT_MS
+    ): Promise<ImportCsvResponse> => {
+        if (job.result !== null) {
+            return job.result
+        }
+        if (job.status === "failed") {
+            throw new Error("The import failed without a result")
+        }
+        if (Date.now() >= deadline) {
+            throw new Error("Timed out waiting for the import to finish")
+        }
+        await new Promise((resolve) => {
+            setTimeout(resolve, IMPORT_JOB_POLL_INTERVAL_MS)
+        })
         return this.axiosInstance
-            .post<FormData, AxiosResponse<ImportCsvResponse>>(
-                "/csv/validate/",
-                formData
-            )
-            .then((response) => response.data)
+            .get<ImportJob>(`/csv/jobs/${job.id}/`)
+            .then((response) => this.waitForImportJob(response.data, deadline))
     }
 
-    importCsv = async (csvFile: File): Promise<ImportCsvResponse> => {
+    /**
+     * Uploads a CSV file to be validated or imported in the background,
+     * and returns the result once it is done.
+     */
+    runImportJob = async (
+        url: string,
+        csvFile: File
+    ): Promise<ImportCsvResponse> => {
         const formData = new FormData()
         formData.append("file", csvFile)
         return this.axiosInstance
-            .post<FormData, AxiosResponse<ImportCsvResponse>>(
-                "/csv/import/",
-                formData
-            )
-            .then((response) => response.data)
+            .post<FormData, AxiosResponse<ImportJob>>(url, formData)
+            .then((response) => this.waitForImportJob(response.data))
     }
 
+    validateCsv = async (csvFile: File): Promise<ImportCsvResponse> =>
+        this.runImportJob("/csv/validate/", csvFile)
+
+    importCsv = async (csvFile: File): Promise<ImportCsvResponse> =>
+        this.runImportJob("/csv/import/", csvFile)
+
     loginWithEmailAndPassword = async (
         inputData: LoginWithEmailAndPasswordRequest,
         dispatch: Dispatch<Action>
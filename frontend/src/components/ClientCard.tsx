@@ -13,7 +13,7 @@ export default function ClientCard(props: {
 }): JSX.Element {
     const { client } = props
 
-    let logoURL = client?.image
+    let logoURL = client?.image_variants?.card.webp ?? client?.image
     if (
         logoURL === null ||
         logoURL === undefined ||
@@ -23,7 +23,10 @@ export default function ProjectCard(props: { project: Project }): JSX.Element {
 
     let logoURL = project.logo_url
     if (project.client_org.image && logoURL.trim().length === 0) {
-        logoURL = project.client_org.image
+        // shown at most 125px wide, so the thumbnail is large enough
+        logoURL =
+            project.client_org.image_variants?.thumbnail.webp ??
+            project.client_org.image
     }
     if (logoURL.trim().length === 0) {
         logoURL = FALLBACK_IMAGE_URL
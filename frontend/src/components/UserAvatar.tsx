@@ -8,7 +8,7 @@ export default function UserAvatar(props: {
     const { user } = props
     if (!user) return <Avatar />
 
-    let { image: profileImage } = user
+    let profileImage = user.image_variants?.thumbnail.webp ?? user.image
     if (!profileImage && user.github_user_id) {
         profileImage = `https://avatars.githubusercontent.com/u/${user.github_user_id}`
     }
@@ -0,0 +1,11 @@
+import ClientOrgShort from "./client-org-short"
+
+type ClientOrgDirectoryEntry = ClientOrgShort & {
+    about: string
+    testimonial: string
+    // counted over the projects visible to the current user
+    num_projects: number
+    latest_year: number | null
+    project_names: string[]
+}
+export default ClientOrgDirectoryEntry
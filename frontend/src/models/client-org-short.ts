@@ -1,8 +1,10 @@
 import ClientOrgType from "./client-org-type"
+import ImageVariants from "./image-variants"
 
 export default interface ClientOrgShort {
     id: string
     name: string
     image: string | undefined
+    image_variants?: ImageVariants | null
     type: ClientOrgType
 }
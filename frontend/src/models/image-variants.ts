@@ -0,0 +1,16 @@
+// URLs of a variant of an uploaded image, scaled down to fit its size
+export interface ImageVariant {
+    width: number
+    height: number
+    webp: string
+    jpeg: string
+}
+
+// Smaller copies of an uploaded image, null until they are made
+export default interface ImageVariants {
+    thumbnail: ImageVariant // fits in 160x160
+    card: ImageVariant // fits in 480x480
+    full: ImageVariant // fits in 1600x1600
+    // srcset attributes listing the variants in each format
+    srcset: { webp: string; jpeg: string }
+}
@@ -17,4 +17,31 @@ export default interface ImportCsvResponse {
         new: Project[]
         existing: Project[]
     }
+    activation_emails: {
+        queued: number
+    }
+}
+
+export interface ImportJob {
+    id: string
+    dry_run: boolean
+    status: "queued" | "running" | "succeeded" | "failed"
+    phase: "" | "parse" | "validate" | "import" | "respond"
+    counts: {
+        rows?: number
+        users?: number
+        orgs?: number
+        projects?: number
+        links?: number
+    }
+    timings: {
+        parse?: number
+        validate?: number
+        import?: number
+        respond?: number
+    }
+    result: ImportCsvResponse | null
+    created_at: string
+    started_at: string | null
+    finished_at: string | null
 }
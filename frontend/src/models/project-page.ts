@@ -0,0 +1,26 @@
+import Project from "./project"
+
+/**
+ * Query params accepted by the projects list endpoint.
+ * Filters that are not set don't filter.
+ */
+export interface ProjectListParams {
+    search?: string
+    client_type?: string
+    type?: string
+    term?: string
+    year?: number
+    tag?: string
+    client_org?: string
+    // "-year" (most recent first) or "year" (oldest first)
+    ordering?: string
+    page_size?: number
+}
+
+/**
+ * One page of projects, with the URL of the next page if there is one.
+ */
+export default interface ProjectPage {
+    next: string | null
+    results: Project[]
+}
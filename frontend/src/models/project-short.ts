@@ -1,4 +1,5 @@
 import { ProjectType, Tag, Term } from "./project"
+import ImageVariants from "./image-variants"
 
 export default interface ProjectShort {
     id: string
@@ -8,5 +9,6 @@ export default interface ProjectShort {
     year: number
     term: Term
     logo_url: string
+    logo_image_variants?: ImageVariants | null
     type: ProjectType
 }
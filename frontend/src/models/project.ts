@@ -1,5 +1,6 @@
 import UserShort from "./user-short"
 import ClientOrgShort from "./client-org-short"
+import ImageVariants from "./image-variants"
 
 export interface Tag {
     value: string
@@ -34,10 +35,12 @@ export default interface Project {
     year: number
     term: Term
     screenshot: string
+    screenshot_variants?: ImageVariants | null
     presentation: string
     review: string
     website_url: string
     source_code_url: string
     logo_url: string
+    logo_image_variants?: ImageVariants | null
     storyboard: string
 }
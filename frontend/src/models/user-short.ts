@@ -1,6 +1,9 @@
+import ImageVariants from "./image-variants"
+
 export default interface UserShort {
     id: string
     name: string
     image?: string
+    image_variants?: ImageVariants | null
     github_user_id?: string
 }
@@ -15,7 +15,7 @@ export default function About(): JSX.Element {
     const [clients, setClients] = useState<ClientTestimonial[]>([])
 
     useEffect(() => {
-        portalApiInstance.getClientOrgs().then((clientsData) => {
+        portalApiInstance.getClientOrgDirectory().then((clientsData) => {
             setClients(
                 clientsData.filter((result) => result.testimonial).slice(0, 5)
             )
@@ -14,7 +14,7 @@ import { Link as RouterLink, useHistory, useLocation } from "react-router-dom"
 import { ArrowDownward, ArrowUpward } from "@mui/icons-material"
 import PageTitle from "../components/PageTitle"
 import { portalApiInstance } from "../api/portal-api"
-import ClientOrg from "../models/client-org"
+import ClientOrgDirectoryEntry from "../models/client-org-directory-entry"
 import ClientCard from "../components/ClientCard"
 import ClientOrgType from "../models/client-org-type"
 import SearchBar from "../components/SearchBar"
@@ -32,9 +32,11 @@ export default function ViewClients(): JSX.Element {
     const location = useLocation()
 
     // list of all orgs loaded, including those currently filtered out
-    const [allClientOrgs, setAllClientOrgs] = useState<ClientOrg[]>([])
+    const [allClientOrgs, setAllClientOrgs] =
+        useState<ClientOrgDirectoryEntry[]>([])
     // list of orgs to render
-    const [clientOrgs, setClientOrgs] = useState<ClientOrg[]>(allClientOrgs)
+    const [clientOrgs, setClientOrgs] =
+        useState<ClientOrgDirectoryEntry[]>(allClientOrgs)
     // search string, empty string shows all
     const [searchString, setSearchString] = useState<string>("")
     // ANY doesn't filter
@@ -89,13 +91,13 @@ export default function ViewClients(): JSX.Element {
     }
 
     /**
-     * Returns a list of `ClientOrg`s that match the search query and client type.
+     * Returns a list of `ClientOrgDirectoryEntry`s that match the search query and client type.
      * A client matches the search query if their name matches every word in the search query,
      * their about text matches every word in the search query,
-     * or any of their `Project`'s names match every word in the search query.
-     * @returns A list of matching `ClientOrg`s in the order they should be displayed.
+     * or any of their project names match every word in the search query.
+     * @returns A list of matching `ClientOrgDirectoryEntry`s in the order they should be displayed.
      */
-    const getMatchingClientOrgs = (): ClientOrg[] => {
+    const getMatchingClientOrgs = (): ClientOrgDirectoryEntry[] => {
         let matchingClientOrgs = allClientOrgs
 
         if (clientType !== ANY) {
@@ -110,8 +112,8 @@ export default function ViewClients(): JSX.Element {
                 (word) =>
                     clientOrg.name.toLowerCase().includes(word) ||
                     clientOrg.about.toLowerCase().includes(word) ||
-                    clientOrg.projects.filter((project) =>
-                        project.name.toLowerCase().includes(word)
+                    clientOrg.project_names.filter((name) =>
+                        name.toLowerCase().includes(word)
                     ).length > 0
             )
         )
@@ -130,10 +132,12 @@ export default function ViewClients(): JSX.Element {
 
     // parse search params and load clients from the API on page load
     useEffect(() => {
-        portalApiInstance.getClientOrgs().then((data: ClientOrg[]) => {
-            setAllClientOrgs(data)
-            parseSearchParams()
-        })
+        portalApiInstance
+            .getClientOrgDirectory()
+            .then((data: ClientOrgDirectoryEntry[]) => {
+                setAllClientOrgs(data)
+                parseSearchParams()
+            })
     }, [])
 
     // whenever filters change, update search params and the list of clients to render
@@ -1,5 +1,6 @@
 import * as React from "react"
 import {
+    Button,
     Container,
     Grid,
     MenuItem,
@@ -13,6 +14,7 @@ import { ArrowUpward, ArrowDownward } from "@mui/icons-material"
 import { useHistory, useLocation } from "react-router-dom"
 import { portalApiInstance } from "../api/portal-api"
 import Project, { ProjectType, Term } from "../models/project"
+import { ProjectListParams } from "../models/project-page"
 import ProjectCard from "../components/ProjectCard"
 import ClientOrgType from "../models/client-org-type"
 import SearchBar from "../components/SearchBar"
@@ -28,14 +30,23 @@ type ProjectTypeFilter = ProjectType | typeof ANY
 type TermFilter = Term | typeof ANY
 type YearFilter = number | typeof ANY
 
+// number of projects to load at a time
+const PAGE_SIZE = 20
+// how long to wait after typing in the search bar before searching
+const SEARCH_DELAY_MS = 300
+
 export default function ViewProjects(): JSX.Element {
     const history = useHistory()
     const location = useLocation()
 
-    // list of all projects loaded, including those currently filtered out
-    const [allProjects, setAllProjects] = useState<Project[]>([])
-    // list of projects to render
-    const [projects, setProjects] = useState<Project[]>(allProjects)
+    // list of projects matching the filters loaded so far, undefined if loading failed
+    const [projects, setProjects] = useState<Project[] | undefined>([])
+    // URL of the next page of matching projects, null if all are loaded
+    const [nextUrl, setNextUrl] = useState<string | null>(null)
+    // years of all projects, for the year filter
+    const [years, setYears] = useState<number[]>([])
+    // incremented for each new search so responses to older searches are ignored
+    const searchCount = React.useRef(0)
     // search string, empty string shows all projects
     const [searchString, setSearchString] = useState<string>("")
     // ANY doesn't filter
@@ -89,7 +100,7 @@ export default function ViewProjects(): JSX.Element {
     }
 
     // set state of filters based on URL search params
-    const parseSearchParams = (loadedProjects: Project[]): void => {
+    const parseSearchParams = (loadedYears: number[]): void => {
         const params = new URLSearchParams(location.search)
 
         const search = params.get("search")
@@ -133,88 +144,71 @@ export default function ViewProjects(): JSX.Element {
 
         if (year !== null) {
             const yearNumber = Number.parseInt(year, 10)
-            if (
-                !Number.isNaN(yearNumber) &&
-                loadedProjects
-                    .map((project) => project.year)
-                    .includes(yearNumber)
-            ) {
+            if (!Number.isNaN(yearNumber) && loadedYears.includes(yearNumber)) {
                 setProjectYear(yearNumber)
             }
         }
     }
 
-    // return list of projects matching search query, type/term/year filters
-    const getMatchingProjects = (): Project[] => {
-        let matchingProjects = allProjects
+    // return the list endpoint params for the current filters
+    const getListParams = (): ProjectListParams => ({
+        search: searchString.trim() === "" ? undefined : searchString,
+        client_type: clientType === ANY ? undefined : clientType,
+        type: projectType === ANY ? undefined : projectType,
+        term: projectTerm === ANY ? undefined : projectTerm,
+        year: projectYear === ANY ? undefined : projectYear,
+        // most recent first, ties broken by term then name
+        ordering: reverseSort ? "year" : "-year",
+        page_size: PAGE_SIZE,
+    })
 
-        if (clientType !== ANY) {
-            matchingProjects = matchingProjects?.filter(
-                (project) => project.client_org.type === clientType
-            )
-        }
-        if (projectType !== ANY) {
-            matchingProjects = matchingProjects?.filter(
-                (project) => project.type === projectType
-            )
-        }
-        if (projectTerm !== ANY) {
-            matchingProjects = matchingProjects?.filter(
-                (project) => project.term === projectTerm
-            )
-        }
-        if (projectYear !== ANY) {
-            matchingProjects = matchingProjects?.filter(
-                (project) => project.year === projectYear
-            )
-        }
-        // full-text search
-        // very primitive solution, just convert the project object to JSON
-        // and check that all words in searchString are in it.
-        // if we find that it's too slow with lots of projects we could try something like this:
-        // https://github.com/nextapps-de/flexsearch
-        const searchWords = searchString.trim().toLowerCase().split(" ")
-        matchingProjects = matchingProjects?.filter((project) => {
-            const projectString = JSON.stringify(project).toLowerCase()
-            return searchWords.every((word) => projectString.indexOf(word) > -1)
-        })
-
-        // sort by most recent, ties broken by name
-        const termOrder = [Term.Spring, Term.Summer, Term.Fall, Term.Winter]
-        matchingProjects?.sort((a, b) => {
-            let compareValue = b.year - a.year
-            if (compareValue === 0) {
-                compareValue =
-                    termOrder.indexOf(b.term) - termOrder.indexOf(a.term)
-                if (compareValue === 0) {
-                    compareValue = a.name.localeCompare(b.name)
+    // load a page of projects matching the filters, replacing the loaded projects
+    // if nextPageUrl is null, otherwise adding to them
+    const loadProjects = (nextPageUrl: string | null): void => {
+        searchCount.current += 1
+        const thisSearch = searchCount.current
+        portalApiInstance
+            .getProjectsPage(getListParams(), nextPageUrl)
+            .then((page) => {
+                // filters changed while loading
+                if (thisSearch !== searchCount.current) {
+                    return
                 }
-            }
-            if (reverseSort) {
-                compareValue *= -1
-            }
-            return compareValue
-        })
-
-        return matchingProjects
+                setProjects((loadedProjects) =>
+                    nextPageUrl === null || loadedProjects === undefined
+                        ? page.results
+                        : [...loadedProjects, ...page.results]
+                )
+                setNextUrl(page.next)
+            })
+            .catch(() => {
+                if (thisSearch === searchCount.current) {
+                    setProjects(undefined)
+                    setNextUrl(null)
+                }
+            })
     }
 
-    // parse search params and load projects from the API on page load
+    // parse search params and load project years from the API on page load
     useEffect(() => {
-        portalApiInstance.getProjects().then((data: Project[]) => {
-            setAllProjects(data)
-            // the reason this takes the list of projects is to check if the year param matches any projects
-            // can't use allProjects since the above setAllProjects runs asynchronously
-            parseSearchParams(data)
-        })
+        portalApiInstance
+            .getProjectYears()
+            .then((data: number[]) => {
+                setYears(data)
+                // the reason this takes the list of years is to check if the year param matches any projects
+                // can't use years since the above setYears runs asynchronously
+                parseSearchParams(data)
+            })
+            .catch(() => parseSearchParams([]))
     }, [])
 
-    // whenever filters change, update search params and the list of projects to render
+    // whenever filters change, update search params and load the first page of matching projects
     useEffect(() => {
         setSearchParams()
-        setProjects(getMatchingProjects())
+        // wait for the user to stop typing before searching
+        const timeout = setTimeout(() => loadProjects(null), SEARCH_DELAY_MS)
+        return () => clearTimeout(timeout)
     }, [
-        allProjects,
         searchString,
         clientType,
         projectType,
@@ -324,20 +318,12 @@ export default function ViewProjects(): JSX.Element {
                             <MenuItem value={ANY}>
                                 <em>Year</em>
                             </MenuItem>
-                            {allProjects
-                                ?.map((project) => project.year)
-                                // remove duplicates
-                                .filter(
-                                    (value, index, array) =>
-                                        array.indexOf(value) === index
-                                )
-                                // sort descending
-                                .sort((a, b) => b - a)
-                                .map((year) => (
-                                    <MenuItem key={year} value={year}>
-                                        {year}
-                                    </MenuItem>
-                                ))}
+                            {/* already sorted descending */}
+                            {years.map((year) => (
+                                <MenuItem key={year} value={year}>
+                                    {year}
+                                </MenuItem>
+                            ))}
                         </Select>
                     </Grid>
                     {/* Reverse sort order button */}
@@ -359,7 +345,9 @@ export default function ViewProjects(): JSX.Element {
                 <Typography variant="subtitle1" align="center" sx={{ mb: 1 }}>
                     {projects?.length === undefined
                         ? "Error retrieving projects"
-                        : `${projects.length} matching ${
+                        : `${nextUrl === null ? "" : "Showing "}${
+                              projects.length
+                          } matching ${
                               projects.length === 1 ? "project" : "projects"
                           }`}
                 </Typography>
@@ -369,6 +357,17 @@ export default function ViewProjects(): JSX.Element {
                         <ProjectCard key={project.id} project={project} />
                     ))}
                 </Stack>
+                {/* Load the next page of projects */}
+                {nextUrl !== null && (
+                    <Stack alignItems="center" sx={{ mt: 2 }}>
+                        <Button
+                            variant="contained"
+                            onClick={() => loadProjects(nextUrl)}
+                        >
+                            Load more projects
+                        </Button>
+                    </Stack>
+                )}
             </Container>
         </>
     )